@@ -0,0 +1,180 @@
+"""
+Offline bulk scoring command-line entry point.
+
+Scores a JSONL file of ``LeadScoringRequest`` records, or a directory of
+``*.jsonl`` shards read in sorted order, with the same model registry and
+schemas the API uses. Work is fanned out over a process pool with one model
+load per worker and results are written to the output file in input order::
+
+    python -m app.bulk_score requests.jsonl -o scores.jsonl --workers 4
+
+Line numbers in error records count lines across all shards as one stream.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from .config.config import get_settings
+from .core.streaming import score_ndjson_chunk
+from .ml.registry import ModelLoadError, ModelRegistry
+
+# Per-process model, loaded once by the pool initializer
+_worker_model = None
+
+
+def open_registry(
+    artifact_root: str, name: str, version: str, shared_dir: str | None = None
+) -> ModelRegistry:
+    """Return a registry applying the API's missing/unknown feature policies."""
+    config = get_settings().model
+    return ModelRegistry(
+        artifact_root,
+        name,
+        version,
+        missing_features=config.missing_features,
+        unknown_features=config.unknown_features,
+        shared_dir=shared_dir,
+    )
+
+
+def _init_worker(artifact_root: str, name: str, version: str):
+    global _worker_model  # pylint: disable=global-statement
+    _worker_model = open_registry(
+        artifact_root, name, version, get_settings().server.shared_weights_dir
+    ).active
+
+
+def _score_chunk(chunk: List[Tuple[int, bytes]]) -> Tuple[bytes, int, int]:
+    output, errors = score_ndjson_chunk(chunk, _worker_model)
+    return output, len(chunk), errors
+
+
+def find_input_files(path: Path) -> List[Path]:
+    """Return the JSONL files to score, shards sorted by name."""
+    if path.is_dir():
+        return sorted(path.glob("*.jsonl"))
+    return [path]
+
+
+def iter_chunks(files: List[Path], chunk_size: int) -> Iterator[list]:
+    """Yield ``(line_number, line)`` chunks across all input files."""
+    chunk = []
+    line_number = 0
+    for file in files:
+        with file.open("rb") as handle:
+            for line in handle:
+                line_number += 1
+                line = line.strip()
+                if not line:
+                    continue
+                chunk.append((line_number, line))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
+
+
+def run(
+    input_path: Path,
+    output_path: Path,
+    workers: int,
+    chunk_size: int,
+    model: Tuple[str, str, str],
+    progress_every: float = 5.0,
+) -> dict:
+    """Score every record and return throughput statistics."""
+    files = find_input_files(input_path)
+    if not files:
+        raise FileNotFoundError(f"No JSONL input found at {input_path}")
+    # Fail fast on a bad model instead of every worker failing its initializer
+    artifact_root, name, version = model
+    open_registry(artifact_root, name, version).load(version)
+
+    records = errors = 0
+    start = last_report = time.perf_counter()
+    # Bound the number of in-flight chunks so input is read only as fast as
+    # results are written, instead of Pool.imap queueing the whole file
+    max_in_flight = workers * 4
+    pending = deque()
+
+    with Pool(workers, initializer=_init_worker, initargs=model) as pool, open(
+        output_path, "wb"
+    ) as output:
+
+        def drain(limit: int):
+            nonlocal records, errors, last_report
+            while len(pending) > limit:
+                data, count, failed = pending.popleft().get()
+                output.write(data)
+                records += count
+                errors += failed
+                now = time.perf_counter()
+                if now - last_report >= progress_every:
+                    last_report = now
+                    _report(records, errors, now - start)
+
+        for chunk in iter_chunks(files, chunk_size):
+            pending.append(pool.apply_async(_score_chunk, (chunk,)))
+            drain(max_in_flight)
+        drain(0)
+
+    elapsed = time.perf_counter() - start
+    _report(records, errors, elapsed)
+    return {"records": records, "errors": errors, "seconds": elapsed}
+
+
+def _report(records: int, errors: int, elapsed: float):
+    rate = records / elapsed if elapsed > 0 else 0.0
+    print(
+        f"scored {records} records ({errors} errors) in {elapsed:.1f}s "
+        f"- {rate:,.0f} records/s",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Parse arguments and run the bulk scoring job."""
+    config = get_settings().model
+    parser = argparse.ArgumentParser(
+        prog="python -m app.bulk_score",
+        description="Score a JSONL file or directory of JSONL shards offline.",
+    )
+    parser.add_argument("input", type=Path, help="JSONL file or directory of shards")
+    parser.add_argument(
+        "-o", "--output", type=Path, default=Path("scores.jsonl"), help="Output file"
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=os.cpu_count() or 1, help="Processes"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=1000, help="Records per predict call"
+    )
+    parser.add_argument("--artifact-root", default=config.artifact_root)
+    parser.add_argument("--model-name", default=config.name)
+    parser.add_argument("--model-version", default=config.version)
+    args = parser.parse_args(argv)
+
+    try:
+        run(
+            args.input,
+            args.output,
+            workers=max(1, args.workers),
+            chunk_size=max(1, args.chunk_size),
+            model=(args.artifact_root, args.model_name, args.model_version),
+        )
+    except (FileNotFoundError, ModelLoadError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
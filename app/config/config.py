@@ -6,6 +6,7 @@ to load values from environment variables and .env files.
 """
 
 from functools import lru_cache
+from typing import Dict, List, Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -32,9 +33,211 @@ class APIConfig(BaseConfigSettings):
 
     host: str = "localhost"
     port: int = 8001
+    max_batch_size: int = 10000
+    stream_chunk_size: int = 1000
+    stream_max_line_bytes: int = 1_048_576
+    inference_mode: Literal["inline", "thread", "process"] = "inline"
+    inference_workers: int = 4
+    inference_queue_limit: int = 64
+    inference_timeout_seconds: float = 2.0
+    codec: Literal["fast", "schema"] = "fast"
     model_config = {**BaseConfigSettings.model_config, "env_prefix": "API_"}
 
 
+class LoggingConfig(BaseConfigSettings):
+    """Logging configuration settings."""
+
+    level: str = "INFO"
+    mode: Literal["sync", "async"] = "sync"
+    queue_size: int = 10000
+    overflow: Literal["drop", "block"] = "drop"
+    batch_size: int = 256
+    error_first_occurrences: int = 5
+    error_sample_rates: Dict[str, float] = {
+        "validation_errors": 0.01,
+        "http_errors": 0.01,
+        "internal_errors": 1.0,
+    }
+    error_summary_interval_seconds: float = 60.0
+    model_config = {**BaseConfigSettings.model_config, "env_prefix": "LOG_"}
+
+
+class ModelConfig(BaseConfigSettings):
+    """Model serving configuration settings."""
+
+    name: str = "lead-scoring"
+    version: str = "1"
+    artifact_root: str = "models"
+    missing_features: Literal["default", "reject"] = "default"
+    unknown_features: Literal["ignore", "reject"] = "ignore"
+    model_config = {**BaseConfigSettings.model_config, "env_prefix": "MODEL_"}
+
+
+class BatcherConfig(BaseConfigSettings):
+    """Micro-batching configuration for single-lead scoring."""
+
+    enabled: bool = True
+    max_batch_size: int = 64
+    max_wait_ms: float = 2.0
+    model_config = {**BaseConfigSettings.model_config, "env_prefix": "BATCHER_"}
+
+
+class CacheConfig(BaseConfigSettings):
+    """Prediction cache configuration settings."""
+
+    enabled: bool = True
+    max_entries: int = 100_000
+    ttl_seconds: float = 300.0
+    model_config = {**BaseConfigSettings.model_config, "env_prefix": "CACHE_"}
+
+
+class MetricsConfig(BaseConfigSettings):
+    """Metrics configuration settings."""
+
+    multiproc_dir: str | None = None
+    flush_interval_seconds: float = 5.0
+    model_config = {**BaseConfigSettings.model_config, "env_prefix": "METRICS_"}
+
+
+class ServerConfig(BaseConfigSettings):
+    """Multi-worker server configuration settings."""
+
+    workers: int = 1
+    shared_weights_dir: str | None = None
+    state_dir: str | None = None
+    model_config = {**BaseConfigSettings.model_config, "env_prefix": "SERVER_"}
+
+
+class StartupConfig(BaseConfigSettings):
+    """Startup lifecycle configuration settings."""
+
+    warmup_requests: int = 8
+    warmup_batch_sizes: List[int] = [1, 64]
+    background_warmup: bool = False
+    lazy_imports: bool = True
+    model_config = {**BaseConfigSettings.model_config, "env_prefix": "STARTUP_"}
+
+
+class ProfilingConfig(BaseConfigSettings):
+    """On-demand request profiling configuration settings."""
+
+    enabled: bool = False
+    header: str = "x-profile"
+    sample_rate: float = 0.0
+    sample_kind: Literal["cpu", "memory", "both"] = "cpu"
+    top_n: int = 20
+    buffer_size: int = 100
+    model_config = {**BaseConfigSettings.model_config, "env_prefix": "PROFILING_"}
+
+
+class TracingConfig(BaseConfigSettings):
+    """Request tracing configuration settings."""
+
+    enabled: bool = False
+    sample_rate: float = 0.0
+    # Trace requests whose inbound traceparent is sampled
+    parent_based: bool = True
+    buffer_size: int = 1000
+    exporter: Literal["none", "file", "otlp"] = "none"
+    export_path: str = "data/traces.jsonl"
+    otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    service_name: str = "mlflow-fastapi-backend"
+    export_queue_size: int = 10_000
+    export_batch_size: int = 256
+    export_interval_seconds: float = 1.0
+    model_config = {**BaseConfigSettings.model_config, "env_prefix": "TRACING_"}
+
+
+class AdmissionConfig(BaseConfigSettings):
+    """Admission control and load shedding configuration settings."""
+
+    enabled: bool = True
+    # Path prefix -> max in-flight requests, as JSON in the environment
+    limits: Dict[str, int] = {"/lead-scoring": 64, "/admin": 8}
+    default_limit: int = 128
+    exempt: List[str] = ["/health", "/metrics"]
+    max_queue: int = 256
+    target_delay_ms: float = 5.0
+    interval_ms: float = 100.0
+    retry_after_seconds: int = 1
+    model_config = {**BaseConfigSettings.model_config, "env_prefix": "ADMISSION_"}
+
+
+class RateLimitConfig(BaseConfigSettings):
+    """Per-client rate limiting configuration settings."""
+
+    enabled: bool = False
+    # Path prefix -> {"rate": requests per second, "burst": bucket size}
+    limits: Dict[str, Dict[str, float]] = {
+        "/lead-scoring": {"rate": 50.0, "burst": 100},
+        "/admin": {"rate": 1.0, "burst": 10},
+    }
+    key: Literal["ip", "api_key"] = "ip"
+    api_key_header: str = "x-api-key"
+    # Keys limited on their own with key=api_key, unknown keys share the IP limit
+    api_keys: List[str] = []
+    # Buckets kept per route group, the least recently used ones are evicted
+    max_clients: int = 10_000
+    model_config = {**BaseConfigSettings.model_config, "env_prefix": "RATE_LIMIT_"}
+
+
+class FeatureStoreConfig(BaseConfigSettings):
+    """Feature store configuration for scoring by lead_id alone."""
+
+    enabled: bool = False
+    path: str = "data/features.db"
+    snapshot_path: str | None = None
+    refresh_interval_seconds: float = 300.0
+    cache_size: int = 10_000
+    model_config = {
+        **BaseConfigSettings.model_config,
+        "env_prefix": "FEATURE_STORE_",
+    }
+
+
+class RoutingConfig(BaseConfigSettings):
+    """A/B and shadow model routing configuration."""
+
+    enabled: bool = False
+    # Version -> fraction of scoring traffic, the rest goes to the active model
+    variants: Dict[str, float] = {}
+    split: Literal["percent", "hash"] = "hash"
+    salt: str = ""
+    shadow_version: str | None = None
+    shadow_queue_size: int = 1000
+    shadow_batch_size: int = 64
+    # Shadow copies per second, the shadow thread competes with serving for the GIL
+    shadow_max_rate: float = 200.0
+    record_path: str | None = "data/shadow_scores.jsonl"
+    model_config = {**BaseConfigSettings.model_config, "env_prefix": "ROUTING_"}
+
+
+class AuditConfig(BaseConfigSettings):
+    """Prediction audit trail configuration."""
+
+    enabled: bool = False
+    directory: str = "data/audit"
+    format: Literal["jsonl", "sqlite"] = "jsonl"
+    features: Literal["hash", "full"] = "hash"
+    buffer_size: int = 10_000
+    overflow: Literal["drop", "block"] = "block"
+    batch_size: int = 1000
+    flush_interval_seconds: float = 1.0
+    rotate_bytes: int = 100 * 1024 * 1024
+    rotate_seconds: float = 3600.0
+    model_config = {**BaseConfigSettings.model_config, "env_prefix": "AUDIT_"}
+
+
+class DriftConfig(BaseConfigSettings):
+    """Streaming feature and score drift statistics configuration."""
+
+    enabled: bool = True
+    bins: int = 10
+    fold_size: int = 256
+    psi_threshold: float = 0.2
+    model_config = {**BaseConfigSettings.model_config, "env_prefix": "DRIFT_"}
+
+
 class Settings:  # pylint: disable=too-few-public-methods
     """Main settings container for the application."""
 
@@ -42,6 +245,21 @@ class Settings:  # pylint: disable=too-few-public-methods
         """Initialize settings by loading configuration from environment."""
         self.app = APPConfig()
         self.api = APIConfig()
+        self.log = LoggingConfig()
+        self.model = ModelConfig()
+        self.batcher = BatcherConfig()
+        self.cache = CacheConfig()
+        self.metrics = MetricsConfig()
+        self.server = ServerConfig()
+        self.startup = StartupConfig()
+        self.profiling = ProfilingConfig()
+        self.tracing = TracingConfig()
+        self.admission = AdmissionConfig()
+        self.rate_limit = RateLimitConfig()
+        self.feature_store = FeatureStoreConfig()
+        self.routing = RoutingConfig()
+        self.audit = AuditConfig()
+        self.drift = DriftConfig()
 
 
 @lru_cache()
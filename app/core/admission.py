@@ -0,0 +1,247 @@
+"""
+Admission control and load shedding.
+
+Requests are grouped by path prefix and every group has a maximum number of
+requests in flight. Requests over the limit wait in a FIFO queue, and the
+time they spend there (the queue delay) drives a CoDel-style controller:
+
+- while queue delays stay below ``target_delay_ms`` waiting requests are
+  admitted as soon as a slot frees up, for at most ``interval_ms``
+- once every request admitted from the queue during a whole
+  ``interval_ms`` waited longer than the target, the group is overloaded
+  and new requests that cannot be admitted immediately are shed
+- the group leaves the overloaded state as soon as a request is admitted
+  below the target or the queue drains
+
+Shed requests get a 503 with a ``Retry-After`` header right away instead of
+queueing behind work the server cannot finish in time. Exempt prefixes (the
+health checks) bypass the controller. Everything runs on the event loop, so
+no locks are needed; limits apply per worker process.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable
+
+from ..config.config import get_settings
+from .metrics import get_metrics
+from .tracing import get_request_id
+
+DEFAULT_GROUP = "default"
+
+
+class RouteGroup:
+    """In-flight limit, wait queue and CoDel state of one route group."""
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        max_queue: int,
+        target_delay: float,
+        interval: float,
+    ):
+        self.name = name
+        self.limit = max(1, limit)
+        self.max_queue = max_queue
+        self.target = target_delay
+        self.interval = interval
+        self.in_flight = 0
+        self.queue: deque = deque()
+        self.overloaded = False
+        self._above_target_since: float | None = None
+        self.admitted = 0
+        self.shed: Dict[str, int] = {}
+        self.last_queue_delay = 0.0
+
+    async def acquire(self) -> str | None:
+        """Take an in-flight slot, returning a shed reason if none was granted."""
+        if self.in_flight < self.limit and not self.queue:
+            self.in_flight += 1
+            self.admitted += 1
+            return None
+        if self.overloaded:
+            return "overloaded"
+        if len(self.queue) >= self.max_queue:
+            return "queue_full"
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (future, time.monotonic())
+        self.queue.append(entry)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.interval)
+        except asyncio.TimeoutError:
+            if future.done():
+                # Granted while timing out, keep the slot
+                return None
+            self.queue.remove(entry)
+            return "queue_timeout"
+        except asyncio.CancelledError:
+            if future.done():
+                self.release()
+            else:
+                self.queue.remove(entry)
+            raise
+        return None
+
+    def release(self):
+        """Return a slot, handing it to the oldest waiting request if any."""
+        now = time.monotonic()
+        while self.queue:
+            future, enqueued = self.queue.popleft()
+            if future.done():
+                continue
+            self._observe_delay(now - enqueued, now)
+            self.admitted += 1
+            # The slot passes to the waiter, in_flight is unchanged
+            future.set_result(None)
+            return
+        self.in_flight -= 1
+        self.overloaded = False
+        self._above_target_since = None
+
+    def _observe_delay(self, delay: float, now: float):
+        self.last_queue_delay = delay
+        if delay < self.target:
+            self.overloaded = False
+            self._above_target_since = None
+        elif self._above_target_since is None:
+            self._above_target_since = now
+        elif now - self._above_target_since >= self.interval:
+            self.overloaded = True
+
+    def snapshot(self) -> dict:
+        """Return the group state and counters."""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": len(self.queue),
+            "max_queue": self.max_queue,
+            "overloaded": self.overloaded,
+            "last_queue_delay_ms": self.last_queue_delay * 1000,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+        }
+
+
+class AdmissionController:
+    """Maps requests to route groups and decides whether to admit them.
+
+    Args:
+        limits: Path prefix -> max in-flight requests; the longest matching
+            prefix names the group, other paths use ``default_limit``
+        default_limit: In-flight limit of the default group
+        exempt: Path prefixes that are never limited
+        max_queue: Waiting requests per group before shedding outright
+        target_delay_ms: Acceptable queue delay
+        interval_ms: How long delays must stay above target to shed
+        retry_after_seconds: ``Retry-After`` value of shed responses
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, int],
+        default_limit: int = 128,
+        exempt: Iterable[str] = ("/health",),
+        max_queue: int = 256,
+        target_delay_ms: float = 5.0,
+        interval_ms: float = 100.0,
+        retry_after_seconds: int = 1,
+    ):
+        def group(name, limit):
+            return RouteGroup(
+                name, limit, max_queue, target_delay_ms / 1000, interval_ms / 1000
+            )
+
+        # Longest prefixes first so the most specific group wins
+        self.prefixes = sorted(limits, key=len, reverse=True)
+        self.groups = {prefix: group(prefix, limits[prefix]) for prefix in limits}
+        self.groups[DEFAULT_GROUP] = group(DEFAULT_GROUP, default_limit)
+        self.exempt = tuple(exempt)
+        self.retry_after = str(retry_after_seconds)
+
+    def group_for(self, path: str) -> RouteGroup | None:
+        """Route group limiting ``path``, or None for exempt paths."""
+        if path.startswith(self.exempt):
+            return None
+        for prefix in self.prefixes:
+            if path.startswith(prefix):
+                return self.groups[prefix]
+        return self.groups[DEFAULT_GROUP]
+
+    def snapshot(self) -> dict:
+        """Return the state of every route group."""
+        return {
+            "exempt": list(self.exempt),
+            "groups": {name: group.snapshot() for name, group in self.groups.items()},
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware shedding requests over their route group's capacity."""
+
+    def __init__(self, app, controller: AdmissionController | None = None):
+        self.app = app
+        self.controller = controller
+        self.metrics = get_metrics()
+
+    async def __call__(self, scope, receive, send):
+        if self.controller is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        group = self.controller.group_for(scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        reason = await group.acquire()
+        if reason is not None:
+            group.shed[reason] = group.shed.get(reason, 0) + 1
+            self.metrics.count_shed(group.name, reason)
+            await self._reject(scope, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            group.release()
+
+    async def _reject(self, scope, send):
+        body = json.dumps(
+            {
+                "error": "http_error",
+                "message": "Server is overloaded, retry later",
+                "request_id": get_request_id(scope),
+            }
+        ).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", self.controller.retry_after.encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+@lru_cache()
+def get_admission_controller() -> AdmissionController | None:
+    """Get the admission controller, or None when admission control is off."""
+    config = get_settings().admission
+    if not config.enabled:
+        return None
+    return AdmissionController(
+        limits=config.limits,
+        default_limit=config.default_limit,
+        exempt=config.exempt,
+        max_queue=config.max_queue,
+        target_delay_ms=config.target_delay_ms,
+        interval_ms=config.interval_ms,
+        retry_after_seconds=config.retry_after_seconds,
+    )
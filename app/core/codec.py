@@ -0,0 +1,261 @@
+"""
+Request and response codecs for the lead-scoring routes.
+
+The scoring routes read their raw body and hand it to a ``ScoringCodec``
+instead of letting FastAPI build ``LeadScoringRequest`` models and serialize
+``LeadScoringResponse`` models. The schemas stay the public contract (they
+are published in the OpenAPI document and decide every rejected body), but
+well-formed payloads skip them:
+
+- ``fast``: bodies are parsed with ``orjson`` when installed and each item is
+  checked with a few type tests (``lead_id`` an int, ``features`` absent or a
+  mapping of names to numbers), yielding the ``(lead_id, features)`` pairs the
+  routes vectorize. Anything else is validated by the schema, so rejected
+  bodies get exactly the errors FastAPI would report. Responses are encoded
+  straight to bytes.
+- ``schema``: every body is validated and every response serialized through
+  the Pydantic schemas, like FastAPI does; the reference for parity tests
+  and benchmarks.
+
+Besides JSON, MessagePack bodies (``Content-Type: application/msgpack``) and
+responses (``Accept: application/msgpack``) are supported when ``msgpack``
+is installed. Bodies of other media types are refused with a 415.
+"""
+
+import json
+import math
+from functools import lru_cache
+from typing import Any, List, Tuple
+
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+
+from ..config.config import get_settings
+from ..schemas.lead_scoring_request import LeadScoringRequest
+from ..schemas.lead_scoring_response import LeadScoringResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional content type
+    msgpack = None
+
+CODECS = ("fast", "schema")
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+_NUMBER_TYPES = (float, int)
+
+# (lead_id, features or None when they come from the feature store)
+Lead = Tuple[int, dict | None]
+
+_REQUEST = TypeAdapter(LeadScoringRequest)
+_BATCH_REQUEST = TypeAdapter(List[LeadScoringRequest])
+_RESPONSE = TypeAdapter(LeadScoringResponse)
+_BATCH_RESPONSE = TypeAdapter(List[LeadScoringResponse])
+
+
+def _media_type(value: str) -> str:
+    return value.split(";", 1)[0].strip().lower()
+
+
+def _is_json(media_type: str) -> bool:
+    return media_type == JSON_MEDIA_TYPE or (
+        media_type.startswith("application/") and media_type.endswith("+json")
+    )
+
+
+def _unsupported(media_type: str) -> HTTPException:
+    return HTTPException(
+        status_code=415, detail=f"Unsupported media type: {media_type}"
+    )
+
+
+def _parse_error() -> HTTPException:
+    return HTTPException(status_code=400, detail="There was an error parsing the body")
+
+
+def _json_loads(body: bytes, fast: bool) -> Any:
+    """Parse JSON, reporting errors exactly like FastAPI's body parsing."""
+    if fast and orjson is not None:
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # The standard parser accepts a few more inputs (NaN, big ints)
+            # and gives FastAPI's error positions for the rest
+            pass
+    try:
+        return json.loads(body)
+    except json.JSONDecodeError as exc:
+        raise RequestValidationError(
+            [
+                {
+                    "type": "json_invalid",
+                    "loc": ("body", exc.pos),
+                    "msg": "JSON decode error",
+                    "input": {},
+                    "ctx": {"error": exc.msg},
+                }
+            ],
+            body=exc.doc,
+        ) from exc
+    except ValueError as exc:
+        raise _parse_error() from exc
+
+
+def _fast_lead(item: Any) -> Lead | None:
+    """The pair of a request item the schema accepts as is, None otherwise."""
+    # Exact types: the schema coerces bools and strings, leave those to it
+    # pylint: disable=unidiomatic-typecheck
+    if type(item) is not dict:
+        return None
+    lead_id = item.get("lead_id")
+    features = item.get("features")
+    if type(lead_id) is not int:
+        return None
+    if features is None:
+        return lead_id, None
+    if type(features) is not dict:
+        return None
+    for name, value in features.items():
+        if type(name) is not str or type(value) not in _NUMBER_TYPES:
+            return None
+    return lead_id, features
+
+
+def _finite(content: dict | list) -> bool:
+    """Whether every score is finite; JSONResponse refuses to encode the rest."""
+    if isinstance(content, dict):
+        return math.isfinite(content["score"])
+    return all(math.isfinite(item["score"]) for item in content)
+
+
+def _validate(adapter: TypeAdapter, value: Any):
+    """Validate a parsed body against a schema, with FastAPI's error format."""
+    if value is None:
+        error = ValidationError.from_exception_data(
+            "Field required", [{"type": "missing", "loc": ("body",), "input": {}}]
+        ).errors()[0]
+        error["input"] = None
+        raise RequestValidationError([error])
+    try:
+        return adapter.validate_python(value, from_attributes=True)
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in exc.errors()],
+            body=value,
+        ) from exc
+
+
+class ScoringCodec:
+    """Decodes scoring request bodies and encodes scoring responses.
+
+    Args:
+        mode: ``fast`` or ``schema``, see the module documentation
+    """
+
+    def __init__(self, mode: str = "fast"):
+        if mode not in CODECS:
+            raise ValueError(f"Unsupported codec: {mode!r}")
+        self.mode = mode
+        self.fast = mode == "fast"
+
+    @staticmethod
+    def _load(body: bytes, content_type: str | None, fast: bool) -> Any:
+        """Parse a body by its content type, as FastAPI would."""
+        if not body:
+            return None
+        media_type = _media_type(content_type) if content_type else JSON_MEDIA_TYPE
+        if media_type in MSGPACK_MEDIA_TYPES:
+            if msgpack is None:
+                raise _unsupported(media_type)
+            try:
+                return msgpack.unpackb(body)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                raise _parse_error() from exc
+        if not _is_json(media_type):
+            # FastAPI validated these as raw bytes and failed encoding the error
+            raise _unsupported(media_type)
+        return _json_loads(body, fast)
+
+    def _reload(self, body: bytes, content_type: str | None) -> Any:
+        # orjson reads integers beyond 64 bits as floats; rejected bodies are
+        # validated as the standard parser reads them, as FastAPI does
+        return self._load(body, content_type, fast=False)
+
+    def decode_lead(self, body: bytes, content_type: str | None) -> Lead:
+        """Validated ``(lead_id, features)`` of a single scoring request."""
+        value = self._load(body, content_type, self.fast)
+        if self.fast:
+            lead = _fast_lead(value)
+            if lead is not None:
+                return lead
+            value = self._reload(body, content_type)
+        request = _validate(_REQUEST, value)
+        return request.lead_id, request.features
+
+    def decode_batch(self, body: bytes, content_type: str | None) -> List[Lead]:
+        """Validated ``(lead_id, features)`` pairs of a batch, in input order."""
+        value = self._load(body, content_type, self.fast)
+        if self.fast:
+            if type(value) is list:  # pylint: disable=unidiomatic-typecheck
+                leads = [_fast_lead(item) for item in value]
+                if None not in leads:
+                    return leads
+            value = self._reload(body, content_type)
+        return [
+            (request.lead_id, request.features)
+            for request in _validate(_BATCH_REQUEST, value)
+        ]
+
+    def encode(self, content: dict | list, accept: str | None = None) -> Response:
+        """Encode ``LeadScoringResponse`` content in the accepted media type."""
+        if self.fast:
+            body = content
+        else:
+            adapter = _BATCH_RESPONSE if isinstance(content, list) else _RESPONSE
+            body = jsonable_encoder(adapter.validate_python(content))
+        if accept and msgpack is not None:
+            for media_type in accept.split(","):
+                if _media_type(media_type) in MSGPACK_MEDIA_TYPES:
+                    return Response(msgpack.packb(body), media_type=MSGPACK_MEDIA_TYPE)
+        if self.fast and orjson is not None and _finite(body):
+            try:
+                return Response(orjson.dumps(body), media_type=JSON_MEDIA_TYPE)
+            except orjson.JSONEncodeError:
+                # Integers beyond 64 bits, left to the standard encoder
+                pass
+        # Same output as JSONResponse
+        return Response(
+            json.dumps(
+                body, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+            ).encode("utf-8"),
+            media_type=JSON_MEDIA_TYPE,
+        )
+
+
+def openapi_extra(schema: dict) -> dict:
+    """OpenAPI request body and response media types of a codec route."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                JSON_MEDIA_TYPE: {"schema": schema},
+                MSGPACK_MEDIA_TYPE: {"schema": schema},
+            },
+        },
+        "responses": {"200": {"content": {MSGPACK_MEDIA_TYPE: {}}}},
+    }
+
+
+@lru_cache()
+def get_codec() -> ScoringCodec:
+    """Get the configured scoring codec."""
+    return ScoringCodec(get_settings().api.codec)
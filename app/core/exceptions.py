@@ -8,7 +8,10 @@ error responses and logging for different types of application errors.
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
+from ..ml.executor import InferenceUnavailableError
 from .logging import error_logger
+from .metrics import get_metrics, route_label
+from .tracing import get_request_id
 
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -21,10 +24,13 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     Returns:
         JSONResponse with validation error details
     """
-    request_id = request.headers.get("x-request-id", "unknown")
+    request_id = get_request_id(request.scope)
+    get_metrics().count_validation_error(route_label(request.scope))
+    # errors() rebuilds the error list on every call
+    errors = exc.errors()
 
     error_logger.log_validation_error(
-        request=request, request_id=request_id, errors=exc.errors()
+        request=request, request_id=request_id, errors=errors
     )
 
     return JSONResponse(
@@ -32,7 +38,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={
             "error": "validation_error",
             "message": "Request validation failed",
-            "details": exc.errors(),
+            "details": errors,
             "request_id": request_id,
         },
     )
@@ -48,7 +54,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     Returns:
         JSONResponse with HTTP error details
     """
-    request_id = request.headers.get("x-request-id", "unknown")
+    request_id = get_request_id(request.scope)
 
     error_logger.log_http_error(
         request=request,
@@ -64,6 +70,24 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             "message": exc.detail,
             "request_id": request_id,
         },
+        headers=exc.headers,
+    )
+
+
+async def inference_unavailable_handler(
+    request: Request, exc: InferenceUnavailableError
+):
+    """Handle inference timeouts and a full inference queue as a 503.
+
+    Args:
+        request: The FastAPI request object
+        exc: The inference exception that occurred
+
+    Returns:
+        JSONResponse with HTTP error details
+    """
+    return await http_exception_handler(
+        request, HTTPException(status_code=503, detail=str(exc))
     )
 
 
@@ -77,7 +101,8 @@ async def general_exception_handler(request: Request, exc: Exception):
     Returns:
         JSONResponse with generic error message
     """
-    request_id = request.headers.get("x-request-id", "unknown")
+    request_id = get_request_id(request.scope)
+    get_metrics().count_internal_error(route_label(request.scope))
 
     error_logger.log_internal_error(request=request, request_id=request_id, error=exc)
 
@@ -100,4 +125,5 @@ def register_exception_handlers(app):
     # Order matters: more specific handlers first
     app.add_exception_handler(RequestValidationError, validation_exception_handler)
     app.add_exception_handler(HTTPException, http_exception_handler)
+    app.add_exception_handler(InferenceUnavailableError, inference_unavailable_handler)
     app.add_exception_handler(Exception, general_exception_handler)
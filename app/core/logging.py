@@ -3,14 +3,433 @@ Logging utilities and configuration for the FastAPI application.
 
 This module provides structured logging capabilities, error tracking,
 and request/response logging middleware for comprehensive application monitoring.
+
+Structured events are captured on the request path as lightweight tuples
+(creation time, a formatter and its raw arguments) and only turned into JSON
+when written. In ``sync`` mode that happens immediately; in ``async`` mode the
+tuples are queued and a background thread formats and writes them in batches,
+so a slow stdout or log collector never stalls the event loop.
+
+Error events are fingerprinted by route, error type and field location. Only
+the first occurrences of a fingerprint in each summary window (plus a
+sampled share of the repeats) are logged in full; the rest are counted and
+reported in one ``error_summary`` record per logger and window, so a client
+sending malformed payloads at high rate cannot flood the logs.
 """
 
+import asyncio
+import atexit
 import logging
 import json
-import uuid
+import queue
+import random
+import sys
+import threading
 from datetime import datetime, timezone
 import time
+from typing import Callable, Dict, Mapping
 from fastapi import Request, Response
+from starlette.datastructures import URL
+from .metrics import get_metrics, route_label
+from .profiling import RequestProfiler
+from .tracing import (
+    REQUEST_ID_HEADER,
+    TRACEPARENT_HEADER,
+    Tracer,
+    activate,
+    deactivate,
+    inbound_ids,
+    new_request_id,
+)
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+def _timestamp(created: float) -> str:
+    return datetime.fromtimestamp(created, timezone.utc).isoformat()
+
+
+def _header(scope: dict, name: bytes) -> str | None:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _client_ip(scope: dict) -> str | None:
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+def _format_request_received(created, request_id, scope, start_time) -> str:
+    return json.dumps(
+        {
+            "event": "request_received",
+            "request_id": request_id,
+            "method": scope["method"],
+            "url": str(URL(scope=scope)),
+            "client_ip": _client_ip(scope),
+            "user_agent": _header(scope, b"user-agent"),
+            "timestamp": _timestamp(created),
+            "start_time": start_time,
+        }
+    )
+
+
+def _format_request_completed(created, request_id, scope, status_code, duration):
+    return json.dumps(
+        {
+            "event": "request_completed",
+            "request_id": request_id,
+            "method": scope["method"],
+            "url": str(URL(scope=scope)),
+            "status_code": status_code,
+            "duration_ms": round(duration * 1000, 2),
+            "timestamp": _timestamp(created),
+        }
+    )
+
+
+def _format_error(created, event, request_id, scope, fields) -> str:
+    return json.dumps(
+        {
+            "event": event,
+            "request_id": request_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "client_ip": _client_ip(scope),
+            "user_agent": _header(scope, b"user-agent"),
+            **fields,
+            "timestamp": _timestamp(created),
+        }
+    )
+
+
+def _format_error_summary(created, event, window, fingerprints) -> str:
+    return json.dumps(
+        {
+            "event": "error_summary",
+            "error_event": event,
+            "window_seconds": round(window, 3),
+            "occurrences": sum(entry["count"] for entry in fingerprints),
+            "suppressed": sum(
+                entry["count"] - entry["logged"] for entry in fingerprints
+            ),
+            "fingerprints": fingerprints,
+            "timestamp": _timestamp(created),
+        }
+    )
+
+
+# Fingerprint standing for every fingerprint over the per-window limit
+OVERFLOW_FINGERPRINT = ("*", "other")
+
+
+class ErrorAggregator:
+    """Decides which error events are logged in full and counts the rest.
+
+    Fingerprints are counted per logger in windows of ``summary_interval``
+    seconds. When a window has passed, the next event, a timer scheduled on
+    the event loop by the first suppressed event, or ``flush`` emits an
+    ``error_summary`` record for every logger that suppressed events, at the
+    highest level of the events it counts, and counting starts over. Runs on
+    the event loop only, without locks.
+
+    Args:
+        first: Occurrences of each fingerprint logged in full per window
+        sample_rates: Logger name -> share of later occurrences still logged
+            in full; loggers not listed log only the first occurrences
+        summary_interval: Seconds between summary records
+        max_fingerprints: Distinct fingerprints per logger and window, further
+            ones are counted under a single overflow fingerprint
+    """
+
+    def __init__(
+        self,
+        first: int = 5,
+        sample_rates: Mapping[str, float] | None = None,
+        summary_interval: float = 60.0,
+        max_fingerprints: int = 1000,
+    ):
+        self.first = first
+        self.sample_rates = dict(sample_rates or {})
+        self.summary_interval = summary_interval
+        self.max_fingerprints = max_fingerprints
+        # logger -> fingerprint -> [occurrences, logged in full]
+        self._windows: Dict[logging.Logger, Dict[tuple, list]] = {}
+        self._events: Dict[logging.Logger, str] = {}
+        self._levels: Dict[logging.Logger, int] = {}
+        self._window_start = time.monotonic()
+        # Event loop the pending summary timer was scheduled on
+        self._timer_loop: asyncio.AbstractEventLoop | None = None
+
+    def admit(
+        self,
+        logger: logging.Logger,
+        event: str,
+        fingerprint: tuple,
+        level: int = logging.WARNING,
+    ) -> bool:
+        """Count an occurrence logged at ``level`` and return whether to log it."""
+        now = time.monotonic()
+        if now - self._window_start >= self.summary_interval:
+            self.flush(now)
+        counts = self._windows.get(logger)
+        if counts is None:
+            counts = self._windows[logger] = {}
+            self._events[logger] = event
+            self._levels[logger] = level
+        elif level > self._levels[logger]:
+            self._levels[logger] = level
+        entry = counts.get(fingerprint)
+        if entry is None:
+            if len(counts) >= self.max_fingerprints:
+                fingerprint = OVERFLOW_FINGERPRINT
+                entry = counts.get(fingerprint)
+            if entry is None:
+                entry = counts[fingerprint] = [0, 0]
+        entry[0] += 1
+        if entry[0] <= self.first or random.random() < self.sample_rates.get(
+            logger.name, 0.0
+        ):
+            entry[1] += 1
+            return True
+        self._schedule_flush(now)
+        return False
+
+    def _schedule_flush(self, now: float):
+        """Summarize the window when it ends even if no further error arrives."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Outside the event loop the next event or shutdown flushes
+            return
+        if self._timer_loop is loop:
+            return
+        self._timer_loop = loop
+        delay = max(0.0, self.summary_interval - (now - self._window_start))
+        loop.call_later(delay, self._on_timer)
+
+    def _on_timer(self):
+        self._timer_loop = None
+        now = time.monotonic()
+        if now - self._window_start >= self.summary_interval:
+            self.flush(now)
+        elif self._windows:
+            # A newer window started meanwhile, summarize it when it ends
+            self._schedule_flush(now)
+
+    def flush(self, now: float | None = None):
+        """Emit summary records for the current window and start a new one."""
+        now = time.monotonic() if now is None else now
+        window = now - self._window_start
+        windows, self._windows = self._windows, {}
+        levels, self._levels = self._levels, {}
+        self._window_start = now
+        for logger, counts in windows.items():
+            if all(count == logged for count, logged in counts.values()):
+                continue
+            _emit(
+                logger,
+                levels[logger],
+                _format_error_summary,
+                (self._events[logger], window, self._describe(counts)),
+            )
+
+    def snapshot(self) -> dict:
+        """Return the counts of the current window per logger."""
+        return {
+            "window_seconds": time.monotonic() - self._window_start,
+            "summary_interval_seconds": self.summary_interval,
+            "first_occurrences": self.first,
+            "sample_rates": dict(self.sample_rates),
+            "loggers": {
+                logger.name: self._describe(counts)
+                for logger, counts in self._windows.items()
+            },
+        }
+
+    @staticmethod
+    def _describe(counts: Dict[tuple, list]) -> list:
+        return [
+            {
+                "route": fingerprint[0],
+                "errors": fingerprint[1],
+                "count": count,
+                "logged": logged,
+            }
+            for fingerprint, (count, logged) in sorted(
+                counts.items(), key=lambda item: -item[1][0]
+            )
+        ]
+
+
+def _error_locations(errors: list) -> tuple:
+    """Error types and field locations, list positions collapsed to ``*``."""
+    return tuple(
+        (
+            error.get("type"),
+            ".".join(
+                "*" if isinstance(part, int) else str(part)
+                for part in error.get("loc", ())
+            ),
+        )
+        for error in errors
+    )
+
+
+class AsyncLogPipeline:
+    """Bounded queue drained by a background thread that writes in batches.
+
+    Items are either structured-event tuples or standard ``LogRecord``
+    objects from other loggers. When the queue is full the ``drop`` policy
+    discards the item and counts it, the ``block`` policy waits for room.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        stream=None,
+        queue_size: int = 10000,
+        overflow: str = "drop",
+        batch_size: int = 256,
+    ):
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"Unsupported overflow policy: {overflow!r}")
+        self.stream = stream or sys.stderr
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self.formatter = logging.Formatter(LOG_FORMAT)
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="log-pipeline", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, item) -> bool:
+        """Queue an item for writing, returning False if it was dropped."""
+        if self._closed:
+            self.dropped += 1
+            return False
+        try:
+            if self.overflow == "block":
+                self._queue.put(item)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        """Write everything queued so far and stop the background thread."""
+        self._closed = True
+        if not self._thread.is_alive():
+            return
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+
+    def snapshot(self) -> dict:
+        """Return pipeline counters as a JSON-serializable dict."""
+        return {
+            "overflow": self.overflow,
+            "queue_size": self._queue.maxsize,
+            "backlog": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "written": self.written,
+            "batches": self.batches,
+        }
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = False
+            lines = []
+            for item in batch:
+                if item is self._STOP:
+                    stopping = True
+                    continue
+                try:
+                    lines.append(self._format(item))
+                except Exception:  # pylint: disable=broad-exception-caught
+                    # A broken record must not kill the writer thread
+                    continue
+            if lines:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+                self.written += len(lines)
+                self.batches += 1
+            if stopping:
+                return
+
+    def _format(self, item) -> str:
+        if isinstance(item, logging.LogRecord):
+            return self.formatter.format(item)
+        created, name, level, formatter, args, exc_info = item
+        record = logging.LogRecord(
+            name, level, __file__, 0, formatter(created, *args), None, exc_info
+        )
+        record.created = created
+        record.msecs = (created - int(created)) * 1000
+        return self.formatter.format(record)
+
+
+class AsyncQueueHandler(logging.Handler):
+    """Handler forwarding standard log records to an ``AsyncLogPipeline``.
+
+    Unlike ``logging.handlers.QueueHandler`` the record is not formatted on
+    the calling thread; the pipeline thread formats it.
+    """
+
+    def __init__(self, pipeline: AsyncLogPipeline):
+        super().__init__()
+        self.pipeline = pipeline
+
+    def emit(self, record):
+        self.pipeline.submit(record)
+
+
+# Set by configure_logging() in async mode
+_pipeline: AsyncLogPipeline | None = None
+
+
+def get_log_pipeline() -> AsyncLogPipeline | None:
+    """Return the active async log pipeline, or None in sync mode."""
+    return _pipeline
+
+
+def _emit(
+    logger: logging.Logger,
+    level: int,
+    formatter: Callable[..., str],
+    args: tuple,
+    exc_info=None,
+):
+    """Log a structured event, deferring formatting in async mode."""
+    if not logger.isEnabledFor(level):
+        return
+    created = time.time()
+    pipeline = _pipeline
+    if pipeline is None:
+        logger.log(level, formatter(created, *args), exc_info=exc_info)
+    else:
+        if exc_info is True:
+            exc_info = sys.exc_info()
+        pipeline.submit((created, logger.name, level, formatter, args, exc_info))
 
 
 class StructuredLogger:
@@ -21,17 +440,12 @@ class StructuredLogger:
 
     def log_request(self, request: Request, request_id: str, start_time: float):
         """Log incoming request details."""
-        log_data = {
-            "event": "request_received",
-            "request_id": request_id,
-            "method": request.method,
-            "url": str(request.url),
-            "client_ip": request.client.host if request.client else None,
-            "user_agent": request.headers.get("user-agent"),
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "start_time": start_time,
-        }
-        self.logger.info(json.dumps(log_data))
+        _emit(
+            self.logger,
+            logging.INFO,
+            _format_request_received,
+            (request_id, request.scope, start_time),
+        )
 
     def log_response(
         self,
@@ -42,84 +456,95 @@ class StructuredLogger:
         end_time: float,
     ):
         """Log response details."""
-        duration = end_time - start_time
-        log_data = {
-            "event": "request_completed",
-            "request_id": request_id,
-            "method": request.method,
-            "url": str(request.url),
-            "status_code": response.status_code,
-            "duration_ms": round(duration * 1000, 2),
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-        self.logger.info(json.dumps(log_data))
+        _emit(
+            self.logger,
+            logging.INFO,
+            _format_request_completed,
+            (request_id, request.scope, response.status_code, end_time - start_time),
+        )
 
 
 class ErrorLogger:
-    """Specialized logger for exception handling logging."""
+    """Specialized logger for exception handling logging.
+
+    Repeated errors are sampled by an ``ErrorAggregator``; fingerprints are
+    only computed when the logger is enabled for the event's level.
+    """
 
-    def __init__(self):
+    def __init__(self, aggregator: ErrorAggregator | None = None):
         self.validation_logger = logging.getLogger("validation_errors")
         self.internal_logger = logging.getLogger("internal_errors")
         self.http_logger = logging.getLogger("http_errors")
+        self.aggregator = aggregator or ErrorAggregator()
 
     def log_validation_error(self, request: Request, request_id: str, errors: list):
         """Log validation errors with detailed context."""
-        log_data = {
-            "event": "validation_error",
-            "request_id": request_id,
-            "method": request.method,
-            "path": str(request.url.path),
-            "client_ip": request.client.host if request.client else None,
-            "user_agent": request.headers.get("user-agent"),
-            "errors": errors,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-        self.validation_logger.warning(json.dumps(log_data))
+        logger = self.validation_logger
+        if not logger.isEnabledFor(logging.WARNING):
+            return
+        fingerprint = (route_label(request.scope), _error_locations(errors))
+        if self.aggregator.admit(logger, "validation_error", fingerprint):
+            _emit(
+                logger,
+                logging.WARNING,
+                _format_error,
+                ("validation_error", request_id, request.scope, {"errors": errors}),
+            )
 
     def log_internal_error(self, request: Request, request_id: str, error: Exception):
         """Log internal server errors."""
-        log_data = {
-            "event": "internal_error",
-            "request_id": request_id,
-            "method": request.method,
-            "path": str(request.url.path),
-            "client_ip": request.client.host if request.client else None,
-            "user_agent": request.headers.get("user-agent"),
-            "error_type": type(error).__name__,
-            "error_message": str(error),
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-        self.internal_logger.error(json.dumps(log_data), exc_info=True)
+        logger = self.internal_logger
+        if not logger.isEnabledFor(logging.ERROR):
+            return
+        fingerprint = (route_label(request.scope), type(error).__name__)
+        if self.aggregator.admit(logger, "internal_error", fingerprint, logging.ERROR):
+            fields = {"error_type": type(error).__name__, "error_message": str(error)}
+            _emit(
+                logger,
+                logging.ERROR,
+                _format_error,
+                ("internal_error", request_id, request.scope, fields),
+                exc_info=True,
+            )
 
     def log_http_error(
         self, request: Request, request_id: str, status_code: int, detail: str
     ):
         """Log HTTP errors (4xx/5xx)."""
-        log_data = {
-            "event": "http_error",
-            "request_id": request_id,
-            "method": request.method,
-            "path": str(request.url.path),
-            "client_ip": request.client.host if request.client else None,
-            "user_agent": request.headers.get("user-agent"),
-            "status_code": status_code,
-            "error_detail": detail,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
+        logger = self.http_logger
         # Log as error for 5xx, warning for 4xx
-        if status_code >= 500:
-            self.http_logger.error(json.dumps(log_data))
-        else:
-            self.http_logger.warning(json.dumps(log_data))
+        level = logging.ERROR if status_code >= 500 else logging.WARNING
+        if not logger.isEnabledFor(level):
+            return
+        fingerprint = (route_label(request.scope), status_code)
+        if self.aggregator.admit(logger, "http_error", fingerprint, level):
+            fields = {"status_code": status_code, "error_detail": detail}
+            _emit(
+                logger,
+                level,
+                _format_error,
+                ("http_error", request_id, request.scope, fields),
+            )
 
 
 class LoggingMiddleware:
-    """Middleware for comprehensive request/response logging."""
+    """Middleware for comprehensive request/response logging.
 
-    def __init__(self, app):
+    Assigns the request id (see ``app.core.tracing``) and, for traced
+    requests, records the ``middleware`` span around the whole request.
+    """
+
+    def __init__(
+        self,
+        app,
+        profiler: RequestProfiler | None = None,
+        tracer: Tracer | None = None,
+    ):
         self.app = app
         self.logger = StructuredLogger("request_logger")
+        self.metrics = get_metrics()
+        self.profiler = profiler
+        self.tracer = tracer
 
     async def __call__(self, scope, receive, send):
         """ASGI middleware for request/response logging."""
@@ -130,44 +555,138 @@ class LoggingMiddleware:
             await self.app(scope, receive, send)
             return
 
-        request = Request(scope, receive)
-        request_id = str(uuid.uuid4())
+        request_id, traceparent = inbound_ids(scope)
+        if request_id is None:
+            request_id = new_request_id()
+        # Read back with get_request_id, the header list is left untouched
+        scope["request_id"] = request_id
         start_time = time.time()
 
-        # Add request ID to headers for tracking
-        scope["headers"] = list(scope.get("headers", []))
-        scope["headers"].append((b"x-request-id", request_id.encode()))
-
         # Log incoming request
-        self.logger.log_request(request, request_id, start_time)
+        logger = self.logger.logger
+        _emit(
+            logger,
+            logging.INFO,
+            _format_request_received,
+            (request_id, scope, start_time),
+        )
+
+        trace = None
+        if self.tracer is not None:
+            trace = self.tracer.start(request_id, traceparent)
+        if trace is not None:
+            root = trace.span("middleware")
+            root.__enter__()
+            token = activate(trace)
+
+        metrics = self.metrics
+        response_started = False
 
         async def send_wrapper(message):
+            nonlocal response_started
             if message["type"] == "http.response.start":
-                # Create response object for logging
-                response = Response()
-                response.status_code = message["status"]
-
+                response_started = True
+                status = message["status"]
                 end_time = time.time()
-                self.logger.log_response(
-                    request, response, request_id, start_time, end_time
+                _emit(
+                    logger,
+                    logging.INFO,
+                    _format_request_completed,
+                    (request_id, scope, status, end_time - start_time),
+                )
+                metrics.observe_request(
+                    route_label(scope), scope["method"], status, end_time - start_time
                 )
+                # Echo the id so callers can correlate logs and error reports
+                headers = [
+                    *message.get("headers", ()),
+                    (REQUEST_ID_HEADER, request_id.encode("latin-1")),
+                ]
+                if trace is not None:
+                    root.set(status_code=status)
+                    headers.append(
+                        (TRACEPARENT_HEADER, trace.traceparent(root.span_id))
+                    )
+                message["headers"] = headers
 
             await send(message)
 
-        # Let exceptions propagate to FastAPI exception handlers
-        await self.app(scope, receive, send_wrapper)
-
-
-def configure_logging(level: str = "INFO"):
+        metrics.in_flight += 1
+        try:
+            # Let exceptions propagate to FastAPI exception handlers
+            if self.profiler is None:
+                await self.app(scope, receive, send_wrapper)
+            else:
+                await self.profiler.run(
+                    self.app, scope, receive, send_wrapper, request_id
+                )
+        except Exception as exc:
+            # The 500 response is sent by the outer ServerErrorMiddleware
+            if not response_started:
+                metrics.observe_request(
+                    route_label(scope), scope["method"], 500, time.time() - start_time
+                )
+            if trace is not None:
+                root.set(error=type(exc).__name__)
+            raise
+        finally:
+            metrics.in_flight -= 1
+            if trace is not None:
+                deactivate(token)
+                root.set(
+                    method=scope["method"], route=route_label(scope), path=scope["path"]
+                )
+                root.__exit__(None, None, None)
+                self.tracer.finish(trace)
+
+
+def configure_logging(
+    level: str = "INFO",
+    mode: str = "sync",
+    queue_size: int = 10000,
+    overflow: str = "drop",
+    batch_size: int = 256,
+    error_first_occurrences: int = 5,
+    error_sample_rates: Mapping[str, float] | None = None,
+    error_summary_interval_seconds: float = 60.0,
+):
     """Configure logging for the application.
 
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        mode: ``sync`` writes on the calling thread, ``async`` queues records
+            for a background writer thread
+        queue_size: Maximum number of queued records in async mode
+        overflow: ``drop`` or ``block`` when the async queue is full
+        batch_size: Maximum number of records written per batch in async mode
+        error_first_occurrences: Occurrences of each error fingerprint
+            logged in full per summary window
+        error_sample_rates: Error logger name -> share of repeated errors
+            still logged in full
+        error_summary_interval_seconds: Seconds between error summary records
     """
+    global _pipeline  # pylint: disable=global-statement
+    shutdown_logging()
+    error_logger.aggregator = ErrorAggregator(
+        first=error_first_occurrences,
+        sample_rates=error_sample_rates,
+        summary_interval=error_summary_interval_seconds,
+    )
+
+    if mode == "async":
+        _pipeline = AsyncLogPipeline(
+            queue_size=queue_size, overflow=overflow, batch_size=batch_size
+        )
+        handler = AsyncQueueHandler(_pipeline)
+    elif mode == "sync":
+        handler = logging.StreamHandler()
+    else:
+        raise ValueError(f"Unsupported logging mode: {mode!r}")
+
     logging.basicConfig(
         level=getattr(logging, level.upper()),
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[logging.StreamHandler()],
+        format=LOG_FORMAT,
+        handlers=[handler],
         force=True,
     )
 
@@ -177,8 +696,32 @@ def configure_logging(level: str = "INFO"):
     logging.getLogger("internal_errors").setLevel(logging.ERROR)
     logging.getLogger("http_errors").setLevel(logging.WARNING)
 
-    logging.getLogger(__name__).info("Logging configured successfully")
+    logging.getLogger(__name__).info("Logging configured successfully (%s)", mode)
+
+
+def shutdown_logging():
+    """Flush and stop the async log pipeline, if one is running.
+
+    Records logged afterwards are written synchronously instead of being lost.
+    """
+    global _pipeline  # pylint: disable=global-statement
+    # Report the errors counted so far while the pipeline can still write
+    error_logger.aggregator.flush()
+    pipeline, _pipeline = _pipeline, None
+    if pipeline is None:
+        return
+    pipeline.stop()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, AsyncQueueHandler):
+            root.removeHandler(handler)
+            fallback = logging.StreamHandler(pipeline.stream)
+            fallback.setFormatter(logging.Formatter(LOG_FORMAT))
+            root.addHandler(fallback)
 
 
 # Global error logger instance
 error_logger = ErrorLogger()
+
+atexit.register(shutdown_logging)
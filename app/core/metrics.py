@@ -0,0 +1,341 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Request counts and latency histograms are kept per route template, method
+and status, next to an in-flight gauge, model inference timings and error
+counters. Series are created the first time a label set is seen; after that
+recording is a few dict lookups and integer increments.
+
+With several uvicorn workers, set ``METRICS_MULTIPROC_DIR`` to a directory
+shared by the workers: each worker periodically writes a snapshot file there
+and ``/metrics`` merges the snapshots of every worker. Counters of workers
+that exited are kept, their in-flight gauge is not.
+"""
+
+import atexit
+import json
+import os
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from ..config.config import get_settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+INFERENCE_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts are stored per bucket, not cumulatively."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Record one observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_list(self) -> list:
+        """Serialize as ``[*counts, sum, count]``."""
+        return [*self.counts, self.sum, self.count]
+
+    def merge_list(self, data: list):
+        """Add a serialized histogram into this one."""
+        for index in range(len(self.counts)):
+            self.counts[index] += data[index]
+        self.sum += data[-2]
+        self.count += data[-1]
+
+
+def route_label(scope: dict) -> str:
+    """Route template for a request, bounded to known routes."""
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class Metrics:
+    """Process-local metrics registry."""
+
+    def __init__(self):
+        # route -> method -> status -> latency histogram
+        self.requests: Dict[str, Dict[str, Dict[int, Histogram]]] = {}
+        self.in_flight = 0
+        self.inference = Histogram(INFERENCE_BUCKETS)
+        self.inference_rows = 0
+        self.validation_errors: Dict[str, int] = {}
+        self.internal_errors: Dict[str, int] = {}
+        # route group -> shed reason -> count
+        self.shed: Dict[str, Dict[str, int]] = {}
+        # route group -> requests rejected by rate limiting
+        self.rate_limited: Dict[str, int] = {}
+
+    def observe_request(self, route: str, method: str, status: int, seconds: float):
+        """Record a completed request."""
+        methods = self.requests.get(route)
+        if methods is None:
+            methods = self.requests[route] = {}
+        statuses = methods.get(method)
+        if statuses is None:
+            statuses = methods[method] = {}
+        histogram = statuses.get(status)
+        if histogram is None:
+            histogram = statuses[status] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(seconds)
+
+    def observe_inference(self, seconds: float, rows: int):
+        """Record one predict call over ``rows`` rows."""
+        self.inference.observe(seconds)
+        self.inference_rows += rows
+
+    def count_validation_error(self, route: str):
+        """Count a request rejected by validation."""
+        self.validation_errors[route] = self.validation_errors.get(route, 0) + 1
+
+    def count_internal_error(self, route: str):
+        """Count a request that failed with an unhandled exception."""
+        self.internal_errors[route] = self.internal_errors.get(route, 0) + 1
+
+    def count_shed(self, group: str, reason: str):
+        """Count a request rejected by admission control."""
+        reasons = self.shed.setdefault(group, {})
+        reasons[reason] = reasons.get(reason, 0) + 1
+
+    def count_rate_limited(self, group: str):
+        """Count a request rejected by rate limiting."""
+        self.rate_limited[group] = self.rate_limited.get(group, 0) + 1
+
+    def snapshot(self) -> dict:
+        """Serialize every series for multi-process aggregation."""
+        return {
+            "pid": os.getpid(),
+            "requests": {
+                route: {
+                    method: {
+                        str(status): histogram.to_list()
+                        for status, histogram in statuses.items()
+                    }
+                    for method, statuses in methods.items()
+                }
+                for route, methods in self.requests.items()
+            },
+            "in_flight": self.in_flight,
+            "inference": self.inference.to_list(),
+            "inference_rows": self.inference_rows,
+            "validation_errors": dict(self.validation_errors),
+            "internal_errors": dict(self.internal_errors),
+            "shed": {group: dict(reasons) for group, reasons in self.shed.items()},
+            "rate_limited": dict(self.rate_limited),
+        }
+
+
+def merge_snapshots(snapshots: Iterable[dict]) -> Metrics:
+    """Aggregate worker snapshots into a single ``Metrics`` instance."""
+    merged = Metrics()
+    for snapshot in snapshots:
+        for route, methods in snapshot["requests"].items():
+            for method, statuses in methods.items():
+                for status, data in statuses.items():
+                    target = merged.requests.setdefault(route, {}).setdefault(
+                        method, {}
+                    )
+                    histogram = target.get(int(status))
+                    if histogram is None:
+                        histogram = target[int(status)] = Histogram(LATENCY_BUCKETS)
+                    histogram.merge_list(data)
+        merged.in_flight += snapshot.get("in_flight", 0)
+        merged.inference.merge_list(snapshot["inference"])
+        merged.inference_rows += snapshot["inference_rows"]
+        for name in ("validation_errors", "internal_errors"):
+            counters = getattr(merged, name)
+            for route, count in snapshot[name].items():
+                counters[route] = counters.get(route, 0) + count
+        for group, reasons in snapshot.get("shed", {}).items():
+            target = merged.shed.setdefault(group, {})
+            for reason, count in reasons.items():
+                target[reason] = target.get(reason, 0) + count
+        for group, count in snapshot.get("rate_limited", {}).items():
+            merged.rate_limited[group] = merged.rate_limited.get(group, 0) + count
+    return merged
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _histogram_lines(name: str, histogram: Histogram, labels: str) -> List[str]:
+    prefix = f"{labels}," if labels else ""
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {histogram.sum}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
+
+
+def render_prometheus(metrics: Metrics) -> str:
+    """Render metrics in the Prometheus text exposition format."""
+    lines = [
+        "# HELP http_requests_total Total HTTP requests by route, method and status.",
+        "# TYPE http_requests_total counter",
+    ]
+    for route, methods in sorted(metrics.requests.items()):
+        for method, statuses in sorted(methods.items()):
+            for status, histogram in sorted(statuses.items()):
+                labels = _labels(route=route, method=method, status=status)
+                lines.append(f"http_requests_total{{{labels}}} {histogram.count}")
+
+    lines += [
+        "# HELP http_request_duration_seconds HTTP request latency.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for route, methods in sorted(metrics.requests.items()):
+        for method, statuses in sorted(methods.items()):
+            for status, histogram in sorted(statuses.items()):
+                labels = _labels(route=route, method=method, status=status)
+                lines += _histogram_lines(
+                    "http_request_duration_seconds", histogram, labels
+                )
+
+    lines += [
+        "# HELP http_requests_in_flight HTTP requests currently being served.",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {metrics.in_flight}",
+        "# HELP model_inference_duration_seconds Duration of model predict calls.",
+        "# TYPE model_inference_duration_seconds histogram",
+        *_histogram_lines("model_inference_duration_seconds", metrics.inference, ""),
+        "# HELP model_inference_rows_total Rows scored by model predict calls.",
+        "# TYPE model_inference_rows_total counter",
+        f"model_inference_rows_total {metrics.inference_rows}",
+        "# HELP validation_errors_total Requests rejected by validation.",
+        "# TYPE validation_errors_total counter",
+    ]
+    for route, count in sorted(metrics.validation_errors.items()):
+        lines.append(f"validation_errors_total{{{_labels(route=route)}}} {count}")
+    lines += [
+        "# HELP internal_errors_total Requests failed by unhandled exceptions.",
+        "# TYPE internal_errors_total counter",
+    ]
+    for route, count in sorted(metrics.internal_errors.items()):
+        lines.append(f"internal_errors_total{{{_labels(route=route)}}} {count}")
+    lines += [
+        "# HELP requests_shed_total Requests rejected by admission control.",
+        "# TYPE requests_shed_total counter",
+    ]
+    for group, reasons in sorted(metrics.shed.items()):
+        for reason, count in sorted(reasons.items()):
+            labels = _labels(group=group, reason=reason)
+            lines.append(f"requests_shed_total{{{labels}}} {count}")
+    lines += [
+        "# HELP requests_rate_limited_total Requests rejected by rate limiting.",
+        "# TYPE requests_rate_limited_total counter",
+    ]
+    for group, count in sorted(metrics.rate_limited.items()):
+        lines.append(f"requests_rate_limited_total{{{_labels(group=group)}}} {count}")
+    return "\n".join(lines) + "\n"
+
+
+class MultiprocessExporter:
+    """Periodically writes this worker's snapshot into a shared directory."""
+
+    def __init__(self, metrics: Metrics, directory: str, interval: float):
+        self.metrics = metrics
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-exporter", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+
+    @property
+    def path(self) -> Path:
+        """Snapshot file of the current process."""
+        return self.directory / f"metrics-{os.getpid()}.json"
+
+    def write(self):
+        """Atomically write the current snapshot."""
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.metrics.snapshot()))
+        tmp.replace(self.path)
+
+    def stop(self):
+        """Write a final snapshot and stop the exporter thread."""
+        self._stop.set()
+        self.write()
+
+    def collect(self) -> Metrics:
+        """Merge the live local snapshot with every other worker's file."""
+        own = self.path
+        snapshots = [self.metrics.snapshot()]
+        for path in self.directory.glob("metrics-*.json"):
+            if path == own:
+                continue
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            if not pid_alive(snapshot.get("pid", 0)):
+                snapshot["in_flight"] = 0
+            snapshots.append(snapshot)
+        return merge_snapshots(snapshots)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process with ``pid`` is still running."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return pid > 0
+
+
+@lru_cache()
+def get_metrics() -> Metrics:
+    """Get the process-wide metrics registry."""
+    return Metrics()
+
+
+@lru_cache()
+def get_exporter() -> MultiprocessExporter | None:
+    """Get the multi-process exporter, or None when running single-process."""
+    config = get_settings().metrics
+    if not config.multiproc_dir:
+        return None
+    return MultiprocessExporter(
+        get_metrics(), config.multiproc_dir, config.flush_interval_seconds
+    )
+
+
+def collect_metrics() -> Metrics:
+    """Return metrics aggregated over every worker."""
+    exporter = get_exporter()
+    if exporter is None:
+        return get_metrics()
+    return exporter.collect()
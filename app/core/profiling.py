@@ -0,0 +1,196 @@
+"""
+On-demand per-request profiling.
+
+When ``PROFILING_ENABLED`` is set, requests carrying the profiling header
+(``x-profile: cpu``, ``memory`` or ``both``) or picked by the sampling rate
+run under cProfile and/or tracemalloc. The top-N functions by self time and
+the top-N allocation sites are kept in a bounded ring buffer exposed at
+``/admin/profiles``.
+
+Both profilers are process-wide: only one request is profiled at a time and
+concurrent candidates are skipped, and a CPU profile also includes whatever
+other coroutines ran on the event loop while the request was awaiting. When
+profiling is disabled no profiler exists and ``LoggingMiddleware`` pays a
+single ``is None`` check.
+"""
+
+import cProfile
+import pstats
+import random
+import time
+import tracemalloc
+from collections import deque
+from functools import lru_cache
+from typing import List
+
+from ..config.config import get_settings
+from .metrics import route_label
+
+PROFILE_KINDS = ("cpu", "memory", "both")
+
+
+class RequestProfiler:
+    """Profiles selected requests and keeps their summaries in a ring buffer.
+
+    Args:
+        header: Request header that asks for a profile, its value is the kind
+        sample_rate: Fraction of other requests profiled with ``sample_kind``
+        sample_kind: ``cpu``, ``memory`` or ``both``
+        top_n: Functions and allocation sites kept per profile
+        buffer_size: Profiles kept before the oldest are dropped
+    """
+
+    def __init__(
+        self,
+        header: str = "x-profile",
+        sample_rate: float = 0.0,
+        sample_kind: str = "cpu",
+        top_n: int = 20,
+        buffer_size: int = 100,
+    ):
+        if sample_kind not in PROFILE_KINDS:
+            raise ValueError(f"Unsupported profile kind: {sample_kind!r}")
+        self.header = header.lower().encode("latin-1")
+        self.sample_rate = sample_rate
+        self.sample_kind = sample_kind
+        self.top_n = top_n
+        self.profiles: deque = deque(maxlen=buffer_size)
+        self.profiled = 0
+        self.skipped = 0
+        self._busy = False
+
+    def select(self, scope: dict) -> str | None:
+        """Return the profile kind requested for ``scope``, if any."""
+        for name, value in scope["headers"]:
+            if name == self.header:
+                kind = value.decode("latin-1").strip().lower()
+                return kind if kind in PROFILE_KINDS else "cpu"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return self.sample_kind
+        return None
+
+    async def run(self, app, scope, receive, send, request_id: str):
+        """Call ``app``, profiling the request if it was selected."""
+        kind = self.select(scope)
+        if kind is None:
+            await app(scope, receive, send)
+            return
+        if self._busy or (kind != "cpu" and tracemalloc.is_tracing()):
+            self.skipped += 1
+            await app(scope, receive, send)
+            return
+
+        status = None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self._busy = True
+        profiler = cProfile.Profile() if kind != "memory" else None
+        if kind != "cpu":
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                await app(scope, receive, send_wrapper)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        finally:
+            duration = time.perf_counter() - start
+            snapshot = peak = None
+            if kind != "cpu":
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            self._busy = False
+            self._record(
+                scope, request_id, kind, status, duration, profiler, snapshot, peak
+            )
+
+    def _record(
+        self, scope, request_id, kind, status, duration, profiler, snapshot, peak
+    ):
+        entry = {
+            "request_id": request_id,
+            "timestamp": time.time(),
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route_label(scope),
+            "status": status,
+            "kind": kind,
+            "duration_ms": duration * 1000,
+        }
+        if profiler is not None:
+            entry["functions"] = self._top_functions(profiler)
+        if snapshot is not None:
+            entry["peak_memory_kb"] = peak / 1024
+            entry["allocations"] = self._top_allocations(snapshot)
+        self.profiles.append(entry)
+        self.profiled += 1
+
+    def _top_functions(self, profiler: cProfile.Profile) -> List[dict]:
+        stats = pstats.Stats(profiler).stats
+        ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)
+        return [
+            {
+                "function": function,
+                "file": filename,
+                "line": line,
+                "calls": calls,
+                "self_ms": self_time * 1000,
+                "cumulative_ms": cumulative * 1000,
+            }
+            for (filename, line, function), (_, calls, self_time, cumulative, _) in (
+                ranked[: self.top_n]
+            )
+        ]
+
+    def _top_allocations(self, snapshot: tracemalloc.Snapshot) -> List[dict]:
+        snapshot = snapshot.filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        return [
+            {
+                "file": stat.traceback[0].filename,
+                "line": stat.traceback[0].lineno,
+                "size_kb": stat.size / 1024,
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics("lineno")[: self.top_n]
+        ]
+
+    def clear(self):
+        """Drop every stored profile."""
+        self.profiles.clear()
+
+    def snapshot(self) -> dict:
+        """Return the profiler settings, counters and stored profiles."""
+        return {
+            "enabled": True,
+            "header": self.header.decode("latin-1"),
+            "sample_rate": self.sample_rate,
+            "profiled": self.profiled,
+            "skipped": self.skipped,
+            "profiles": list(self.profiles),
+        }
+
+
+@lru_cache()
+def get_profiler() -> RequestProfiler | None:
+    """Get the request profiler, or None when profiling is disabled."""
+    config = get_settings().profiling
+    if not config.enabled:
+        return None
+    return RequestProfiler(
+        header=config.header,
+        sample_rate=config.sample_rate,
+        sample_kind=config.sample_kind,
+        top_n=config.top_n,
+        buffer_size=config.buffer_size,
+    )
@@ -0,0 +1,231 @@
+"""
+Per-client rate limiting with token buckets.
+
+Requests are grouped by path prefix, like admission control, and every
+client gets a token bucket per group: it holds up to ``burst`` tokens, is
+refilled at ``rate`` tokens per second and every request takes one. A
+request finding the bucket empty gets a 429 with ``Retry-After`` and
+``X-RateLimit-*`` headers, in the error format of ``http_exception_handler``.
+Clients are identified by their IP address or by an API key header. Only
+configured (known) API keys get buckets of their own: requests without a
+key or with an unknown one are limited by IP address, so rotating made-up
+keys cannot reset a client's bucket. Paths outside the configured prefixes
+are not limited.
+
+A bucket is refilled lazily from the time of its last request, so checking
+a request is a dictionary lookup and some arithmetic. Buckets are kept in
+least recently used order and evicted lazily when new clients arrive:
+buckets idle long enough to be full again are dropped, since a new bucket
+behaves the same, and the least recently used bucket beyond ``max_clients``
+is dropped too, keeping memory bounded with many clients. Everything runs
+on the event loop, so no locks are needed; limits apply per worker process.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+from fastapi import HTTPException, Request
+
+from ..config.config import get_settings
+from .exceptions import http_exception_handler
+from .metrics import get_metrics
+
+# Idle buckets dropped at most per new client, keeps the check O(1)
+EVICTIONS_PER_INSERT = 8
+
+
+class TokenBuckets:
+    """Token buckets of every client of one route group."""
+
+    def __init__(self, name: str, rate: float, burst: float, max_clients: int):
+        if rate <= 0 or burst < 1:
+            raise ValueError(
+                f"Rate limit of {name!r} needs a positive rate and a burst of 1 or more"
+            )
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max(1, max_clients)
+        # Seconds for an empty bucket to be full again
+        self.refill_time = burst / rate
+        # client -> [tokens, time of the last request], least recent first
+        self.buckets: OrderedDict[str, List[float]] = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+        self.evicted = 0
+
+    def take(self, client: str, now: float) -> float:
+        """Take a token for ``client``.
+
+        Returns:
+            0 when the request is allowed, otherwise the seconds until the
+            bucket holds a token again
+        """
+        bucket = self.buckets.get(client)
+        if bucket is None:
+            self._evict(now)
+            self.buckets[client] = [self.burst - 1, now]
+            self.allowed += 1
+            return 0.0
+        self.buckets.move_to_end(client)
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            self.allowed += 1
+            return 0.0
+        bucket[0] = tokens
+        self.limited += 1
+        return (1 - tokens) / self.rate
+
+    def _evict(self, now: float):
+        buckets = self.buckets
+        for _ in range(EVICTIONS_PER_INSERT):
+            if not buckets:
+                return
+            oldest = next(iter(buckets.values()))
+            if now - oldest[1] < self.refill_time:
+                break
+            buckets.popitem(last=False)
+            self.evicted += 1
+        if len(buckets) >= self.max_clients:
+            buckets.popitem(last=False)
+            self.evicted += 1
+
+    def headers(self, retry_after: float) -> Dict[str, str]:
+        """Rate-limit headers of a rejected request."""
+        seconds = str(max(1, math.ceil(retry_after)))
+        return {
+            "Retry-After": seconds,
+            "X-RateLimit-Limit": str(int(self.burst)),
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": seconds,
+        }
+
+    def snapshot(self) -> dict:
+        """Return the group limits and counters."""
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "clients": len(self.buckets),
+            "max_clients": self.max_clients,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "evicted": self.evicted,
+        }
+
+
+class RateLimiter:
+    """Maps requests to route groups and clients to their token buckets.
+
+    Args:
+        limits: Path prefix -> ``{"rate": per second, "burst": tokens}``; the
+            longest matching prefix names the group
+        key: ``ip`` or ``api_key``, what identifies a client
+        api_key_header: Header holding the API key
+        api_keys: Known API keys, the only ones limited separately from
+            their IP address
+        max_clients: Buckets kept per group
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        limits: Dict[str, Dict[str, float]],
+        key: str = "ip",
+        api_key_header: str = "x-api-key",
+        api_keys: Iterable[str] = (),
+        max_clients: int = 10_000,
+    ):
+        if key not in ("ip", "api_key"):
+            raise ValueError(f"Unsupported rate limit key: {key}")
+        self.api_keys = frozenset(api_keys)
+        if key == "api_key" and not self.api_keys:
+            raise ValueError("Rate limiting by API key needs the known API keys")
+        # Longest prefixes first so the most specific group wins
+        self.prefixes = sorted(limits, key=len, reverse=True)
+        self.groups = {
+            prefix: TokenBuckets(
+                prefix, float(limit["rate"]), float(limit["burst"]), max_clients
+            )
+            for prefix, limit in limits.items()
+        }
+        self.key = key
+        self.api_key_header = api_key_header.lower().encode("latin-1")
+
+    def group_for(self, path: str) -> TokenBuckets | None:
+        """Token buckets limiting ``path``, or None for unlimited paths."""
+        for prefix in self.prefixes:
+            if path.startswith(prefix):
+                return self.groups[prefix]
+        return None
+
+    def client_for(self, scope: dict) -> str:
+        """Key identifying the client of a request."""
+        if self.key == "api_key":
+            for name, value in scope["headers"]:
+                if name == self.api_key_header:
+                    api_key = value.decode("latin-1")
+                    if api_key in self.api_keys:
+                        return "key:" + api_key
+                    break
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    def snapshot(self) -> dict:
+        """Return the state of every route group."""
+        return {
+            "key": self.key,
+            "groups": {name: group.snapshot() for name, group in self.groups.items()},
+        }
+
+
+class RateLimitMiddleware:
+    """ASGI middleware rejecting requests of clients over their rate limit."""
+
+    def __init__(self, app, limiter: RateLimiter | None = None):
+        self.app = app
+        self.limiter = limiter
+        self.metrics = get_metrics()
+
+    async def __call__(self, scope, receive, send):
+        if self.limiter is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        group = self.limiter.group_for(scope["path"])
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = group.take(self.limiter.client_for(scope), time.monotonic())
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+        self.metrics.count_rate_limited(group.name)
+        response = await http_exception_handler(
+            Request(scope),
+            HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded, retry later",
+                headers=group.headers(retry_after),
+            ),
+        )
+        await response(scope, receive, send)
+
+
+@lru_cache()
+def get_rate_limiter() -> RateLimiter | None:
+    """Get the rate limiter, or None when rate limiting is off."""
+    config = get_settings().rate_limit
+    if not config.enabled:
+        return None
+    return RateLimiter(
+        limits=config.limits,
+        key=config.key,
+        api_key_header=config.api_key_header,
+        api_keys=config.api_keys,
+        max_clients=config.max_clients,
+    )
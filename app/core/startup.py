@@ -0,0 +1,137 @@
+"""
+Startup lifecycle: phase timings and model warmup.
+
+A replica is only useful to the load balancer once its first requests are
+as fast as the following ones. Startup therefore runs in phases, each timed:
+
+- ``imports``: importing the application modules and building the app
+- ``config``: reading settings and configuring logging
+- ``model_load``: loading the active model, A/B variants and, without lazy
+  imports, every registered model flavor
+- ``warmup``: a configurable number of inferences per batch size through the
+  inference executor, which also starts its thread or process pool
+
+The worker reports ready (``/health/ready``) only after the warmup. With a
+background warmup the server accepts connections right after the model is
+loaded, so liveness probes pass, while readiness keeps traffic away until
+the warmup has finished. If the background warmup fails, the error is
+logged and reported by ``/health/ready``, which stays 503.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator, Sequence
+
+from ..ml.executor import InferenceExecutor, InferenceUnavailableError
+from ..ml.features import FeatureVector
+from ..ml.registry import LoadedModel
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimings:
+    """Durations of the startup phases of this worker."""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.warmup: dict | None = None
+        self.complete = False
+        self.error: str | None = None
+
+    def begin(self):
+        """Start a lifespan; imports happen once per process and are kept."""
+        self.complete = False
+        self.warmup = None
+        self.error = None
+
+    def record(self, name: str, seconds: float):
+        """Record the duration of a phase."""
+        self.phases[name] = seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as phase ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def finish(self):
+        """Mark startup as complete and log the phase durations."""
+        self.complete = True
+        logger.info(
+            "Startup completed in %.1fms (%s)",
+            sum(self.phases.values()) * 1000,
+            ", ".join(
+                f"{name} {seconds * 1000:.1f}ms"
+                for name, seconds in self.phases.items()
+            ),
+        )
+
+    def fail(self, error: BaseException):
+        """Record that startup failed and will not complete."""
+        self.error = f"{type(error).__name__}: {error}"
+
+    def snapshot(self) -> dict:
+        """Return the phase durations in milliseconds."""
+        return {
+            "complete": self.complete,
+            "error": self.error,
+            "phases_ms": {
+                name: seconds * 1000 for name, seconds in self.phases.items()
+            },
+            "total_ms": sum(self.phases.values()) * 1000,
+            "warmup": self.warmup,
+        }
+
+
+async def warm_up(
+    model: LoadedModel,
+    executor: InferenceExecutor,
+    requests: int,
+    batch_sizes: Sequence[int],
+) -> dict:
+    """Run ``requests`` inferences per batch size on the model's default vector.
+
+    Pool modes run as many inferences concurrently as the pool has workers,
+    so every worker starts and loads the model. Timed-out or rejected calls
+    are counted, not raised: a slow warmup must not keep the worker down.
+    """
+    vector = FeatureVector(model.schema.defaults.copy())
+    parallel = 1
+    if executor.mode != "inline":
+        parallel = max(1, min(executor.workers, executor.queue_limit))
+    inferences = 0
+    failed = 0
+    for size in batch_sizes:
+        vectors = [vector] * max(1, size)
+        for start in range(0, requests, parallel):
+            calls = min(parallel, requests - start)
+            results = await asyncio.gather(
+                *(executor.predict(model, vectors) for _ in range(calls)),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, InferenceUnavailableError):
+                    failed += 1
+                elif isinstance(result, BaseException):
+                    raise result
+                else:
+                    inferences += 1
+    if failed:
+        logger.warning("%d of %d warmup inferences failed", failed, inferences + failed)
+    return {
+        "inferences": inferences,
+        "failed": failed,
+        "batch_sizes": list(batch_sizes),
+    }
+
+
+@lru_cache()
+def get_startup_timings() -> StartupTimings:
+    """Get the startup timings of the current worker."""
+    return StartupTimings()
@@ -0,0 +1,199 @@
+"""
+Streaming helpers for newline-delimited JSON (NDJSON) endpoints.
+
+Request bodies are consumed incrementally and responses are produced as the
+body is read, so memory stays bounded by the chunk size rather than the
+payload size and backpressure follows the client's read rate.
+"""
+
+import json
+from typing import AsyncIterator, List, Sequence, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from ..ml.feature_store import FeatureStore, missing_features_error
+from ..ml.features import FeatureSchemaError
+from ..schemas.lead_scoring_request import LeadScoringRequest
+from ..schemas.lead_scoring_response import LeadScoringResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class LineTooLongError(ValueError):
+    """Raised for a line exceeding the configured maximum size."""
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """Streaming response whose body generator also reads the request body.
+
+    ``StreamingResponse`` normally listens for ``http.disconnect`` on
+    ``receive`` while streaming, which would swallow request body messages.
+    Here the generator owns ``receive`` and surfaces disconnects itself.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_ndjson_lines(
+    stream: AsyncIterator[bytes], max_line_bytes: int
+) -> AsyncIterator[Tuple[int, bytes | LineTooLongError]]:
+    """Yield ``(line_number, line)`` pairs from a byte stream.
+
+    Blank lines are skipped but still counted. Lines longer than
+    ``max_line_bytes`` are yielded as ``LineTooLongError`` and their
+    remainder is discarded without being buffered.
+    """
+    line_number = 0
+    buffer = bytearray()
+    skipping = False
+
+    try:
+        async for data in stream:
+            start = 0
+            while True:
+                end = data.find(b"\n", start)
+                if end == -1:
+                    if not skipping:
+                        buffer += data[start:]
+                        if len(buffer) > max_line_bytes:
+                            skipping = True
+                            buffer.clear()
+                    break
+
+                line_number += 1
+                if skipping:
+                    skipping = False
+                    yield line_number, LineTooLongError(
+                        f"Line exceeds {max_line_bytes} bytes"
+                    )
+                else:
+                    buffer += data[start:end]
+                    if len(buffer) > max_line_bytes:
+                        yield line_number, LineTooLongError(
+                            f"Line exceeds {max_line_bytes} bytes"
+                        )
+                    elif buffer.strip():
+                        yield line_number, bytes(buffer)
+                    buffer.clear()
+                start = end + 1
+    except ClientDisconnect:
+        return
+
+    line_number += 1
+    if skipping:
+        yield line_number, LineTooLongError(f"Line exceeds {max_line_bytes} bytes")
+    elif buffer.strip():
+        yield line_number, bytes(buffer)
+
+
+def parse_ndjson_chunk(
+    chunk: Sequence[Tuple[int, bytes | LineTooLongError]],
+    model,
+    store: FeatureStore | None = None,
+) -> Tuple[List[str | None], List[Tuple[int, LeadScoringRequest]], list]:
+    """Validate and vectorize one chunk of NDJSON lines.
+
+    Lines without ``features`` are completed from ``store`` with one bulk
+    lookup per chunk, and the stored features are set on their request.
+    Returns the output lines with error records filled in
+    and ``None`` placeholders for valid lines, the ``(position, request)``
+    pairs of the valid lines and their feature vectors, ready for a single
+    predict call.
+    """
+    outputs: List[str | None] = []
+    parsed: List[Tuple[int, LeadScoringRequest]] = []
+    for line_number, line in chunk:
+        if isinstance(line, LineTooLongError):
+            outputs.append(_error_line(line_number, "line_too_long", str(line)))
+            continue
+        try:
+            lead = LeadScoringRequest.model_validate_json(line)
+        except ValidationError as exc:
+            outputs.append(
+                _error_line(
+                    line_number,
+                    "validation_error",
+                    jsonable_encoder(exc.errors(include_url=False)),
+                )
+            )
+            continue
+        parsed.append((len(outputs), lead))
+        outputs.append(None)
+
+    lookups = [lead.lead_id for _, lead in parsed if lead.features is None]
+    found = store.get_many(lookups) if store is not None and lookups else {}
+
+    valid: List[Tuple[int, LeadScoringRequest]] = []
+    vectors = []
+    for position, lead in parsed:
+        line_number = chunk[position][0]
+        features = lead.features
+        if features is None:
+            features = lead.features = found.get(lead.lead_id)
+        if features is None:
+            errors = [missing_features_error((), store)]
+        else:
+            try:
+                vectors.append(model.vectorize(features))
+            except FeatureSchemaError as exc:
+                errors = exc.errors
+            else:
+                valid.append((position, lead))
+                continue
+        outputs[position] = _error_line(
+            line_number, "validation_error", jsonable_encoder(errors)
+        )
+    return outputs, valid, vectors
+
+
+def render_ndjson_chunk(
+    chunk: Sequence[Tuple[int, bytes | LineTooLongError]],
+    outputs: List[str | None],
+    valid: List[Tuple[int, LeadScoringRequest]],
+    scores: Sequence[float] | None = None,
+    error: str | None = None,
+) -> Tuple[bytes, int]:
+    """Fill in the valid lines of a parsed chunk and encode it as NDJSON.
+
+    Valid lines get their score, or an ``inference_unavailable`` error record
+    with ``error`` as details when ``scores`` is None. Returns the encoded
+    chunk together with the number of error records.
+    """
+    if scores is None:
+        for position, _ in valid:
+            outputs[position] = _error_line(
+                chunk[position][0], "inference_unavailable", error
+            )
+        return ("\n".join(outputs) + "\n").encode(), len(chunk)
+
+    for (position, lead), value in zip(valid, scores):
+        outputs[position] = LeadScoringResponse(
+            lead_id=lead.lead_id, score=value
+        ).model_dump_json()
+    return ("\n".join(outputs) + "\n").encode(), len(chunk) - len(valid)
+
+
+def score_ndjson_chunk(
+    chunk: Sequence[Tuple[int, bytes | LineTooLongError]], model
+) -> Tuple[bytes, int]:
+    """Validate and score one chunk of NDJSON lines with a single predict call.
+
+    Returns one NDJSON output line per input line, in input order: a
+    ``LeadScoringResponse`` for valid lines and an error record otherwise,
+    together with the number of error records.
+    """
+    outputs, valid, vectors = parse_ndjson_chunk(chunk, model)
+    scores = model.score_batch(vectors).tolist() if valid else []
+    return render_ndjson_chunk(chunk, outputs, valid, scores)
+
+
+def _error_line(line_number: int, error: str, details) -> str:
+    return json.dumps({"line": line_number, "error": error, "details": details})
@@ -0,0 +1,479 @@
+"""
+Request tracing with W3C trace-context propagation.
+
+``LoggingMiddleware`` gives every request an id: the inbound ``x-request-id``
+when the caller sent one, otherwise a new random 32-hex-digit id. The id is
+stored in the ASGI scope (``get_request_id(scope)`` reads it back) instead of
+being appended to a copy of the header list.
+
+When tracing is enabled, a request is traced if its inbound ``traceparent``
+is sampled (and ``parent_based`` is on) or if it is picked by
+``sample_rate``. A traced request continues the caller's trace, or starts
+one whose id is the request id, and records timed spans:
+
+- ``middleware``: the whole request, from the logging middleware
+- ``validation``: decoding and validating the request body
+- ``feature_assembly``: feature store lookups and feature vectors
+- ``inference``: the prediction cache and the model
+- ``serialization``: encoding the response
+
+The response of a traced request carries a ``traceparent`` header. Finished
+traces are kept in a bounded in-process buffer exposed at ``/admin/traces``
+and, optionally, queued to a background thread that appends their spans to
+a JSONL file or posts them to an OTLP/HTTP collector in OTLP JSON.
+
+Code records spans with ``with span("name"):``. For requests that are not
+traced ``span`` returns a shared no-op context manager, so untraced
+requests allocate nothing for tracing.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from ..config.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = b"x-request-id"
+TRACEPARENT_HEADER = b"traceparent"
+# Longer inbound request ids are replaced with a generated one
+MAX_REQUEST_ID_LENGTH = 128
+
+_HEX_DIGITS = frozenset("0123456789abcdef")
+_current: ContextVar["Trace | None"] = ContextVar("trace", default=None)
+
+
+def new_request_id() -> str:
+    """A random request id, also valid as a W3C trace id."""
+    return os.urandom(16).hex()
+
+
+def inbound_ids(scope: dict) -> Tuple[str | None, bytes | None]:
+    """Inbound ``x-request-id`` and raw ``traceparent`` of a request."""
+    request_id = traceparent = None
+    for name, value in scope["headers"]:
+        if name == REQUEST_ID_HEADER:
+            if 0 < len(value) <= MAX_REQUEST_ID_LENGTH:
+                request_id = value.decode("latin-1")
+        elif name == TRACEPARENT_HEADER:
+            traceparent = value
+    return request_id, traceparent
+
+
+def get_request_id(scope: dict) -> str:
+    """Id of a request, as assigned by ``LoggingMiddleware``.
+
+    Apps without the middleware fall back to the inbound header.
+    """
+    value = scope.get("request_id")
+    if value is None:
+        for name, header in scope.get("headers", ()):
+            if name == REQUEST_ID_HEADER:
+                return header.decode("latin-1")
+        return "unknown"
+    return value
+
+
+def _is_hex(value: str, length: int) -> bool:
+    return len(value) == length and _HEX_DIGITS.issuperset(value)
+
+
+def parse_traceparent(value: bytes | None) -> Tuple[str, str, bool] | None:
+    """``(trace_id, parent_id, sampled)`` of a W3C traceparent, None if invalid."""
+    if value is None:
+        return None
+    parts = value.decode("latin-1").strip().lower().split("-")
+    if len(parts) < 4 or parts[0] == "ff" or not _is_hex(parts[0], 2):
+        return None
+    # Version 00 has exactly four fields, later versions may append more
+    if parts[0] == "00" and len(parts) != 4:
+        return None
+    trace_id, parent_id, flags = parts[1:4]
+    if not (_is_hex(trace_id, 32) and _is_hex(parent_id, 16) and _is_hex(flags, 2)):
+        return None
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+class _NoopSpan:
+    """Span returned for untraced requests, shared by all of them."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def set(self, **_attributes):
+        """Ignore attributes."""
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """A timed operation of a traced request."""
+
+    __slots__ = ("trace", "name", "span_id", "parent_id", "start", "end", "attributes")
+
+    def __init__(self, trace: "Trace", name: str):
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id: str | None = None
+        self.start = 0
+        self.end = 0
+        self.attributes: Dict[str, object] = {}
+
+    def __enter__(self):
+        self.parent_id = self.trace.active
+        self.trace.active = self.span_id
+        self.start = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, _exc, _traceback):
+        self.end = time.time_ns()
+        self.trace.active = self.parent_id
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.trace.spans.append(self)
+        return False
+
+    def set(self, **attributes):
+        """Add attributes to the span."""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        """Serialize the span with its trace and request ids."""
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "request_id": self.trace.request_id,
+            "name": self.name,
+            "start_ns": self.start,
+            "end_ns": self.end,
+            "duration_ms": (self.end - self.start) / 1e6,
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """Spans recorded for one traced request."""
+
+    __slots__ = ("trace_id", "request_id", "active", "spans")
+
+    def __init__(self, trace_id: str, request_id: str, parent_id: str | None):
+        self.trace_id = trace_id
+        self.request_id = request_id
+        # Span id new spans are children of, the caller's span at first
+        self.active = parent_id
+        self.spans: List[Span] = []
+
+    def span(self, name: str) -> Span:
+        """A new span of this trace."""
+        return Span(self, name)
+
+    def traceparent(self, span_id: str) -> bytes:
+        """Outgoing ``traceparent`` header value naming ``span_id``."""
+        return f"00-{self.trace_id}-{span_id}-01".encode("latin-1")
+
+    def to_dict(self) -> dict:
+        """Serialize the trace with its spans in completion order."""
+        return {
+            "trace_id": self.trace_id,
+            "request_id": self.request_id,
+            "spans": [item.to_dict() for item in self.spans],
+        }
+
+
+def activate(trace: Trace):
+    """Make ``trace`` the current request's trace, returning a reset token."""
+    return _current.set(trace)
+
+
+def deactivate(token):
+    """Restore the trace that was current before ``activate``."""
+    _current.reset(token)
+
+
+def span(name: str) -> Span | _NoopSpan:
+    """Span ``name`` of the current request's trace, a no-op when untraced."""
+    trace = _current.get()
+    if trace is None:
+        return NOOP_SPAN
+    return Span(trace, name)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(item: dict) -> dict:
+    attributes = {"request_id": item["request_id"], **item["attributes"]}
+    exported = {
+        "traceId": item["trace_id"],
+        "spanId": item["span_id"],
+        "name": item["name"],
+        # SERVER for the request, INTERNAL for the rest
+        "kind": 2 if item["name"] == "middleware" else 1,
+        "startTimeUnixNano": str(item["start_ns"]),
+        "endTimeUnixNano": str(item["end_ns"]),
+        "attributes": [
+            {"key": key, "value": _otlp_value(value)}
+            for key, value in attributes.items()
+        ],
+        # ERROR for spans left by an exception, UNSET otherwise
+        "status": {"code": 2 if "error" in attributes else 0},
+    }
+    if item["parent_id"]:
+        exported["parentSpanId"] = item["parent_id"]
+    return exported
+
+
+def otlp_payload(spans: List[dict], service_name: str) -> dict:
+    """OTLP/HTTP JSON ``ExportTraceServiceRequest`` of serialized spans."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": service_name}}
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": __name__},
+                        "spans": [_otlp_span(item) for item in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class SpanExporter:
+    """Writes finished traces from a background thread.
+
+    Args:
+        exporter: ``file`` appends spans as JSON lines to ``path``, ``otlp``
+            posts them in OTLP JSON to ``endpoint``
+        path: JSONL file of the ``file`` exporter
+        endpoint: OTLP/HTTP traces URL of the ``otlp`` exporter
+        service_name: ``service.name`` resource attribute of OTLP exports
+        queue_size: Traces waiting for export; more are dropped and counted
+        batch_size: Traces per write, at most
+        flush_interval_seconds: How long a write waits for more traces
+        timeout_seconds: Timeout of OTLP requests
+    """
+
+    _STOP = object()
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(
+        self,
+        exporter: str,
+        path: str = "data/traces.jsonl",
+        endpoint: str = "http://localhost:4318/v1/traces",
+        service_name: str = "mlflow-fastapi-backend",
+        queue_size: int = 10_000,
+        batch_size: int = 256,
+        flush_interval_seconds: float = 1.0,
+        timeout_seconds: float = 5.0,
+    ):
+        if exporter not in ("file", "otlp"):
+            raise ValueError(f"Unsupported trace exporter: {exporter!r}")
+        self.exporter = exporter
+        self.path = Path(path)
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_seconds
+        self.timeout = timeout_seconds
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        if exporter == "file":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._run, name="span-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, trace: Trace) -> bool:
+        """Queue a finished trace, False if it was dropped."""
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def stop(self, timeout: float = 10.0):
+        """Export everything queued so far and stop the background thread."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+
+    def snapshot(self) -> dict:
+        """Return the exporter's backlog and counters."""
+        return {
+            "exporter": self.exporter,
+            "target": str(self.path) if self.exporter == "file" else self.endpoint,
+            "backlog": self._queue.qsize(),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    def _run(self):
+        while True:
+            traces = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while traces[-1] is not self._STOP and len(traces) < self.batch_size:
+                try:
+                    traces.append(
+                        self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    )
+                except queue.Empty:
+                    break
+            stopping = traces[-1] is self._STOP
+            if stopping:
+                traces.pop()
+            if traces:
+                self._export(traces)
+            if stopping:
+                return
+
+    def _export(self, traces: List[Trace]):
+        spans = [item.to_dict() for trace in traces for item in trace.spans]
+        try:
+            if self.exporter == "file":
+                with open(self.path, "a", encoding="utf-8") as handle:
+                    handle.write("".join(json.dumps(item) + "\n" for item in spans))
+            else:
+                request = urllib.request.Request(
+                    self.endpoint,
+                    data=json.dumps(otlp_payload(spans, self.service_name)).encode(),
+                    headers={"Content-Type": "application/json"},
+                    method="POST",
+                )
+                with urllib.request.urlopen(request, timeout=self.timeout):
+                    pass
+        except Exception:  # pylint: disable=broad-exception-caught
+            # Keep the thread alive, the collector may come back
+            self.failed += len(traces)
+            logger.warning("Failed to export %d traces", len(traces), exc_info=True)
+            return
+        self.exported += len(traces)
+
+
+class Tracer:
+    """Decides which requests are traced and keeps their finished traces.
+
+    Args:
+        sample_rate: Fraction of requests traced without a sampled parent
+        parent_based: Trace requests whose inbound ``traceparent`` is sampled
+        buffer_size: Finished traces kept before the oldest are dropped
+        exporter: Optional exporter finished traces are queued to
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        parent_based: bool = True,
+        buffer_size: int = 1000,
+        exporter: SpanExporter | None = None,
+    ):
+        self.sample_rate = sample_rate
+        self.parent_based = parent_based
+        self.traces: deque = deque(maxlen=max(1, buffer_size))
+        self.exporter = exporter
+        self.sampled = 0
+
+    def start(self, request_id: str, traceparent: bytes | None) -> Trace | None:
+        """Start the trace of a request, or None when it is not sampled."""
+        parent = parse_traceparent(traceparent) if traceparent is not None else None
+        if parent is not None and self.parent_based:
+            if not parent[2]:
+                return None
+        elif not (self.sample_rate and random.random() < self.sample_rate):
+            return None
+        self.sampled += 1
+        if parent is not None:
+            return Trace(parent[0], request_id, parent[1])
+        trace_id = request_id if _is_hex(request_id, 32) else new_request_id()
+        return Trace(trace_id, request_id, None)
+
+    def finish(self, trace: Trace):
+        """Buffer a finished trace and queue it for export."""
+        self.traces.append(trace)
+        if self.exporter is not None:
+            self.exporter.submit(trace)
+
+    def stop(self):
+        """Export the queued traces and stop the exporter."""
+        if self.exporter is not None:
+            self.exporter.stop()
+
+    def recent(self, limit: int) -> List[dict]:
+        """The most recent finished traces, newest last."""
+        traces = list(self.traces)[-limit:] if limit > 0 else []
+        return [trace.to_dict() for trace in traces]
+
+    def snapshot(self) -> dict:
+        """Return the sampling settings and counters."""
+        return {
+            "sample_rate": self.sample_rate,
+            "parent_based": self.parent_based,
+            "sampled": self.sampled,
+            "buffered": len(self.traces),
+            "buffer_size": self.traces.maxlen,
+            "export": None if self.exporter is None else self.exporter.snapshot(),
+        }
+
+
+@lru_cache()
+def get_tracer() -> Tracer | None:
+    """Get the request tracer, or None when tracing is disabled."""
+    config = get_settings().tracing
+    if not config.enabled:
+        return None
+    exporter = None
+    if config.exporter != "none":
+        exporter = SpanExporter(
+            config.exporter,
+            path=config.export_path,
+            endpoint=config.otlp_endpoint,
+            service_name=config.service_name,
+            queue_size=config.export_queue_size,
+            batch_size=config.export_batch_size,
+            flush_interval_seconds=config.export_interval_seconds,
+        )
+    return Tracer(
+        sample_rate=config.sample_rate,
+        parent_based=config.parent_based,
+        buffer_size=config.buffer_size,
+        exporter=exporter,
+    )
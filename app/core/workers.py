@@ -0,0 +1,112 @@
+"""
+Per-worker readiness reporting.
+
+Every server worker tracks whether it has finished loading its model and is
+ready for traffic. When several workers share a state directory each one
+writes its status to ``worker-<pid>.json`` there, so any worker can report
+the readiness of the whole group.
+"""
+
+import json
+import logging
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import List
+
+from ..config.config import get_settings
+from .metrics import pid_alive
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerStatus:
+    """Readiness of the current worker process."""
+
+    def __init__(self, directory: str | None = None):
+        self.directory = Path(directory) if directory else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.pid = os.getpid()
+        self.started_at = time.time()
+        self.ready = False
+        self.ready_at: float | None = None
+        self.model: dict | None = None
+        self.error: str | None = None
+
+    @property
+    def path(self) -> Path | None:
+        """Status file of the current process, if a state directory is set."""
+        if self.directory is None:
+            return None
+        return self.directory / f"worker-{self.pid}.json"
+
+    def mark_ready(self, name: str, version: str, shared_weights: bool):
+        """Record that the worker loaded its model and accepts traffic."""
+        self.ready = True
+        self.ready_at = time.time()
+        self.error = None
+        self.model = {
+            "name": name,
+            "version": version,
+            "shared_weights": shared_weights,
+        }
+        self.write()
+        logger.info("Worker %s ready", self.pid)
+
+    def mark_failed(self, error: str):
+        """Record that the worker cannot become ready."""
+        self.ready = False
+        self.error = error
+        self.write()
+
+    def mark_stopping(self):
+        """Record that the worker no longer accepts traffic."""
+        self.ready = False
+        self.write()
+
+    def snapshot(self) -> dict:
+        """Return the worker status as a JSON-serializable dict."""
+        return {
+            "pid": self.pid,
+            "ready": self.ready,
+            "started_at": self.started_at,
+            "ready_at": self.ready_at,
+            "model": self.model,
+            "error": self.error,
+        }
+
+    def write(self):
+        """Atomically publish the status into the state directory."""
+        if self.path is None:
+            return
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.snapshot()))
+        tmp.replace(self.path)
+
+    def collect(self) -> List[dict]:
+        """Statuses of every worker sharing the state directory.
+
+        Workers whose process exited are reported as not ready.
+        """
+        statuses = [self.snapshot()]
+        if self.directory is None:
+            return statuses
+        for path in sorted(self.directory.glob("worker-*.json")):
+            if path == self.path:
+                continue
+            try:
+                status = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            if not pid_alive(status.get("pid", 0)):
+                status["ready"] = False
+            statuses.append(status)
+        return statuses
+
+
+@lru_cache()
+def get_worker_status() -> WorkerStatus:
+    """Get the readiness tracker of the current worker."""
+    return WorkerStatus(get_settings().server.state_dir)
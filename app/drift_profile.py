@@ -0,0 +1,81 @@
+"""
+Reference drift profile command-line entry point.
+
+Scores a JSONL sample of ``LeadScoringRequest`` records (typically the
+training or validation set) and stores the feature and score histograms as
+the model version's reference profile, ``drift_profile.json`` next to its
+``MLmodel``. The drift endpoint compares live traffic against it::
+
+    python -m app.drift_profile training.jsonl --bins 10
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List
+
+from .bulk_score import find_input_files, iter_chunks, open_registry
+from .config.config import get_settings
+from .core.streaming import parse_ndjson_chunk
+from .ml.drift import PROFILE_FILE, ModelDrift
+from .ml.registry import ModelLoadError
+
+
+def build_profile(files: List[Path], model, bins: int, chunk_size: int = 1000) -> tuple:
+    """Score every valid record and return its profile and the row count."""
+    drift = ModelDrift(model, bins)
+    rows = 0
+    for chunk in iter_chunks(files, chunk_size):
+        _, valid, vectors = parse_ndjson_chunk(chunk, model)
+        if not valid:
+            continue
+        scores = model.score_batch(vectors).tolist()
+        # The first chunk fixes the bin edges, later chunks fill the histograms
+        drift.observe([lead.features for _, lead in valid], vectors, scores)
+        drift.fold()
+        rows += len(valid)
+    return drift.profile(), rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Parse arguments and write the reference profile."""
+    config = get_settings()
+    parser = argparse.ArgumentParser(
+        prog="python -m app.drift_profile",
+        description="Store the drift reference profile of a model version.",
+    )
+    parser.add_argument("input", type=Path, help="JSONL file or directory of shards")
+    parser.add_argument(
+        "-o", "--output", type=Path, help="Profile path (default: the model directory)"
+    )
+    parser.add_argument("--bins", type=int, default=config.drift.bins)
+    parser.add_argument(
+        "--chunk-size", type=int, default=10_000, help="Records per predict call"
+    )
+    parser.add_argument("--artifact-root", default=config.model.artifact_root)
+    parser.add_argument("--model-name", default=config.model.name)
+    parser.add_argument("--model-version", default=config.model.version)
+    args = parser.parse_args(argv)
+
+    try:
+        model = open_registry(
+            args.artifact_root, args.model_name, args.model_version
+        ).load(args.model_version)
+    except ModelLoadError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    files = find_input_files(args.input)
+    if not files:
+        print(f"error: No JSONL input found at {args.input}", file=sys.stderr)
+        return 1
+
+    profile, rows = build_profile(files, model, max(1, args.bins), args.chunk_size)
+    output = args.output or model.path / PROFILE_FILE
+    output.write_text(json.dumps(profile, indent=2))
+    print(f"profiled {rows} records into {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,27 +6,149 @@ It sets up the API routes, health checks, and server startup configuration
 using Pydantic Settings for environment-based configuration management.
 """
 
+import time
+
+_imports_started = time.perf_counter()
+
+# pylint: disable=wrong-import-position
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from .core.logging import configure_logging, LoggingMiddleware
+from starlette.concurrency import run_in_threadpool
+from .config.config import get_settings
+from .core.logging import configure_logging, shutdown_logging, LoggingMiddleware
 from .core.exceptions import register_exception_handlers
+from .core.admission import AdmissionMiddleware, get_admission_controller
+from .core.metrics import get_exporter
+from .core.profiling import get_profiler
+from .core.rate_limit import RateLimitMiddleware, get_rate_limiter
+from .core.startup import get_startup_timings, warm_up
+from .core.tracing import get_tracer
+from .core.workers import get_worker_status
+from .ml.audit import get_audit_sink
+from .ml.executor import get_executor
+from .ml.feature_store import get_feature_store
+from .ml.flavors import import_flavors
+from .ml.registry import get_model_registry
+from .ml.routing import get_model_router
+from .routers.admin import router as admin_router
 from .routers.health import router as health_router
 from .routers.lead_scoring import router as lead_scoring_router
+from .routers.metrics import router as metrics_router
+
+
+def _configure_logging():
+    log_config = get_settings().log
+    configure_logging(
+        level=log_config.level,
+        mode=log_config.mode,
+        queue_size=log_config.queue_size,
+        overflow=log_config.overflow,
+        batch_size=log_config.batch_size,
+        error_first_occurrences=log_config.error_first_occurrences,
+        error_sample_rates=log_config.error_sample_rates,
+        error_summary_interval_seconds=log_config.error_summary_interval_seconds,
+    )
+
+
+logger = logging.getLogger(__name__)
+
+
+async def _warm_up_and_mark_ready(model):
+    """Run the warmup inferences, then report the worker ready."""
+    config = get_settings().startup
+    timings = get_startup_timings()
+    with timings.phase("warmup"):
+        timings.warmup = await warm_up(
+            model,
+            get_executor(),
+            config.warmup_requests,
+            config.warmup_batch_sizes,
+        )
+    get_worker_status().mark_ready(model.name, model.version, model.shared_weights)
+    timings.finish()
+
+
+def _report_warmup_failure(task: asyncio.Task):
+    """Log a failed background warmup and report it on ``/health/ready``."""
+    if task.cancelled() or task.exception() is None:
+        return
+    error = task.exception()
+    logger.error("Background warmup failed", exc_info=error)
+    timings = get_startup_timings()
+    timings.fail(error)
+    get_worker_status().mark_failed(timings.error)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Load and warm up the configured model before reporting ready."""
+    timings = get_startup_timings()
+    timings.begin()
+    with timings.phase("config"):
+        _configure_logging()
+        config = get_settings().startup
+    with timings.phase("model_load"):
+        model = get_model_registry().preload()
+        # Load A/B variants and the shadow candidate before serving traffic too
+        model_router = get_model_router()
+        if not config.lazy_imports:
+            import_flavors()
+    audit = get_audit_sink()
+    # Opening may rebuild the store from its snapshot, keep it off the event
+    # loop and out of the first request
+    await run_in_threadpool(get_feature_store)
+    # Start sharing this worker's metrics when running multi-process
+    get_exporter()
+    status = get_worker_status()
+    warmup = None
+    if config.background_warmup:
+        # Serve liveness probes right away, readiness waits for the warmup
+        warmup = asyncio.create_task(_warm_up_and_mark_ready(model))
+        warmup.add_done_callback(_report_warmup_failure)
+    else:
+        await _warm_up_and_mark_ready(model)
+    yield
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+    status.mark_stopping()
+    if model_router is not None:
+        model_router.close()
+    get_executor().shutdown()
+    if audit is not None:
+        # Write the buffered audit records before the process exits
+        audit.stop()
+    tracer = get_tracer()
+    if tracer is not None:
+        # Export the queued spans before the process exits
+        tracer.stop()
+    # Flush queued log records before the process exits
+    shutdown_logging()
 
-configure_logging()
 
 # Create the FastAPI instance
 app = FastAPI(
     title="MLFlow FastAPI Backend",
     description="A minimal FastAPI app for ML model serving and API endpoints",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Exception Handlers
 register_exception_handlers(app)
 
 # Middleware
-app.add_middleware(LoggingMiddleware)
+# Added first so it runs inside LoggingMiddleware and shed requests are logged
+app.add_middleware(AdmissionMiddleware, controller=get_admission_controller())
+# Rate-limited requests are rejected before taking an admission slot
+app.add_middleware(RateLimitMiddleware, limiter=get_rate_limiter())
+app.add_middleware(LoggingMiddleware, profiler=get_profiler(), tracer=get_tracer())
 
 # Routers
 app.include_router(health_router)
 app.include_router(lead_scoring_router)
+app.include_router(admin_router)
+app.include_router(metrics_router)
+
+get_startup_timings().record("imports", time.perf_counter() - _imports_started)
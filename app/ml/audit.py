@@ -0,0 +1,354 @@
+"""
+Asynchronous audit trail of served predictions.
+
+Every score returned by the scoring endpoints is recorded with its
+``lead_id``, model version, a hash of the feature vector (or the full
+vector), the score, the scoring latency and the request id. Routes only
+queue a reference to the data they already hold; a background thread
+hashes, encodes and appends the records in bulk to local append-only files:
+
+- ``jsonl``: one JSON record per line
+- ``sqlite``: a ``predictions`` table, one transaction per flush
+
+Files are named ``predictions-<start time>-<pid>-<sequence>`` so workers
+never share one, and a new file is started once the current one exceeds
+``rotate_bytes`` or is older than ``rotate_seconds``. The queue is bounded;
+when it is full the ``block`` policy makes the request wait for the writer on
+a thread-pool thread, so the event loop keeps serving other requests
+(backpressure, nothing is lost), and ``drop`` discards and counts the
+record. Queued records are written when the sink is stopped on shutdown.
+"""
+
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Sequence
+
+from starlette.concurrency import run_in_threadpool
+
+from ..config.config import get_settings
+from .cache import feature_hash
+from .features import FeatureVector
+from .registry import LoadedModel
+
+logger = logging.getLogger(__name__)
+
+AUDIT_FORMATS = ("jsonl", "sqlite")
+
+COLUMNS = (
+    "timestamp",
+    "request_id",
+    "lead_id",
+    "model_name",
+    "model_version",
+    "features",
+    "score",
+    "latency_ms",
+)
+
+
+class RotatingWriter(ABC):
+    """Appends records to a file, starting a new one by size or age."""
+
+    suffix = ""
+
+    def __init__(self, directory: str, rotate_bytes: int, rotate_seconds: float):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.path: Path | None = None
+        self.opened_at = 0.0
+        self.files = 0
+
+    def write(self, rows: List[tuple]):
+        """Append rows, rotating to a new file first if needed."""
+        if self.path is None or self._should_rotate():
+            self.close()
+            self.files += 1
+            stamp = time.strftime("%Y%m%dT%H%M%S")
+            self.path = self.directory / (
+                f"predictions-{stamp}-{os.getpid()}-{self.files}{self.suffix}"
+            )
+            self.opened_at = time.monotonic()
+            self._open()
+        self._append(rows)
+
+    def _should_rotate(self) -> bool:
+        if time.monotonic() - self.opened_at >= self.rotate_seconds:
+            return True
+        return self.path.stat().st_size >= self.rotate_bytes
+
+    @abstractmethod
+    def _open(self):
+        """Create the file at ``self.path``."""
+
+    @abstractmethod
+    def _append(self, rows: List[tuple]):
+        """Append rows to the current file."""
+
+    def close(self):
+        """Close the current file."""
+
+
+class JSONLWriter(RotatingWriter):
+    """Writes records as JSON lines."""
+
+    suffix = ".jsonl"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._handle = None
+
+    def _open(self):
+        self._handle = open(self.path, "a", encoding="utf-8")
+
+    def _append(self, rows: List[tuple]):
+        self._handle.write(
+            "".join(json.dumps(dict(zip(COLUMNS, row))) + "\n" for row in rows)
+        )
+        self._handle.flush()
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class SQLiteWriter(RotatingWriter):
+    """Writes records into a ``predictions`` table."""
+
+    suffix = ".db"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._connection: sqlite3.Connection | None = None
+
+    def _open(self):
+        self._connection = sqlite3.connect(self.path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS predictions (timestamp REAL, "
+            "request_id TEXT, lead_id INTEGER, model_name TEXT, "
+            "model_version TEXT, features TEXT, score REAL, latency_ms REAL)"
+        )
+
+    def _append(self, rows: List[tuple]):
+        # Full feature mappings are stored as JSON text
+        rows = [
+            row if isinstance(row[5], str) else (*row[:5], json.dumps(row[5]), *row[6:])
+            for row in rows
+        ]
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO predictions VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class AuditSink:
+    """Bounded queue of prediction records flushed in bulk by a thread.
+
+    Args:
+        directory: Directory the audit files are written to
+        fmt: ``jsonl`` or ``sqlite``
+        features: ``hash`` stores a digest of the feature vector, ``full``
+            the feature values by name
+        buffer_size: Queued submissions; a batch or stream chunk is one
+        overflow: ``block`` or ``drop`` when the queue is full
+        batch_size: Records per flush, at most
+        flush_interval_seconds: How long a flush waits for more records
+        rotate_bytes: Size after which a new file is started
+        rotate_seconds: Age after which a new file is started
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        directory: str,
+        fmt: str = "jsonl",
+        features: str = "hash",
+        buffer_size: int = 10_000,
+        overflow: str = "block",
+        batch_size: int = 1000,
+        flush_interval_seconds: float = 1.0,
+        rotate_bytes: int = 100 * 1024 * 1024,
+        rotate_seconds: float = 3600.0,
+    ):
+        if fmt not in AUDIT_FORMATS:
+            raise ValueError(f"Unsupported audit format: {fmt!r}")
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"Unsupported overflow policy: {overflow!r}")
+        writer = JSONLWriter if fmt == "jsonl" else SQLiteWriter
+        self.writer = writer(directory, rotate_bytes, rotate_seconds)
+        self.format = fmt
+        self.full_features = features == "full"
+        self.overflow = overflow
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_seconds
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, buffer_size))
+        self.submitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+        self.total_flush_time = 0.0
+        self.last_flush_time = 0.0
+        self.max_flush_time = 0.0
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="audit-sink", daemon=True
+        )
+        self._thread.start()
+
+    async def record(
+        self,
+        request_id: str,
+        model: LoadedModel,
+        lead_ids: Sequence[int],
+        vectors: Sequence[FeatureVector],
+        scores: Sequence[float],
+        latency: float,
+    ) -> bool:
+        """Queue the predictions of one request, False if they were dropped.
+
+        The sequences are referenced, not copied, and must not be mutated
+        afterwards. With the ``block`` policy a full queue is waited on in the
+        thread pool, never on the event loop.
+        """
+        if self._closed:
+            self.dropped += len(lead_ids)
+            return False
+        item = (time.time(), request_id, model, lead_ids, vectors, scores, latency)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if self.overflow != "block":
+                self.dropped += len(lead_ids)
+                return False
+            await run_in_threadpool(self._queue.put, item)
+        self.submitted += len(lead_ids)
+        return True
+
+    def stop(self, timeout: float = 10.0):
+        """Write everything queued so far and stop the background thread."""
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+
+    def snapshot(self) -> dict:
+        """Return backlog, write and flush-latency counters."""
+        return {
+            "format": self.format,
+            "directory": str(self.writer.directory),
+            "current_file": str(self.writer.path) if self.writer.path else None,
+            "files": self.writer.files,
+            "overflow": self.overflow,
+            "buffer_size": self._queue.maxsize,
+            "backlog": self._queue.qsize(),
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "last_flush_ms": self.last_flush_time * 1000,
+            "max_flush_ms": self.max_flush_time * 1000,
+            "mean_flush_ms": (
+                self.total_flush_time / self.flushes * 1000 if self.flushes else 0.0
+            ),
+        }
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            records = 0 if items[0] is self._STOP else len(items[0][3])
+            deadline = time.monotonic() + self.flush_interval
+            while items[-1] is not self._STOP and records < self.batch_size:
+                try:
+                    item = self._queue.get(
+                        timeout=max(0.0, deadline - time.monotonic())
+                    )
+                except queue.Empty:
+                    break
+                items.append(item)
+                if item is not self._STOP:
+                    records += len(item[3])
+
+            stopping = items[-1] is self._STOP
+            if stopping:
+                items.pop()
+            if items:
+                self._flush(items)
+            if stopping:
+                # SQLite connections must be closed by the thread that opened them
+                self.writer.close()
+                return
+
+    def _flush(self, items: list):
+        start = time.perf_counter()
+        rows = []
+        for created, request_id, model, lead_ids, vectors, scores, latency in items:
+            latency_ms = round(latency * 1000, 3)
+            for lead_id, vector, value in zip(lead_ids, vectors, scores):
+                if self.full_features:
+                    features = dict(zip(model.feature_names, vector.values.tolist()))
+                else:
+                    features = feature_hash(vector).hex()
+                rows.append(
+                    (
+                        created,
+                        request_id,
+                        lead_id,
+                        model.name,
+                        model.version,
+                        features,
+                        value,
+                        latency_ms,
+                    )
+                )
+        try:
+            self.writer.write(rows)
+        except (OSError, sqlite3.Error):
+            # Keep the thread alive, the next flush may succeed on a new file
+            self.failed += len(rows)
+            logger.exception("Failed to write %d audit records", len(rows))
+            self.writer.close()
+            self.writer.path = None
+            return
+        elapsed = time.perf_counter() - start
+        self.written += len(rows)
+        self.flushes += 1
+        self.total_flush_time += elapsed
+        self.last_flush_time = elapsed
+        self.max_flush_time = max(self.max_flush_time, elapsed)
+
+
+@lru_cache()
+def get_audit_sink() -> AuditSink | None:
+    """Get the audit sink, or None when prediction auditing is disabled."""
+    config = get_settings().audit
+    if not config.enabled:
+        return None
+    return AuditSink(
+        directory=config.directory,
+        fmt=config.format,
+        features=config.features,
+        buffer_size=config.buffer_size,
+        overflow=config.overflow,
+        batch_size=config.batch_size,
+        flush_interval_seconds=config.flush_interval_seconds,
+        rotate_bytes=config.rotate_bytes,
+        rotate_seconds=config.rotate_seconds,
+    )
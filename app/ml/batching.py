@@ -0,0 +1,165 @@
+"""
+Adaptive micro-batching for concurrent single-lead scoring.
+
+Concurrent ``/lead-scoring/score`` calls are collected into one batch until
+``max_batch_size`` requests are pending or ``max_wait_ms`` has passed, then
+scored with a single vectorized predict call. The wait adapts to load: when
+the previous batch held a single request the next one is flushed on the next
+event-loop iteration, so sparse traffic does not pay the batching delay.
+"""
+
+import asyncio
+import time
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from ..config.config import get_settings
+from .executor import InferenceExecutor, get_executor
+from .features import FeatureVector
+from .registry import LoadedModel
+
+# Upper bounds of the batch-size histogram buckets, the last one is open-ended
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class BatcherStats:
+    """Running batch-size and queue-wait statistics."""
+
+    def __init__(self):
+        self.batches = 0
+        self.items = 0
+        self.max_batch_size = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.size_histogram = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    def record(self, size: int, waits_total: float, waits_max: float):
+        """Record one flushed batch."""
+        self.batches += 1
+        self.items += size
+        self.max_batch_size = max(self.max_batch_size, size)
+        self.total_wait += waits_total
+        self.max_wait = max(self.max_wait, waits_max)
+        for index, bound in enumerate(BATCH_SIZE_BUCKETS):
+            if size <= bound:
+                self.size_histogram[index] += 1
+                break
+        else:
+            self.size_histogram[-1] += 1
+
+    def snapshot(self) -> dict:
+        """Return the statistics as a JSON-serializable dict."""
+        labels = [f"<={bound}" for bound in BATCH_SIZE_BUCKETS]
+        labels.append(f">{BATCH_SIZE_BUCKETS[-1]}")
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "mean_queue_wait_ms": (
+                self.total_wait / self.items * 1000 if self.items else 0.0
+            ),
+            "max_queue_wait_ms": self.max_wait * 1000,
+            "batch_size_histogram": dict(zip(labels, self.size_histogram)),
+        }
+
+
+class MicroBatcher:
+    """Coalesces concurrent score calls into vectorized predict calls."""
+
+    def __init__(
+        self,
+        max_batch_size: int,
+        max_wait_ms: float,
+        enabled: bool = True,
+        executor: InferenceExecutor | None = None,
+    ):
+        self.executor = executor or InferenceExecutor("inline")
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.enabled = enabled
+        self.stats = BatcherStats()
+        self._pending: List[
+            Tuple[LoadedModel, FeatureVector, asyncio.Future, float]
+        ] = []
+        self._timer: asyncio.Handle | None = None
+        self._last_batch_size = 0
+        # Strong references to running batch tasks until they finish
+        self._tasks: set = set()
+
+    async def score(self, model: LoadedModel, vector: FeatureVector) -> float:
+        """Score one lead with ``model`` as part of the next batch.
+
+        The caller passes the model it vectorized the features with, so a
+        hot-swap between vectorizing and flushing cannot mix schemas.
+        """
+        if not self.enabled:
+            scores = await self.executor.predict(model, [vector])
+            return float(scores[0])
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((model, vector, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif len(self._pending) == 1:
+            if self._last_batch_size > 1:
+                self._timer = loop.call_later(self.max_wait, self._flush)
+            else:
+                self._timer = loop.call_soon(self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Score every pending request and resolve their futures."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self._last_batch_size = len(batch)
+
+        now = time.perf_counter()
+        waits = [now - enqueued for _, _, _, enqueued in batch]
+        self.stats.record(len(batch), sum(waits), max(waits))
+
+        # Requests only span several models right after a hot-swap
+        groups: Dict[int, list] = {}
+        for item in batch:
+            groups.setdefault(id(item[0]), []).append(item)
+        loop = asyncio.get_running_loop()
+        for items in groups.values():
+            task = loop.create_task(self._score_group(items[0][0], items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _score_group(self, model: LoadedModel, items: list):
+        try:
+            scores = await self.executor.predict(
+                model, [vector for _, vector, _, _ in items]
+            )
+            scores = scores.tolist()
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            for _, _, future, _ in items:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, _, future, _), value in zip(items, scores):
+            # Callers that went away (cancelled futures) are simply skipped
+            if not future.done():
+                future.set_result(value)
+
+
+@lru_cache()
+def get_batcher() -> MicroBatcher:
+    """Get the cached micro-batcher configured from settings."""
+    config = get_settings().batcher
+    return MicroBatcher(
+        max_batch_size=config.max_batch_size,
+        max_wait_ms=config.max_wait_ms,
+        enabled=config.enabled,
+        executor=get_executor(),
+    )
@@ -0,0 +1,122 @@
+"""
+In-memory prediction cache for repeated leads.
+
+Entries are keyed on the model version, the ``lead_id`` and a stable hash of
+the lead's feature vector, bounded in size with LRU eviction and expired
+after a TTL. When the active model version changes the whole cache is
+dropped, so stale scores never outlive a hot-swap.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Tuple
+
+from ..config.config import get_settings
+from .features import FeatureVector
+from .registry import LoadedModel
+
+
+def feature_hash(vector: FeatureVector) -> bytes:
+    """Stable digest of a feature vector's values."""
+    return hashlib.blake2b(vector.values.tobytes(), digest_size=16).digest()
+
+
+class PredictionCache:
+    """Size-bounded LRU cache of scores with TTL expiry."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.enabled = enabled and max_entries > 0
+        self._entries: OrderedDict = OrderedDict()
+        self._model_key: Tuple[str, str, float] | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def key(self, model: LoadedModel, lead_id: int, vector: FeatureVector) -> tuple:
+        """Build the cache key for a lead scored by ``model``.
+
+        ``loaded_at`` distinguishes re-loads of the same version, whose
+        artifacts may have been replaced on disk.
+        """
+        return (
+            model.name,
+            model.version,
+            model.loaded_at,
+            lead_id,
+            feature_hash(vector),
+        )
+
+    def get(self, key: tuple) -> float | None:
+        """Return the cached score for ``key`` or None on a miss."""
+        if not self.enabled:
+            return None
+        self._check_model(key)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        score, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return score
+
+    def put(self, key: tuple, score: float):
+        """Store a score, evicting the least recently used entries if full."""
+        if not self.enabled:
+            return
+        self._check_model(key)
+        self._entries[key] = (score, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every cached entry."""
+        self._entries.clear()
+
+    def _check_model(self, key: tuple):
+        model_key = key[:3]
+        if model_key != self._model_key:
+            if self._model_key is not None and self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._model_key = model_key
+
+    def snapshot(self) -> dict:
+        """Return cache counters as a JSON-serializable dict."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+@lru_cache()
+def get_prediction_cache() -> PredictionCache:
+    """Get the cached prediction cache configured from settings."""
+    config = get_settings().cache
+    return PredictionCache(
+        max_entries=config.max_entries,
+        ttl_seconds=config.ttl_seconds,
+        enabled=config.enabled,
+    )
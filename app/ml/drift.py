@@ -0,0 +1,408 @@
+"""
+Streaming feature and score drift statistics.
+
+For every feature of the model and for the output score the monitor keeps,
+in constant memory: the number of observed values, the missing rate, the
+mean and variance (Welford's algorithm, merged per batch with Chan's
+formula), min/max and a fixed-bin histogram from which quantiles are
+estimated. Bin edges come from the model's reference profile
+(``drift_profile.json`` next to ``MLmodel``) or, without one, from the
+quantiles of the first values observed: the monitor buffers at least
+``fold_size`` (and ``MIN_VALUES_PER_BIN`` per bin) values of a column before
+deriving its edges, so a few early rows cannot fix them for good. Values
+outside the edges fall into open-ended outer bins.
+
+Requests only append references to their features, vectors and scores to a
+pending list. The list is folded into the statistics with a few vectorized
+NumPy operations every ``fold_size`` rows or when the statistics are read,
+so the per-request cost is a list append. Everything runs on the event
+loop, no locks are taken.
+
+With a reference profile, each histogram is compared to the reference
+using the population stability index::
+
+    PSI = sum((current - reference) * ln(current / reference))
+
+over bin fractions; values above ~0.2 are commonly read as significant
+drift.
+"""
+
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from ..config.config import get_settings
+from .features import FeatureVector
+from .registry import LoadedModel
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FILE = "drift_profile.json"
+SCORE = "score"
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+# Floor of bin fractions so empty bins do not make the PSI infinite
+PSI_EPSILON = 1e-4
+# Values per bin buffered before the monitor derives a column's bin edges
+MIN_VALUES_PER_BIN = 10
+
+
+def psi(current: np.ndarray, reference: np.ndarray) -> float:
+    """Population stability index between two histograms of the same bins."""
+    current = np.maximum(current / max(current.sum(), 1), PSI_EPSILON)
+    reference = np.maximum(reference / max(reference.sum(), 1), PSI_EPSILON)
+    return float(np.sum((current - reference) * np.log(current / reference)))
+
+
+class StreamingStats:
+    """Mergeable per-column statistics of a stream of matrices.
+
+    Args:
+        names: Column names
+        bins: Number of histogram bins when edges are derived from data
+        edges: Inner bin edges per column, e.g. from a reference profile;
+            columns without edges take them from their first values
+        warmup: Values of a column buffered before its edges are derived;
+            with 0 the first batch fixes them
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        bins: int = 10,
+        edges: Mapping[str, Sequence[float]] | None = None,
+        warmup: int = 0,
+    ):
+        width = len(names)
+        self.names = tuple(names)
+        self.bins = bins
+        self.rows = 0
+        self.count = np.zeros(width)
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+        edges = edges or {}
+        self.edges: List[np.ndarray | None] = [
+            np.asarray(edges[name], dtype=float) if name in edges else None
+            for name in names
+        ]
+        self.histograms = [
+            np.zeros(len(column) + 1) if column is not None else None
+            for column in self.edges
+        ]
+        self.warmup = max(1, warmup)
+        # Values of columns without edges yet, histogrammed once edges exist
+        self._buffers: List[List[np.ndarray]] = [[] for _ in names]
+        self._buffered = [0] * width
+
+    def _derive_edges(self, values: np.ndarray) -> np.ndarray:
+        probes = np.linspace(0, 1, self.bins + 1)[1:-1]
+        return np.unique(np.quantile(values, probes))
+
+    def _buffered_values(self, column: int) -> np.ndarray:
+        return np.concatenate(self._buffers[column] or [np.empty(0)])
+
+    def update(self, matrix: np.ndarray):
+        """Merge a ``(rows, columns)`` batch, NaN marking missing values."""
+        if not len(matrix):
+            return
+        present = ~np.isnan(matrix)
+
+        count = present.sum(axis=0)
+        safe = np.where(present, matrix, 0.0)
+        mean = safe.sum(axis=0) / np.maximum(count, 1)
+        m2 = (np.where(present, matrix - mean, 0.0) ** 2).sum(axis=0)
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / np.maximum(total, 1)
+        self.m2 += m2 + delta**2 * self.count * count / np.maximum(total, 1)
+        self.count = total
+        self.min = np.minimum(self.min, np.where(present, matrix, np.inf).min(axis=0))
+        self.max = np.maximum(self.max, np.where(present, matrix, -np.inf).max(axis=0))
+        self.rows += len(matrix)
+
+        for column, edges in enumerate(self.edges):
+            values = matrix[present[:, column], column]
+            if edges is not None:
+                self._count(column, values)
+            elif len(values):
+                self._buffers[column].append(values)
+                self._buffered[column] += len(values)
+                if self._buffered[column] >= self.warmup:
+                    values = self._buffered_values(column)
+                    self._buffers[column] = []
+                    self._buffered[column] = 0
+                    self.edges[column] = self._derive_edges(values)
+                    self.histograms[column] = np.zeros(len(self.edges[column]) + 1)
+                    self._count(column, values)
+
+    def _count(self, column: int, values: np.ndarray):
+        histogram = self.histograms[column]
+        histogram += np.bincount(
+            np.searchsorted(self.edges[column], values, side="right"),
+            minlength=len(histogram),
+        )
+
+    def quantiles(self, column: int) -> Dict[str, float | None]:
+        """Quantiles interpolated within the histogram bins of a column.
+
+        Columns still buffering values for their edges report exact quantiles
+        of the buffered values.
+        """
+        histogram = self.histograms[column]
+        if histogram is None and self._buffered[column]:
+            values = np.quantile(self._buffered_values(column), QUANTILES)
+            return {
+                f"p{round(q * 100)}": float(value)
+                for q, value in zip(QUANTILES, values)
+            }
+        if histogram is None or not histogram.sum():
+            return {f"p{round(q * 100)}": None for q in QUANTILES}
+        bounds = np.concatenate(
+            ([self.min[column]], self.edges[column], [self.max[column]])
+        )
+        cumulative = np.cumsum(histogram) / histogram.sum()
+        result = {}
+        for q in QUANTILES:
+            index = int(np.searchsorted(cumulative, q))
+            below = cumulative[index - 1] if index else 0.0
+            share = (q - below) / max(cumulative[index] - below, 1e-12)
+            low = max(bounds[index], self.min[column])
+            high = min(bounds[index + 1], self.max[column])
+            result[f"p{round(q * 100)}"] = float(low + share * (high - low))
+        return result
+
+    def column(self, column: int) -> dict:
+        """Summary statistics of one column."""
+        count = int(self.count[column])
+        return {
+            "count": count,
+            "missing_rate": 1 - count / self.rows if self.rows else 0.0,
+            "mean": float(self.mean[column]) if count else None,
+            "std": float(np.sqrt(self.m2[column] / (count - 1))) if count > 1 else None,
+            "min": float(self.min[column]) if count else None,
+            "max": float(self.max[column]) if count else None,
+            "quantiles": self.quantiles(column),
+        }
+
+    def profile(self) -> Dict[str, dict]:
+        """Bin edges and counts per column, the reference profile format.
+
+        Columns still buffering values are binned on the fly, their edges
+        stay underived.
+        """
+        profile = {}
+        for column, name in enumerate(self.names):
+            edges, histogram = self.edges[column], self.histograms[column]
+            if edges is None:
+                if not self._buffered[column]:
+                    continue
+                values = self._buffered_values(column)
+                edges = self._derive_edges(values)
+                histogram = np.bincount(
+                    np.searchsorted(edges, values, side="right"),
+                    minlength=len(edges) + 1,
+                )
+            profile[name] = {"edges": edges.tolist(), "counts": histogram.tolist()}
+        return profile
+
+
+class ModelDrift:
+    """Feature and score statistics of one loaded model version."""
+
+    def __init__(
+        self,
+        model: LoadedModel,
+        bins: int = 10,
+        reference: dict | None = None,
+        warmup: int = 0,
+    ):
+        self.model = model
+        self.reference = reference
+        reference = reference or {}
+        features = reference.get("features", {})
+        score = reference.get(SCORE)
+        self.features = StreamingStats(
+            model.feature_names,
+            bins,
+            {name: spec["edges"] for name, spec in features.items()},
+            warmup,
+        )
+        self.scores = StreamingStats(
+            (SCORE,), bins, {SCORE: score["edges"]} if score else None, warmup
+        )
+        self._columns = {
+            name: column for column, name in enumerate(model.feature_names)
+        }
+        self._pending: List[tuple] = []
+        self.pending_rows = 0
+
+    def observe(
+        self,
+        features: Sequence[Mapping[str, float]],
+        vectors: Sequence[FeatureVector],
+        scores: Sequence[float],
+    ):
+        """Queue scored rows for the next fold; the sequences are not copied."""
+        self._pending.append((features, vectors, scores))
+        self.pending_rows += len(vectors)
+
+    def fold(self):
+        """Merge every pending row into the statistics."""
+        pending, self._pending = self._pending, []
+        self.pending_rows = 0
+        if not pending:
+            return
+        columns = self._columns
+        matrix = np.stack(
+            [vector.values for _, vectors, _ in pending for vector in vectors]
+        )
+        # Values filled from defaults do not count as observed. Rows carrying
+        # every feature, the common case, cost one set comparison.
+        rows = (mapping for features, _, _ in pending for mapping in features)
+        for row, mapping in enumerate(rows):
+            keys = mapping.keys()
+            if keys >= columns.keys():
+                continue
+            missing = [column for name, column in columns.items() if name not in keys]
+            matrix[row, missing] = np.nan
+        self.features.update(matrix)
+        scores = np.fromiter(
+            (value for _, _, values in pending for value in values), dtype=float
+        )
+        self.scores.update(scores[:, None])
+
+    def snapshot(self) -> dict:
+        """Statistics per feature and for the score, with PSI if referenced."""
+        self.fold()
+        features = {}
+        for column, name in enumerate(self.features.names):
+            features[name] = self.features.column(column)
+            features[name]["psi"] = self._psi("features", self.features, column, name)
+        score = self.scores.column(0)
+        score["psi"] = self._psi(SCORE, self.scores, 0, SCORE)
+        return {
+            "model": self.model.name,
+            "version": self.model.version,
+            "rows": self.features.rows,
+            "reference": self.reference is not None,
+            "features": features,
+            SCORE: score,
+        }
+
+    def _psi(self, section: str, stats: StreamingStats, column: int, name: str):
+        if self.reference is None or stats.histograms[column] is None:
+            return None
+        reference = self.reference.get(section)
+        if section != SCORE and reference is not None:
+            reference = reference.get(name)
+        if reference is None:
+            return None
+        return psi(stats.histograms[column], np.asarray(reference["counts"]))
+
+    def profile(self) -> dict:
+        """Current histograms in the reference profile format."""
+        self.fold()
+        return {
+            "features": self.features.profile(),
+            SCORE: self.scores.profile().get(SCORE),
+        }
+
+
+def load_reference(model: LoadedModel) -> dict | None:
+    """Read the reference profile stored with a model version, if any."""
+    path = Path(model.path) / PROFILE_FILE
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring unreadable drift profile %s: %s", path, exc)
+        return None
+
+
+class DriftMonitor:
+    """Keeps drift statistics per served model version.
+
+    Args:
+        bins: Histogram bins for columns without reference edges
+        fold_size: Pending rows that trigger a fold into the statistics
+        psi_threshold: PSI above which a column is reported as drifted
+    """
+
+    def __init__(
+        self, bins: int = 10, fold_size: int = 256, psi_threshold: float = 0.2
+    ):
+        self.bins = bins
+        self.fold_size = fold_size
+        self.psi_threshold = psi_threshold
+        self.models: Dict[Tuple[str, float], ModelDrift] = {}
+
+    def _tracker(self, model: LoadedModel) -> ModelDrift:
+        key = (model.version, model.loaded_at)
+        tracker = self.models.get(key)
+        if tracker is None:
+            # A reloaded version starts over, stale trackers are dropped
+            for stale in [k for k in self.models if k[0] == model.version]:
+                del self.models[stale]
+            tracker = ModelDrift(
+                model,
+                self.bins,
+                load_reference(model),
+                warmup=max(self.fold_size, MIN_VALUES_PER_BIN * self.bins),
+            )
+            self.models[key] = tracker
+        return tracker
+
+    def served(self, version: str) -> LoadedModel | None:
+        """Latest loaded model of ``version`` that has scored traffic, if any."""
+        for (served_version, _), tracker in reversed(self.models.items()):
+            if served_version == version:
+                return tracker.model
+        return None
+
+    def observe(
+        self,
+        model: LoadedModel,
+        features: Sequence[Mapping[str, float]],
+        vectors: Sequence[FeatureVector],
+        scores: Sequence[float],
+    ):
+        """Record the rows of one request scored by ``model``."""
+        tracker = self._tracker(model)
+        tracker.observe(features, vectors, scores)
+        if tracker.pending_rows >= self.fold_size:
+            tracker.fold()
+
+    def snapshot(self, model: LoadedModel) -> dict:
+        """Statistics of ``model`` and the columns whose PSI exceeds the threshold."""
+        stats = self._tracker(model).snapshot()
+        columns = {**stats["features"], SCORE: stats[SCORE]}
+        stats["psi_threshold"] = self.psi_threshold
+        stats["drifted"] = [
+            name
+            for name, column in columns.items()
+            if column["psi"] is not None and column["psi"] > self.psi_threshold
+        ]
+        return stats
+
+    def profile(self, model: LoadedModel) -> dict:
+        """Live statistics of ``model`` in the reference profile format."""
+        return self._tracker(model).profile()
+
+
+@lru_cache()
+def get_drift_monitor() -> DriftMonitor | None:
+    """Get the drift monitor, or None when drift statistics are disabled."""
+    config = get_settings().drift
+    if not config.enabled:
+        return None
+    return DriftMonitor(
+        bins=config.bins,
+        fold_size=config.fold_size,
+        psi_threshold=config.psi_threshold,
+    )
@@ -0,0 +1,183 @@
+"""
+Inference execution layer.
+
+Keeps CPU-bound predict calls off the event loop. Three modes are supported:
+
+- ``inline``: predict runs on the event loop (lowest overhead, no isolation)
+- ``thread``: predict runs on a thread pool, for native libraries that
+  release the GIL
+- ``process``: predict runs on a process pool with one model copy per
+  worker, for pure-Python models
+
+Calls beyond ``queue_limit`` in-flight predictions and calls exceeding
+``timeout_seconds`` fail with ``InferenceUnavailableError``, which the API
+turns into a 503. A timed-out predict keeps running on its worker, so it
+counts against ``queue_limit`` until it actually finishes. The inline mode
+cannot interrupt a running predict, so it does not enforce the timeout.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from ..config.config import get_settings
+from ..core.metrics import get_metrics
+from .features import FeatureVector
+from .registry import LoadedModel, ModelRegistry
+
+INFERENCE_MODES = ("inline", "thread", "process")
+
+# Models a pool worker keeps loaded, enough for a primary and A/B variants
+WORKER_MODEL_SLOTS = 4
+
+
+class InferenceUnavailableError(Exception):
+    """Raised when inference times out or the inference queue is full."""
+
+
+# Per-process model cache of pool workers: (version, loaded_at) -> model
+_worker_models: Dict[Tuple[str, float], LoadedModel] = {}
+
+
+def _predict_in_worker(
+    artifact_root: str, name: str, version: str, loaded_at: float, matrix: np.ndarray
+) -> np.ndarray:
+    key = (version, loaded_at)
+    model = _worker_models.get(key)
+    if model is None:
+        registry = ModelRegistry(
+            artifact_root,
+            name,
+            version,
+            shared_dir=get_settings().server.shared_weights_dir,
+        )
+        model = registry.load(version)
+        # Drop the least recently loaded versions, usually hot-swapped out
+        while len(_worker_models) >= WORKER_MODEL_SLOTS:
+            del _worker_models[next(iter(_worker_models))]
+        _worker_models[key] = model
+    return model.predictor.predict(matrix)
+
+
+class InferenceExecutor:
+    """Runs model predictions inline, on a thread pool or on a process pool."""
+
+    def __init__(
+        self,
+        mode: str = "inline",
+        workers: int = 4,
+        queue_limit: int = 64,
+        timeout_seconds: float = 2.0,
+    ):
+        if mode not in INFERENCE_MODES:
+            raise ValueError(f"Unsupported inference mode: {mode!r}")
+        self.mode = mode
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout_seconds
+        self.in_flight = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self._pool: Executor | None = None
+        # Jobs finish on pool threads, so the counter is shared with them
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "thread":
+                self._pool = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="inference"
+                )
+            else:
+                # Spawn instead of fork: the parent already runs helper threads
+                self._pool = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+        return self._pool
+
+    async def predict(
+        self, model: LoadedModel, vectors: Sequence[FeatureVector]
+    ) -> np.ndarray:
+        """Score feature vectors with ``model`` according to the execution mode."""
+        if self.mode == "inline":
+            return model.score_batch(vectors)
+
+        if self.in_flight >= self.queue_limit:
+            self.rejected += 1
+            raise InferenceUnavailableError("Inference queue is full")
+
+        matrix = model.schema.matrix(vectors)
+        if self.mode == "thread":
+            job = self._get_pool().submit(model.predict, matrix)
+        else:
+            job = self._get_pool().submit(
+                _predict_in_worker,
+                str(model.path.parent.parent),
+                model.name,
+                model.version,
+                model.loaded_at,
+                matrix,
+            )
+
+        with self._lock:
+            self.in_flight += 1
+        # Released when the job ends, not when the caller stops waiting for it
+        job.add_done_callback(self._release)
+        start = time.perf_counter()
+        try:
+            scores = await asyncio.wait_for(asyncio.wrap_future(job), self.timeout)
+        except asyncio.TimeoutError as exc:
+            self.timeouts += 1
+            raise InferenceUnavailableError(
+                f"Inference timed out after {self.timeout}s"
+            ) from exc
+
+        if self.mode == "process":
+            # Workers record into their own registries, so time the call here
+            get_metrics().observe_inference(time.perf_counter() - start, len(matrix))
+        return scores
+
+    def _release(self, _job: Future):
+        with self._lock:
+            self.in_flight -= 1
+
+    def shutdown(self):
+        """Stop the worker pool without waiting for pending predictions."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def snapshot(self) -> dict:
+        """Return executor configuration and counters."""
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "timeout_seconds": self.timeout,
+            "in_flight": self.in_flight,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+        }
+
+
+@lru_cache()
+def get_executor() -> InferenceExecutor:
+    """Get the cached inference executor configured from settings."""
+    config = get_settings().api
+    return InferenceExecutor(
+        mode=config.inference_mode,
+        workers=config.inference_workers,
+        queue_limit=config.inference_queue_limit,
+        timeout_seconds=config.inference_timeout_seconds,
+    )
@@ -0,0 +1,364 @@
+"""
+Local feature store for scoring by ``lead_id`` alone.
+
+Precomputed features live in a SQLite file indexed on ``lead_id``::
+
+    meta(key TEXT PRIMARY KEY, value TEXT)        feature names, snapshot info
+    features(lead_id INTEGER PRIMARY KEY, row BLOB)
+
+Each row is the lead's feature values packed as float64 in the order of the
+stored feature names, NaN marking a feature the snapshot did not have for
+that lead. Files are built from offline snapshots, JSONL files with one
+``{"lead_id": ..., "features": {...}}`` record per line (the request format),
+into a uniquely named temporary file that atomically replaces the live one,
+so lookups never see a half-built table.
+
+Builds are serialized across threads and worker processes by an exclusive
+lock on ``<store>.lock``: the first worker to find the snapshot newer than
+the store rebuilds it, the others wait for the lock, find the store up to
+date and reopen the new file.
+
+A size-bounded LRU of hot rows sits in front of SQLite and is dropped on
+every refresh. ``get_many`` serves the batch endpoint with one query per
+chunk of ids instead of one per lead.
+"""
+
+import fcntl
+import json
+import logging
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from ..config.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Stay below SQLite's default limit of host parameters per statement
+LOOKUP_CHUNK = 500
+
+
+def build_store(snapshot_path: Path, store_path: Path) -> int:
+    """Build a feature store file from a JSONL snapshot.
+
+    Args:
+        snapshot_path: JSONL file of ``{"lead_id", "features"}`` records
+        store_path: SQLite file to create or atomically replace
+
+    Returns:
+        Number of leads written
+    """
+    # First pass collects the feature names, the second one writes the rows,
+    # so memory stays bounded by a single record
+    names: Dict[str, int] = {}
+    for _, features in _read_snapshot(snapshot_path):
+        for name in features:
+            names.setdefault(name, len(names))
+
+    def rows():
+        row = np.empty(len(names), dtype=np.float64)
+        for lead_id, features in _read_snapshot(snapshot_path):
+            row.fill(np.nan)
+            for name, value in features.items():
+                row[names[name]] = value
+            yield lead_id, row.tobytes()
+
+    store_path = Path(store_path)
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique per build, so concurrent builds never share a half-written file
+    handle, tmp = tempfile.mkstemp(
+        prefix=f"{store_path.name}.", suffix=".building", dir=store_path.parent
+    )
+    os.close(handle)
+    connection = sqlite3.connect(tmp)
+    try:
+        connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        connection.execute(
+            "CREATE TABLE features (lead_id INTEGER PRIMARY KEY, row BLOB NOT NULL)"
+        )
+        connection.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [
+                ("names", json.dumps(list(names))),
+                ("snapshot", str(snapshot_path)),
+                ("built_at", str(time.time())),
+            ],
+        )
+        connection.executemany("INSERT OR REPLACE INTO features VALUES (?, ?)", rows())
+        connection.commit()
+        (count,) = connection.execute("SELECT COUNT(*) FROM features").fetchone()
+    except BaseException:
+        connection.close()
+        os.unlink(tmp)
+        raise
+    connection.close()
+    os.replace(tmp, store_path)
+    logger.info("Built feature store %s with %d leads", store_path, count)
+    return count
+
+
+@contextmanager
+def build_lock(store_path: Path) -> Iterator[None]:
+    """Hold the exclusive build lock of a store file, across processes."""
+    store_path = Path(store_path)
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(store_path.with_suffix(".lock"), "a+b") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _read_snapshot(path: Path) -> Iterator[Tuple[int, Dict[str, float]]]:
+    with open(path, "rb") as handle:
+        for line in handle:
+            if line.strip():
+                record = json.loads(line)
+                yield int(record["lead_id"]), record["features"]
+
+
+def missing_features_error(loc: tuple, store: "FeatureStore | None") -> dict:
+    """Validation error for a request without features that cannot be looked up."""
+    return {
+        "type": "missing",
+        "loc": (*loc, "features"),
+        "msg": (
+            "Field required"
+            if store is None
+            else "Field required, lead not found in the feature store"
+        ),
+        "input": None,
+    }
+
+
+def _decode(names: List[str], blob: bytes) -> Dict[str, float]:
+    values = np.frombuffer(blob, dtype=np.float64).tolist()
+    return {name: value for name, value in zip(names, values) if not math.isnan(value)}
+
+
+class FeatureStore:
+    """Read-only lead feature lookups with a hot-row LRU cache.
+
+    Args:
+        path: SQLite file built by ``build_store``
+        cache_size: Rows kept in the LRU cache, 0 disables it
+        snapshot_path: Snapshot the file is (re)built from by ``refresh``
+    """
+
+    def __init__(
+        self, path: str, cache_size: int = 10_000, snapshot_path: str | None = None
+    ):
+        self.path = Path(path)
+        self.cache_size = cache_size
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self._cache: OrderedDict = OrderedDict()
+        # Guards the connection and the cache, which the refresh thread clears;
+        # lookups hold it only for a single query or cache access
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self.names: List[str] = []
+        self.refreshed_at: float | None = None
+        self.hits = 0
+        self.misses = 0
+        self.not_found = 0
+        # Bumped on every swap so rows read from a replaced file are not cached
+        self._generation = 0
+        # Identity of the file the connection reads, to notice replacements
+        self._opened: Tuple[int, int] | None = None
+        self._open()
+
+    def _snapshot_is_newer(self) -> bool:
+        if self.snapshot_path is None or not self.snapshot_path.exists():
+            return False
+        if not self.path.exists():
+            return True
+        return self.snapshot_path.stat().st_mtime > self.path.stat().st_mtime
+
+    def _file_id(self) -> Tuple[int, int] | None:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _open(self):
+        if self._snapshot_is_newer():
+            with build_lock(self.path):
+                # Another thread or worker may have rebuilt it meanwhile
+                if self._snapshot_is_newer():
+                    build_store(self.snapshot_path, self.path)
+        if not self.path.exists():
+            logger.warning("Feature store %s does not exist", self.path)
+            return
+        opened = self._file_id()
+        connection = sqlite3.connect(
+            f"file:{self.path}?mode=ro", uri=True, check_same_thread=False
+        )
+        (names,) = connection.execute(
+            "SELECT value FROM meta WHERE key = 'names'"
+        ).fetchone()
+        with self._lock:
+            previous, self._connection = self._connection, connection
+            self.names = json.loads(names)
+            self._cache.clear()
+            self._generation += 1
+            self._opened = opened
+        if previous is not None:
+            previous.close()
+        self.refreshed_at = time.time()
+
+    def refresh(self, snapshot_path: str | None = None) -> int:
+        """Rebuild the store from a snapshot and swap it in.
+
+        Lookups keep being served from the previous file while the new one is
+        built. Returns the number of leads in the new store.
+        """
+        snapshot = Path(snapshot_path) if snapshot_path else self.snapshot_path
+        if snapshot is None:
+            raise ValueError("No feature snapshot configured")
+        with build_lock(self.path):
+            count = build_store(snapshot, self.path)
+        self.snapshot_path = snapshot
+        self._open()
+        return count
+
+    def reload(self) -> bool:
+        """Rebuild a stale store or reopen one replaced by another process.
+
+        Returns whether a different file is served afterwards.
+        """
+        if not self._snapshot_is_newer() and self._file_id() == self._opened:
+            return False
+        self._open()
+        return True
+
+    def watch(self, interval: float) -> threading.Thread:
+        """Rebuild or reopen the store in the background when it changes."""
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload()
+                except Exception:  # pylint: disable=broad-exception-caught
+                    logger.exception("Feature store refresh failed")
+
+        thread = threading.Thread(target=run, name="feature-store-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    def _remember(self, lead_id: int, features: Dict[str, float], generation: int):
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._cache[lead_id] = features
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get(self, lead_id: int) -> Dict[str, float] | None:
+        """Features of one lead, or None when the lead is not in the store."""
+        with self._lock:
+            features = self._cache.get(lead_id)
+            if features is not None:
+                self._cache.move_to_end(lead_id)
+        if features is not None:
+            self.hits += 1
+            return features
+        self.misses += 1
+        with self._lock:
+            generation = self._generation
+            if self._connection is None:
+                row = None
+            else:
+                row = self._connection.execute(
+                    "SELECT row FROM features WHERE lead_id = ?", (lead_id,)
+                ).fetchone()
+            names = self.names
+        if row is None:
+            self.not_found += 1
+            return None
+        features = _decode(names, row[0])
+        self._remember(lead_id, features, generation)
+        return features
+
+    def get_many(self, lead_ids: Iterable[int]) -> Dict[int, Dict[str, float]]:
+        """Features of many leads; leads missing from the store are omitted."""
+        found: Dict[int, Dict[str, float]] = {}
+        missing = []
+        with self._lock:
+            for lead_id in dict.fromkeys(lead_ids):
+                features = self._cache.get(lead_id)
+                if features is None:
+                    missing.append(lead_id)
+                else:
+                    self._cache.move_to_end(lead_id)
+                    found[lead_id] = features
+        self.hits += len(found)
+        self.misses += len(missing)
+
+        fetched = 0
+        for start in range(0, len(missing), LOOKUP_CHUNK):
+            chunk = missing[start : start + LOOKUP_CHUNK]
+            with self._lock:
+                if self._connection is None:
+                    break
+                generation = self._generation
+                rows = self._connection.execute(
+                    "SELECT lead_id, row FROM features WHERE lead_id IN "
+                    f"({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                names = self.names
+            for lead_id, blob in rows:
+                features = _decode(names, blob)
+                self._remember(lead_id, features, generation)
+                found[lead_id] = features
+            fetched += len(rows)
+        self.not_found += len(missing) - fetched
+        return found
+
+    def snapshot(self) -> dict:
+        """Return store metadata and lookup counters."""
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "snapshot_path": str(self.snapshot_path) if self.snapshot_path else None,
+            "available": self._connection is not None,
+            "features": list(self.names),
+            "refreshed_at": self.refreshed_at,
+            "cache_size": len(self._cache),
+            "max_cache_size": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "not_found": self.not_found,
+        }
+
+
+@lru_cache()
+def get_feature_store() -> FeatureStore | None:
+    """Get the feature store, or None when scoring by lead_id is disabled."""
+    config = get_settings().feature_store
+    if not config.enabled:
+        return None
+    store = FeatureStore(
+        path=config.path,
+        cache_size=config.cache_size,
+        snapshot_path=config.snapshot_path,
+    )
+    if config.snapshot_path and config.refresh_interval_seconds > 0:
+        store.watch(config.refresh_interval_seconds)
+    return store
@@ -0,0 +1,126 @@
+"""
+Per-model feature schemas and array-backed feature vectors.
+
+A ``FeatureSchema`` is the ordered name-to-column index a model was trained
+with. Requests are converted into a ``FeatureVector`` once, right after
+validation, and everything downstream (batching, caching, inference) works
+on the dense array instead of the ``Dict[str, float]`` payload.
+"""
+
+from typing import Dict, List, Mapping, Sequence
+
+import numpy as np
+
+MISSING_POLICIES = ("default", "reject")
+UNKNOWN_POLICIES = ("ignore", "reject")
+
+
+class FeatureSchemaError(ValueError):
+    """Raised when features violate the schema's missing/unknown policy.
+
+    ``errors`` follows the Pydantic error format with locations relative to
+    the request body, e.g. ``("features", "age")``.
+    """
+
+    def __init__(self, errors: List[dict]):
+        super().__init__(f"{len(errors)} feature schema error(s)")
+        self.errors = errors
+
+
+class FeatureVector:
+    """Feature values laid out in a schema's column order."""
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+
+    def __repr__(self):
+        return f"FeatureVector({self.values.tolist()})"
+
+
+class FeatureSchema:
+    """Ordered feature index with explicit missing/unknown handling.
+
+    Args:
+        names: Feature names in the model's column order
+        defaults: Per-feature fill values for missing features
+        default_value: Fill value for features without an explicit default
+        missing: ``default`` fills missing features, ``reject`` raises
+        unknown: ``ignore`` drops unknown features, ``reject`` raises
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        defaults: Mapping[str, float] | None = None,
+        default_value: float = 0.0,
+        missing: str = "default",
+        unknown: str = "ignore",
+    ):
+        if missing not in MISSING_POLICIES:
+            raise ValueError(f"Unsupported missing-feature policy: {missing!r}")
+        if unknown not in UNKNOWN_POLICIES:
+            raise ValueError(f"Unsupported unknown-feature policy: {unknown!r}")
+        if len(set(names)) != len(names):
+            raise ValueError("Feature names must be unique")
+
+        defaults = defaults or {}
+        self.names = tuple(names)
+        self.index: Dict[str, int] = {name: column for column, name in enumerate(names)}
+        self.defaults = np.array(
+            [defaults.get(name, default_value) for name in names], dtype=float
+        )
+        self.missing = missing
+        self.unknown = unknown
+
+    def __len__(self):
+        return len(self.names)
+
+    def vectorize(self, features: Mapping[str, float]) -> FeatureVector:
+        """Convert a validated feature mapping into a ``FeatureVector``."""
+        values = self.defaults.copy()
+        index = self.index
+        found = 0
+        unknown = None
+        for name, value in features.items():
+            column = index.get(name)
+            if column is None:
+                if self.unknown == "reject":
+                    unknown = unknown or []
+                    unknown.append(name)
+                continue
+            values[column] = value
+            found += 1
+
+        errors = []
+        if unknown:
+            errors.extend(
+                {
+                    "type": "extra_forbidden",
+                    "loc": ("features", name),
+                    "msg": "Unknown feature for the active model",
+                    "input": features[name],
+                }
+                for name in unknown
+            )
+        if self.missing == "reject" and found < len(self.names):
+            errors.extend(
+                {
+                    "type": "missing",
+                    "loc": ("features", name),
+                    "msg": "Feature required by the active model",
+                    "input": None,
+                }
+                for name in self.names
+                if name not in features
+            )
+        if errors:
+            raise FeatureSchemaError(errors)
+        return FeatureVector(values)
+
+    def matrix(self, vectors: Sequence[FeatureVector]) -> np.ndarray:
+        """Stack feature vectors into a dense ``(n_rows, n_features)`` matrix."""
+        if not vectors:
+            return np.empty((0, len(self.names)), dtype=float)
+        return np.stack([vector.values for vector in vectors])
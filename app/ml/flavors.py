@@ -0,0 +1,75 @@
+"""
+Model flavors supported by the model registry.
+
+A flavor knows how to build a predictor from the ``params`` section of an
+``MLmodel`` descriptor. Every predictor exposes ``predict(X)`` where ``X`` is
+a dense ``(n_rows, n_features)`` matrix in the model's feature order and the
+result is a ``(n_rows,)`` array of scores.
+
+Flavors depending on heavy libraries can be registered by import string, so
+the library is only imported when a model of that flavor is loaded.
+"""
+
+import importlib
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+
+class LinearModel:
+    """Linear lead-scoring model with an optional logistic link.
+
+    With the ``logistic`` link the linear term is squashed into a 0-100 score,
+    with ``identity`` it is returned as is.
+    """
+
+    def __init__(self, coefficients: np.ndarray, intercept: float, link: str):
+        if link not in ("identity", "logistic"):
+            raise ValueError(f"Unsupported link function: {link}")
+        self.coefficients = coefficients
+        self.intercept = intercept
+        self.link = link
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Score every row of the feature matrix."""
+        z = X @ self.coefficients + self.intercept
+        if self.link == "logistic":
+            return 100.0 / (1.0 + np.exp(-z))
+        return z
+
+
+def load_linear(_path: Path, features: List[str], params: dict) -> LinearModel:
+    """Build a ``LinearModel`` from its descriptor parameters."""
+    weights = params.get("coefficients", {})
+    coefficients = np.array([weights.get(name, 0.0) for name in features], dtype=float)
+    return LinearModel(
+        coefficients=coefficients,
+        intercept=float(params.get("intercept", 0.0)),
+        link=params.get("link", "identity"),
+    )
+
+
+Loader = Callable[[Path, List[str], dict], object]
+
+# Flavor name -> loader(path, features, params), or the "module:attribute"
+# import string of a loader whose heavy dependencies load on first use
+FLAVORS: Dict[str, Loader | str] = {
+    "linear": load_linear,
+    "tree_ensemble": "app.ml.trees:load_tree_ensemble",
+}
+
+
+def get_flavor(name: str) -> Loader | None:
+    """Loader of a flavor, importing it first if it is registered lazily."""
+    loader = FLAVORS.get(name)
+    if isinstance(loader, str):
+        module, attribute = loader.split(":")
+        loader = FLAVORS[name] = getattr(importlib.import_module(module), attribute)
+    return loader
+
+
+def import_flavors():
+    """Import every lazily registered flavor, e.g. before serving traffic."""
+    for name in list(FLAVORS):
+        get_flavor(name)
@@ -0,0 +1,234 @@
+"""
+Model-bundled preprocessing compiled to batched array operations.
+
+A model version may ship a ``preprocessing.json`` next to its ``MLmodel``
+descriptor, listing the transforms its training pipeline applied to the raw
+feature values, in order::
+
+    {
+        "steps": [
+            {"op": "impute", "features": {"income": 42000.0}},
+            {"op": "clip", "features": {"age": [18, 90], "income": [0, null]}},
+            {"op": "log1p", "features": ["income"]},
+            {"op": "scale", "features": {"age": {"center": 41.5, "scale": 12.0}}},
+            {"op": "bucketize", "features": {"tenure": [1, 3, 12]}}
+        ]
+    }
+
+- ``impute`` replaces missing (NaN) values with a constant
+- ``clip`` bounds values, ``null`` leaves a side open
+- ``log1p`` applies ``log(1 + x)``
+- ``scale`` computes ``(x - center) / scale``
+- ``bucketize`` replaces a value with the number of boundaries at or below it
+
+At load time every step is compiled into full-width (or column-subset)
+arrays, so a whole feature matrix goes through one NumPy operation per step
+instead of a Python call per feature and request. The registry wraps the
+flavor's predictor in a ``PreprocessedPredictor``, so the online routes, the
+inference executor's workers, shadow scoring and the offline bulk and drift
+jobs all apply the same transforms. Features an ``impute`` step fills
+default to NaN in the model's schema, so a feature omitted from a request
+is imputed the same way as an explicit missing value. Training code can
+load the same spec with ``load_preprocessing`` to keep training and serving
+consistent. Malformed specs raise ``ValueError``.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+PREPROCESSING_FILE = "preprocessing.json"
+
+# Expected JSON type of each step's ``features`` and of their entries
+STEP_FEATURE_TYPES = {
+    "impute": dict,
+    "clip": dict,
+    "log1p": list,
+    "scale": dict,
+    "bucketize": dict,
+}
+STEP_ENTRY_TYPES = {"clip": list, "scale": dict, "bucketize": list}
+
+
+class Impute:
+    """Replace missing values of some columns with constants."""
+
+    def __init__(self, fill: np.ndarray):
+        # NaN for columns without an imputed value
+        self.fill = fill
+        self.columns = ~np.isnan(fill)
+
+    def apply(self, X: np.ndarray):
+        """Transform ``X`` in place."""
+        missing = np.isnan(X)
+        missing &= self.columns
+        np.copyto(X, self.fill, where=missing)
+
+
+class Clip:
+    """Bound the values of every column, open bounds being infinite."""
+
+    def __init__(self, lower: np.ndarray, upper: np.ndarray):
+        self.lower = lower
+        self.upper = upper
+
+    def apply(self, X: np.ndarray):
+        """Transform ``X`` in place."""
+        np.clip(X, self.lower, self.upper, out=X)
+
+
+class Log1p:
+    """Apply ``log(1 + x)`` to some columns."""
+
+    def __init__(self, columns: np.ndarray):
+        self.columns = columns
+
+    def apply(self, X: np.ndarray):
+        """Transform ``X`` in place."""
+        X[:, self.columns] = np.log1p(X[:, self.columns])
+
+
+class Scale:
+    """Center and scale every column, untouched columns by 0 and 1."""
+
+    def __init__(self, center: np.ndarray, scale: np.ndarray):
+        self.center = center
+        self.inverse_scale = 1.0 / scale
+
+    def apply(self, X: np.ndarray):
+        """Transform ``X`` in place."""
+        X -= self.center
+        X *= self.inverse_scale
+
+
+class Bucketize:
+    """Replace values of some columns with their bucket index."""
+
+    def __init__(self, columns: np.ndarray, boundaries: np.ndarray):
+        self.columns = columns
+        # (n_columns, max_boundaries), padded with NaN which no value reaches
+        self.boundaries = boundaries
+
+    def apply(self, X: np.ndarray):
+        """Transform ``X`` in place."""
+        values = X[:, self.columns, np.newaxis]
+        X[:, self.columns] = (values >= self.boundaries).sum(axis=2)
+
+
+class Preprocessor:
+    """A fixed sequence of compiled preprocessing steps."""
+
+    def __init__(self, steps: Sequence[object]):
+        self.steps = list(steps)
+
+    def imputed_columns(self) -> np.ndarray:
+        """Columns an ``impute`` step fills when they are missing."""
+        columns = [
+            np.flatnonzero(step.columns)
+            for step in self.steps
+            if isinstance(step, Impute)
+        ]
+        return np.unique(np.concatenate(columns)) if columns else np.empty(0, np.intp)
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """Return a preprocessed copy of a ``(n_rows, n_features)`` matrix."""
+        X = np.array(X, dtype=float)
+        for step in self.steps:
+            step.apply(X)
+        return X
+
+
+class PreprocessedPredictor:
+    """Predictor applying a model's preprocessing before the flavor's predict."""
+
+    def __init__(self, preprocessor: Preprocessor, predictor: object):
+        self.preprocessor = preprocessor
+        self.predictor = predictor
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Score every row of the raw feature matrix."""
+        return self.predictor.predict(self.preprocessor.transform(X))
+
+
+def _columns(features: Dict[str, int], names) -> np.ndarray:
+    unknown = [name for name in names if name not in features]
+    if unknown:
+        raise ValueError(f"Preprocessing of unknown features: {unknown}")
+    return np.array([features[name] for name in names], dtype=np.intp)
+
+
+def _full_width(
+    features: Dict[str, int], values: Dict[str, float], default: float
+) -> np.ndarray:
+    array = np.full(len(features), default, dtype=float)
+    array[_columns(features, values)] = [
+        default if value is None else float(value) for value in values.values()
+    ]
+    return array
+
+
+def _check_type(value: object, kind: type, what: str):
+    if not isinstance(value, kind):
+        raise ValueError(
+            f"Preprocessing {what} must be a JSON "
+            f"{'object' if kind is dict else 'array'}, got {value!r}"
+        )
+
+
+def _compile_step(features: Dict[str, int], step: dict) -> object:
+    _check_type(step, dict, "step")
+    op = step.get("op")
+    kind = STEP_FEATURE_TYPES.get(op)
+    if kind is None:
+        raise ValueError(f"Unsupported preprocessing step: {op!r}")
+    targets = step.get("features", kind())
+    _check_type(targets, kind, f"{op} features")
+    if op in STEP_ENTRY_TYPES:
+        for name, value in targets.items():
+            _check_type(value, STEP_ENTRY_TYPES[op], f"{op} entry of {name!r}")
+    if op == "impute":
+        return Impute(_full_width(features, targets, np.nan))
+    if op == "clip":
+        if any(len(bounds) != 2 for bounds in targets.values()):
+            raise ValueError("Clip bounds must be [lower, upper] pairs")
+        lower = {name: bounds[0] for name, bounds in targets.items()}
+        upper = {name: bounds[1] for name, bounds in targets.items()}
+        return Clip(
+            _full_width(features, lower, -np.inf), _full_width(features, upper, np.inf)
+        )
+    if op == "log1p":
+        return Log1p(_columns(features, targets))
+    if op == "scale":
+        center = {name: value.get("center", 0.0) for name, value in targets.items()}
+        scale = {name: value.get("scale", 1.0) for name, value in targets.items()}
+        scale = _full_width(features, scale, 1.0)
+        if (scale == 0).any():
+            raise ValueError("Preprocessing scale factors must not be zero")
+        return Scale(_full_width(features, center, 0.0), scale)
+    width = max((len(bounds) for bounds in targets.values()), default=0)
+    boundaries = np.full((len(targets), width), np.nan)
+    for row, bounds in enumerate(targets.values()):
+        if list(bounds) != sorted(bounds):
+            raise ValueError("Bucket boundaries must be sorted")
+        boundaries[row, : len(bounds)] = bounds
+    return Bucketize(_columns(features, targets), boundaries)
+
+
+def compile_preprocessing(spec: dict, feature_names: List[str]) -> Preprocessor:
+    """Compile a preprocessing spec for a model's feature order."""
+    _check_type(spec, dict, "spec")
+    steps = spec.get("steps", [])
+    _check_type(steps, list, "steps")
+    features = {name: column for column, name in enumerate(feature_names)}
+    return Preprocessor([_compile_step(features, step) for step in steps])
+
+
+def load_preprocessing(path: Path, feature_names: List[str]) -> Preprocessor | None:
+    """Compile the preprocessing spec of a model directory, None without one."""
+    try:
+        spec = json.loads((Path(path) / PREPROCESSING_FILE).read_bytes())
+    except FileNotFoundError:
+        return None
+    return compile_preprocessing(spec, feature_names)
@@ -0,0 +1,256 @@
+"""
+In-process model registry.
+
+Models are stored in an MLflow-style artifact tree::
+
+    <artifact_root>/<name>/<version>/MLmodel
+
+where ``MLmodel`` is a JSON descriptor (JSON being valid YAML, the file keeps
+MLflow's name) holding the flavor, the ordered feature names, optional
+``feature_defaults`` and ``feature_policy`` overrides, and the flavor
+parameters, optionally next to a ``preprocessing.json`` spec applied to the
+features before the predictor (see ``app.ml.preprocessing``). The registry
+loads the configured version once, keeps it in memory and swaps in a new
+version atomically: requests that already hold a reference to the previous
+``LoadedModel`` finish with it, new requests pick up the new one.
+
+With ``shared_dir`` set, predictors exported there by the multi-worker
+launcher are mapped from shared memory instead of being rebuilt from the
+descriptor (see ``app.ml.shared``).
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Mapping, Sequence, Tuple
+
+import numpy as np
+
+from ..config.config import get_settings
+from ..core.metrics import get_metrics
+from .features import FeatureSchema, FeatureVector
+from .flavors import get_flavor
+from .preprocessing import (
+    PREPROCESSING_FILE,
+    PreprocessedPredictor,
+    load_preprocessing,
+)
+from .shared import descriptor_digest, load_predictor
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTOR_FILE = "MLmodel"
+
+
+class ModelLoadError(Exception):
+    """Raised when a model version cannot be found or loaded."""
+
+
+class InvalidModelVersionError(ModelLoadError):
+    """Raised when a version name would resolve outside the model's directory."""
+
+
+def artifact_digest(path: Path) -> str:
+    """Digest of the descriptor and preprocessing spec of a model version."""
+    content = (path / DESCRIPTOR_FILE).read_bytes()
+    try:
+        content += (path / PREPROCESSING_FILE).read_bytes()
+    except FileNotFoundError:
+        pass
+    return descriptor_digest(content)
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """An immutable, ready-to-serve model version."""
+
+    name: str
+    version: str
+    flavor: str
+    schema: FeatureSchema
+    predictor: object
+    loaded_at: float
+    path: Path
+    shared_weights: bool = False
+
+    @property
+    def feature_names(self) -> Tuple[str, ...]:
+        """Feature names in the model's column order."""
+        return self.schema.names
+
+    def vectorize(self, features: Mapping[str, float]) -> FeatureVector:
+        """Convert a request's feature mapping into this model's feature vector."""
+        return self.schema.vectorize(features)
+
+    def predict(self, matrix: np.ndarray) -> np.ndarray:
+        """Score a feature matrix laid out in the schema's column order."""
+        start = time.perf_counter()
+        scores = self.predictor.predict(matrix)
+        get_metrics().observe_inference(time.perf_counter() - start, len(matrix))
+        return scores
+
+    def score_batch(self, vectors: Sequence[FeatureVector]) -> np.ndarray:
+        """Score many feature vectors with a single vectorized predict call."""
+        return self.predict(self.schema.matrix(vectors))
+
+    def score(self, vector: FeatureVector) -> float:
+        """Score a single feature vector."""
+        return float(self.score_batch([vector])[0])
+
+
+class ModelRegistry:
+    """Loads model versions from disk and holds the active one."""
+
+    def __init__(
+        self,
+        artifact_root: str,
+        name: str,
+        version: str,
+        missing_features: str = "default",
+        unknown_features: str = "ignore",
+        shared_dir: str | None = None,
+    ):
+        self.artifact_root = Path(artifact_root)
+        self.name = name
+        self.default_version = version
+        self.missing_features = missing_features
+        self.unknown_features = unknown_features
+        self.shared_dir = Path(shared_dir) if shared_dir else None
+        self._active: LoadedModel | None = None
+        # Serializes loads and swaps, never taken on the scoring path
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> LoadedModel:
+        """Return the active model, loading the configured version on first use."""
+        model = self._active
+        if model is None:
+            with self._lock:
+                if self._active is None:
+                    self._active = self.load(self.default_version)
+                model = self._active
+        return model
+
+    def preload(self) -> LoadedModel:
+        """Eagerly load the configured version before serving traffic."""
+        return self.active
+
+    def version_path(self, version: str) -> Path:
+        """Directory of a model version, rejecting names that escape the tree."""
+        if (
+            not version
+            or "/" in version
+            or "\\" in version
+            or ".." in version
+            or Path(version).is_absolute()
+        ):
+            raise InvalidModelVersionError(f"Invalid model version: {version!r}")
+        root = self.artifact_root.resolve()
+        path = (root / self.name / version).resolve()
+        if root not in path.parents:
+            raise InvalidModelVersionError(f"Invalid model version: {version!r}")
+        return self.artifact_root / self.name / version
+
+    def load(self, version: str) -> LoadedModel:
+        """Load a model version from the artifact tree without activating it."""
+        path = self.version_path(version)
+        descriptor_path = path / DESCRIPTOR_FILE
+        try:
+            raw = descriptor_path.read_bytes()
+            descriptor = json.loads(raw)
+        except FileNotFoundError as exc:
+            raise ModelLoadError(
+                f"Model {self.name!r} version {version!r} not found at {path}"
+            ) from exc
+        except json.JSONDecodeError as exc:
+            raise ModelLoadError(
+                f"Invalid descriptor {descriptor_path}: {exc}"
+            ) from exc
+
+        flavor = descriptor.get("flavor")
+        try:
+            loader = get_flavor(flavor)
+        except ImportError as exc:
+            raise ModelLoadError(
+                f"Cannot import model flavor {flavor!r}: {exc}"
+            ) from exc
+        if loader is None:
+            raise ModelLoadError(f"Unsupported model flavor: {flavor!r}")
+
+        feature_names = list(descriptor.get("features", []))
+        policy = descriptor.get("feature_policy", {})
+        try:
+            preprocessor = load_preprocessing(path, feature_names)
+            defaults = dict(descriptor.get("feature_defaults") or {})
+            if preprocessor is not None:
+                # Omitted features reach the impute step as missing values
+                for column in preprocessor.imputed_columns():
+                    defaults[feature_names[column]] = np.nan
+            schema = FeatureSchema(
+                feature_names,
+                defaults=defaults,
+                missing=policy.get("missing", self.missing_features),
+                unknown=policy.get("unknown", self.unknown_features),
+            )
+            predictor = self._load_shared(version, path)
+            shared_weights = predictor is not None
+            if predictor is None:
+                predictor = loader(path, feature_names, descriptor.get("params", {}))
+                if preprocessor is not None:
+                    predictor = PreprocessedPredictor(preprocessor, predictor)
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ModelLoadError(
+                f"Cannot load model {self.name!r} version {version!r}: {exc}"
+            ) from exc
+
+        logger.info("Loaded model %s version %s (%s)", self.name, version, flavor)
+        return LoadedModel(
+            name=self.name,
+            version=version,
+            flavor=flavor,
+            schema=schema,
+            predictor=predictor,
+            loaded_at=time.time(),
+            path=path,
+            shared_weights=shared_weights,
+        )
+
+    def _load_shared(self, version: str, path: Path) -> object | None:
+        if self.shared_dir is None:
+            return None
+        predictor = load_predictor(
+            self.shared_dir, self.name, version, artifact_digest(path)
+        )
+        if predictor is not None:
+            logger.info("Mapped shared weights of %s version %s", self.name, version)
+        return predictor
+
+    def activate(self, version: str) -> LoadedModel:
+        """Load a version and atomically make it the active model.
+
+        The new version is fully loaded before the swap, so a failed load
+        leaves the current model in place.
+        """
+        with self._lock:
+            model = self.load(version)
+            self._active = model
+        logger.info("Activated model %s version %s", self.name, version)
+        return model
+
+
+@lru_cache()
+def get_model_registry() -> ModelRegistry:
+    """Get the cached model registry configured from settings."""
+    config = get_settings().model
+    return ModelRegistry(
+        artifact_root=config.artifact_root,
+        name=config.name,
+        version=config.version,
+        missing_features=config.missing_features,
+        unknown_features=config.unknown_features,
+        shared_dir=get_settings().server.shared_weights_dir,
+    )
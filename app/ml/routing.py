@@ -0,0 +1,321 @@
+"""
+A/B and shadow routing between model versions.
+
+``ModelRouter`` picks the model that answers each ``/lead-scoring/score``
+request. Variant versions take a fixed fraction of the traffic and the
+active model serves the rest; a lead is assigned either at random per
+request (``percent``) or by a stable hash of its ``lead_id`` (``hash``), so
+the same lead keeps hitting the same version across requests and workers.
+
+A shadow candidate scores a copy of every request after the primary
+response is computed. Copies go through a bounded queue to a background
+thread, which scores them in batches and appends the primary/shadow score
+pairs to a JSONL file for offline comparison. When the queue is full the
+copy is dropped and counted; the primary request never waits for, or fails
+because of, the shadow model.
+
+The shadow thread shares the worker's GIL with the event loop, so a
+candidate's predict calls (and its pure-Python preprocessing) take CPU time
+from serving. Shadow scoring deliberately stays off the inference executor,
+whose queue limit and timeouts belong to primary requests; instead the
+copies are capped at ``max_rate`` per second by a token bucket and copies
+over the cap are dropped and counted as throttled.
+"""
+
+import hashlib
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Mapping
+
+from ..config.config import get_settings
+from .features import FeatureSchemaError
+from .registry import LoadedModel, ModelRegistry, get_model_registry
+
+logger = logging.getLogger(__name__)
+
+SPLIT_MODES = ("percent", "hash")
+
+
+def lead_bucket(lead_id: int, salt: str = "") -> float:
+    """Stable position of a lead in [0, 1) for hash-based splits."""
+    digest = hashlib.blake2b(f"{salt}:{lead_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2**64
+
+
+class ShadowScorer:
+    """Scores request copies with a candidate model in a background thread.
+
+    Args:
+        model: Candidate model version
+        queue_size: Copies waiting to be scored before new ones are dropped
+        batch_size: Copies scored per vectorized predict call
+        record_path: JSONL file the score pairs are appended to, if any
+        buffer_size: Most recent pairs kept in memory for the admin endpoint
+        max_rate: Copies accepted per second, at most
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        model: LoadedModel,
+        queue_size: int = 1000,
+        batch_size: int = 64,
+        record_path: str | None = None,
+        buffer_size: int = 100,
+        max_rate: float = 200.0,
+    ):
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.max_rate = max_rate
+        # Token bucket holding up to one second of copies, refilled lazily
+        self._burst = max(1.0, max_rate)
+        self._tokens = self._burst
+        self._refilled = time.monotonic()
+        self.record_path = Path(record_path) if record_path else None
+        self.pairs: deque = deque(maxlen=buffer_size)
+        # maxsize=0 would make the queue unbounded
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self.enqueued = 0
+        self.dropped = 0
+        self.throttled = 0
+        self.scored = 0
+        self.errors = 0
+        self.total_abs_diff = 0.0
+        self.max_abs_diff = 0.0
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="shadow-scorer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self,
+        lead_id: int,
+        features: Mapping[str, float],
+        primary: LoadedModel,
+        score: float,
+    ) -> bool:
+        """Queue a scored request for the candidate, False if it was dropped."""
+        if self._closed:
+            self.dropped += 1
+            return False
+        now = time.monotonic()
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._refilled) * self.max_rate
+        )
+        self._refilled = now
+        if self._tokens < 1:
+            self.throttled += 1
+            return False
+        self._tokens -= 1
+        try:
+            self._queue.put_nowait(
+                (time.time(), lead_id, features, primary.version, score)
+            )
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        """Score everything queued so far and stop the background thread."""
+        self._closed = True
+        if not self._thread.is_alive():
+            return
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+
+    def snapshot(self) -> dict:
+        """Return candidate, queue and score-difference counters."""
+        return {
+            "version": self.model.version,
+            "record_path": str(self.record_path) if self.record_path else None,
+            "max_rate": self.max_rate,
+            "queue_size": self._queue.maxsize,
+            "backlog": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "throttled": self.throttled,
+            "scored": self.scored,
+            "errors": self.errors,
+            "mean_abs_diff": self.total_abs_diff / self.scored if self.scored else 0.0,
+            "max_abs_diff": self.max_abs_diff,
+            "recent": list(self.pairs),
+        }
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = self._STOP in batch
+            items = [item for item in batch if item is not self._STOP]
+            if items:
+                try:
+                    self._score(items)
+                except Exception:  # pylint: disable=broad-exception-caught
+                    # A failing candidate must not kill the scorer thread
+                    self.errors += len(items)
+                    logger.exception("Shadow scoring failed")
+            if stopping:
+                return
+
+    def _score(self, items: List[tuple]):
+        vectors = []
+        scorable = []
+        for item in items:
+            try:
+                vectors.append(self.model.vectorize(item[2]))
+                scorable.append(item)
+            except FeatureSchemaError:
+                self.errors += 1
+        if not scorable:
+            return
+        # Bypass LoadedModel.predict so shadow calls stay out of serving metrics
+        scores = self.model.predictor.predict(self.model.schema.matrix(vectors))
+
+        pairs = []
+        for (created, lead_id, _, version, primary), shadow in zip(
+            scorable, scores.tolist()
+        ):
+            diff = abs(shadow - primary)
+            self.total_abs_diff += diff
+            self.max_abs_diff = max(self.max_abs_diff, diff)
+            pairs.append(
+                {
+                    "timestamp": created,
+                    "lead_id": lead_id,
+                    "primary_version": version,
+                    "primary_score": primary,
+                    "shadow_version": self.model.version,
+                    "shadow_score": shadow,
+                }
+            )
+        self.scored += len(pairs)
+        self.pairs.extend(pairs)
+        if self.record_path is not None:
+            with open(self.record_path, "a", encoding="utf-8") as handle:
+                handle.write("".join(json.dumps(pair) + "\n" for pair in pairs))
+
+
+class ModelRouter:
+    """Assigns requests to model versions and feeds the shadow candidate.
+
+    Args:
+        registry: Registry whose active model serves traffic not sent to a variant
+        variants: Version -> fraction of traffic it serves
+        split: ``percent`` for a random split per request, ``hash`` for a
+            stable split by ``lead_id``
+        salt: Mixed into the hash so new experiments reshuffle leads
+        shadow: Scorer of the shadow candidate, if any
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        variants: Mapping[str, float] | None = None,
+        split: str = "hash",
+        salt: str = "",
+        shadow: ShadowScorer | None = None,
+    ):
+        if split not in SPLIT_MODES:
+            raise ValueError(f"Unsupported split mode: {split!r}")
+        variants = dict(variants or {})
+        if any(share < 0 for share in variants.values()):
+            raise ValueError("Variant traffic shares must not be negative")
+        if sum(variants.values()) > 1:
+            raise ValueError("Variant traffic shares add up to more than 1")
+        self.registry = registry
+        self.split = split
+        self.salt = salt
+        self.shadow = shadow
+        self.variants = variants
+        # Cumulative upper bounds of each variant's slice of [0, 1)
+        self._ranges = []
+        bound = 0.0
+        for version, share in variants.items():
+            bound += share
+            self._ranges.append((bound, registry.load(version)))
+        self.assignments: Dict[str, int] = {}
+
+    def choose(self, lead_id: int) -> LoadedModel:
+        """Model version that scores this request."""
+        if self._ranges:
+            point = (
+                lead_bucket(lead_id, self.salt)
+                if self.split == "hash"
+                else random.random()
+            )
+            for bound, model in self._ranges:
+                if point < bound:
+                    break
+            else:
+                model = self.registry.active
+        else:
+            model = self.registry.active
+        self.assignments[model.version] = self.assignments.get(model.version, 0) + 1
+        return model
+
+    def record(
+        self,
+        lead_id: int,
+        features: Mapping[str, float],
+        model: LoadedModel,
+        score: float,
+    ):
+        """Send a scored request to the shadow candidate, if there is one."""
+        if self.shadow is not None:
+            self.shadow.submit(lead_id, features, model, score)
+
+    def close(self):
+        """Drain and stop the shadow scorer."""
+        if self.shadow is not None:
+            self.shadow.stop()
+
+    def snapshot(self) -> dict:
+        """Return the split configuration, assignment counts and shadow state."""
+        return {
+            "split": self.split,
+            "variants": dict(self.variants),
+            "assignments": dict(self.assignments),
+            "shadow": self.shadow.snapshot() if self.shadow is not None else None,
+        }
+
+
+@lru_cache()
+def get_model_router() -> ModelRouter | None:
+    """Get the model router, or None when A/B and shadow routing are off."""
+    config = get_settings().routing
+    if not config.enabled:
+        return None
+    registry = get_model_registry()
+    shadow = None
+    if config.shadow_version:
+        if config.record_path:
+            Path(config.record_path).parent.mkdir(parents=True, exist_ok=True)
+        shadow = ShadowScorer(
+            registry.load(config.shadow_version),
+            queue_size=config.shadow_queue_size,
+            batch_size=config.shadow_batch_size,
+            record_path=config.record_path,
+            max_rate=config.shadow_max_rate,
+        )
+    return ModelRouter(
+        registry,
+        variants=config.variants,
+        split=config.split,
+        salt=config.salt,
+        shadow=shadow,
+    )
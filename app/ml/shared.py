@@ -0,0 +1,108 @@
+"""
+Memory-mapped model weights shared between worker processes.
+
+Before the server starts several workers, the launcher loads the active
+model once and exports its predictor into a shared directory (``/dev/shm``
+by default)::
+
+    <shared_dir>/<name>/<version>/predictor.pkl   pickled predictor skeleton
+    <shared_dir>/<name>/<version>/weights.bin     raw array buffers
+    <shared_dir>/<name>/<version>/meta.json       buffer layout, descriptor hash
+
+The predictor is pickled with protocol 5 so its NumPy arrays are written
+out-of-band into ``weights.bin``. Workers map that file read-only and
+unpickle the predictor on top of the mapping, so every worker reads the same
+physical pages instead of holding its own copy of the weights.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pickle
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+PREDICTOR_FILE = "predictor.pkl"
+WEIGHTS_FILE = "weights.bin"
+META_FILE = "meta.json"
+
+# Buffers start on cache-line boundaries inside the weights file
+ALIGNMENT = 64
+
+
+def descriptor_digest(descriptor: bytes) -> str:
+    """Digest identifying the descriptor an export was built from."""
+    return hashlib.blake2b(descriptor, digest_size=16).hexdigest()
+
+
+def export_predictor(
+    predictor: object, directory: Path, name: str, version: str, digest: str
+) -> Path:
+    """Write a predictor and its array buffers into the shared directory.
+
+    Args:
+        predictor: Predictor built by a model flavor
+        directory: Shared weights root directory
+        name: Model name
+        version: Model version
+        digest: ``descriptor_digest`` of the version's descriptor
+
+    Returns:
+        The export directory of the model version
+    """
+    target = Path(directory) / name / version
+    target.mkdir(parents=True, exist_ok=True)
+
+    buffers = []
+    payload = pickle.dumps(predictor, protocol=5, buffer_callback=buffers.append)
+    layout = []
+    offset = 0
+    with open(target / WEIGHTS_FILE, "wb") as weights:
+        for buffer in buffers:
+            raw = buffer.raw()
+            padding = -offset % ALIGNMENT
+            weights.write(b"\0" * padding)
+            offset += padding
+            weights.write(raw)
+            layout.append([offset, raw.nbytes])
+            offset += raw.nbytes
+
+    (target / PREDICTOR_FILE).write_bytes(payload)
+    # The metadata is written last, an export without it is incomplete
+    meta = {"digest": digest, "buffers": layout}
+    (target / META_FILE).write_text(json.dumps(meta))
+    logger.info("Exported model %s version %s to %s", name, version, target)
+    return target
+
+
+def load_predictor(
+    directory: Path, name: str, version: str, digest: str
+) -> object | None:
+    """Load an exported predictor with its arrays mapped from shared memory.
+
+    Returns None when no complete export exists for the version or when it
+    was built from a different descriptor, so the caller loads from the
+    artifact tree instead.
+    """
+    target = Path(directory) / name / version
+    try:
+        meta = json.loads((target / META_FILE).read_text())
+        payload = (target / PREDICTOR_FILE).read_bytes()
+    except (OSError, ValueError):
+        return None
+    if meta.get("digest") != digest:
+        logger.warning("Ignoring stale shared export at %s", target)
+        return None
+
+    with open(target / WEIGHTS_FILE, "rb") as weights:
+        size = os.fstat(weights.fileno()).st_size
+        # The mapping stays valid after the file is closed, empty files
+        # (predictors without arrays or with empty ones) cannot be mapped
+        view = memoryview(
+            mmap.mmap(weights.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        )
+    buffers = [view[offset : offset + length] for offset, length in meta["buffers"]]
+    return pickle.loads(payload, buffers=buffers)
@@ -0,0 +1,218 @@
+"""
+Tree-ensemble model flavor compiled to flat NumPy arrays.
+
+A ``tree_ensemble`` descriptor lists its trees in node-array form, as
+exported from gradient-boosting or random-forest libraries::
+
+    "params": {
+        "base_score": 0.0,
+        "aggregation": "sum",         # or "mean" for random forests
+        "link": "logistic",           # or "identity"
+        "decision": "<=",             # or "<", the test sending a row left
+        "trees": [
+            {
+                "feature": ["age", null, null],
+                "threshold": [35.0, 0.0, 0.0],
+                "left": [1, -1, -1],
+                "right": [2, -1, -1],
+                "value": [0.0, -0.4, 0.7],
+                "default_left": [true, false, false]
+            }
+        ]
+    }
+
+Node 0 is the root of each tree, leaves have ``left == -1`` and their
+``value`` is the tree's output. ``default_left`` (optional, all false by
+default) sends missing (NaN) values left instead of right.
+
+At load time every tree is renumbered breadth-first into one set of flat
+node arrays (feature column, threshold, first child, leaf value) in which
+the children of a node are adjacent, so a row moves to ``child + went_right``
+and a leaf, whose threshold never sends a row right, points to itself.
+Prediction advances every (row, tree) pair one level per step, for as many
+steps as the deepest tree, so a whole feature matrix is scored with a few
+vectorized operations per level instead of a Python loop per row and tree.
+"""
+
+from collections import deque
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+LEAF = -1
+
+# Rows evaluated together, keeps the (rows, trees) working arrays in cache
+BLOCK_PAIRS = 1 << 16
+
+
+class TreeEnsemble:
+    """Tree ensemble evaluated over all trees and rows at once.
+
+    Args:
+        feature: Feature column tested by each node, 0 for leaves
+        threshold: Split threshold of each node, NaN for leaves
+        child: Index of each node's left child, the right one follows it;
+            leaves point to themselves
+        value: Output of each leaf, 0 for split nodes
+        missing_right: Whether missing values go right at each node
+        roots: Index of the root of each tree
+        depth: Depth of the deepest tree
+        base_score: Constant added to the aggregated tree outputs
+        aggregation: ``sum`` (boosting) or ``mean`` (random forests)
+        link: ``identity`` or ``logistic`` (squashed into a 0-100 score)
+        decision: ``<=`` or ``<``, the comparison sending a row left
+    """
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        child: np.ndarray,
+        value: np.ndarray,
+        missing_right: np.ndarray,
+        roots: np.ndarray,
+        depth: int,
+        base_score: float = 0.0,
+        aggregation: str = "sum",
+        link: str = "identity",
+        decision: str = "<=",
+    ):
+        if aggregation not in ("sum", "mean"):
+            raise ValueError(f"Unsupported aggregation: {aggregation}")
+        if link not in ("identity", "logistic"):
+            raise ValueError(f"Unsupported link function: {link}")
+        if decision not in ("<=", "<"):
+            raise ValueError(f"Unsupported decision type: {decision}")
+        self.feature = feature
+        self.threshold = threshold
+        self.child = child
+        self.value = value
+        self.missing_right = missing_right
+        self.roots = roots
+        self.depth = depth
+        self.base_score = base_score
+        self.aggregation = aggregation
+        self.link = link
+        self.decision = decision
+
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """Index of the leaf reached by each row in each tree.
+
+        Returns:
+            An ``(n_rows, n_trees)`` array of node indices
+        """
+        X = np.ascontiguousarray(X, dtype=float)
+        n_rows, n_features = X.shape
+        # Comparisons with NaN are false: NaN values and NaN leaf thresholds
+        # go left unless the node sends missing values right
+        goes_right = np.greater if self.decision == "<=" else np.greater_equal
+        missing = bool(np.isnan(X).any())
+        flat = X.ravel()
+        result = np.empty((n_rows, len(self.roots)), dtype=np.intp)
+        block = max(1, BLOCK_PAIRS // len(self.roots))
+        for start in range(0, n_rows, block):
+            rows = min(block, n_rows - start)
+            offsets = np.arange(start, start + rows, dtype=np.intp)[:, None]
+            offsets *= n_features
+            nodes = np.tile(self.roots, (rows, 1))
+            for _ in range(self.depth):
+                values = flat[offsets + self.feature[nodes]]
+                right = goes_right(values, self.threshold[nodes])
+                if missing:
+                    right |= np.isnan(values) & self.missing_right[nodes]
+                nodes = self.child[nodes]
+                nodes += right
+            result[start : start + rows] = nodes
+        return result
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Score every row of the feature matrix."""
+        outputs = self.value[self.leaves(X)]
+        if self.aggregation == "mean":
+            z = outputs.mean(axis=1)
+        else:
+            z = outputs.sum(axis=1)
+        z += self.base_score
+        if self.link == "logistic":
+            return 100.0 / (1.0 + np.exp(-z))
+        return z
+
+
+def _check_tree(number: int, tree: dict) -> int:
+    """Validate the node arrays of a tree and return its node count."""
+    fields = ("feature", "threshold", "right", "value")
+    missing = [field for field in ("left", *fields) if field not in tree]
+    if missing:
+        raise ValueError(f"Tree {number} is missing {', '.join(missing)}")
+    size = len(tree["left"])
+    if size == 0 or any(len(tree[field]) != size for field in fields):
+        raise ValueError(f"Tree {number} has inconsistent node arrays")
+    if "default_left" in tree and len(tree["default_left"]) != size:
+        raise ValueError(f"Tree {number} has inconsistent node arrays")
+    return size
+
+
+def compile_trees(trees: List[dict], features: List[str]) -> dict:
+    """Renumber node-array trees into the flat arrays of a ``TreeEnsemble``."""
+    if not trees:
+        raise ValueError("A tree ensemble needs at least one tree")
+    columns = {name: index for index, name in enumerate(features)}
+    feature, threshold, child, value, missing_right = [], [], [], [], []
+    roots = []
+    depth = 0
+    for number, tree in enumerate(trees):
+        size = _check_tree(number, tree)
+        default_left = tree.get("default_left", [False] * size)
+        roots.append(len(feature))
+        seen = set()
+        # Breadth-first, so both children of a node get consecutive indices
+        pending = deque([(0, 0)])
+        while pending:
+            node, level = pending.popleft()
+            if not 0 <= node < size or node in seen:
+                raise ValueError(f"Tree {number} has an invalid child {node}")
+            seen.add(node)
+            left, right = tree["left"][node], tree["right"][node]
+            if (left == LEAF) != (right == LEAF):
+                raise ValueError(f"Tree {number} has nodes with a single child")
+            if left == LEAF:
+                child.append(len(feature))
+                feature.append(0)
+                threshold.append(np.nan)
+                value.append(float(tree["value"][node]))
+                missing_right.append(False)
+                depth = max(depth, level)
+                continue
+            # The children are numbered after the nodes already queued
+            child.append(len(feature) + len(pending) + 1)
+            name = tree["feature"][node]
+            if name not in columns:
+                raise ValueError(f"Tree {number} uses unknown feature {name!r}")
+            feature.append(columns[name])
+            threshold.append(float(tree["threshold"][node]))
+            value.append(0.0)
+            missing_right.append(not default_left[node])
+            pending.extend([(left, level + 1), (right, level + 1)])
+
+    return {
+        "feature": np.array(feature, dtype=np.intp),
+        "threshold": np.array(threshold, dtype=float),
+        "child": np.array(child, dtype=np.intp),
+        "value": np.array(value, dtype=float),
+        "missing_right": np.array(missing_right, dtype=bool),
+        "roots": np.array(roots, dtype=np.intp),
+        "depth": depth,
+    }
+
+
+def load_tree_ensemble(_path: Path, features: List[str], params: dict) -> TreeEnsemble:
+    """Build a ``TreeEnsemble`` from its descriptor parameters."""
+    return TreeEnsemble(
+        **compile_trees(params["trees"], features),
+        base_score=float(params.get("base_score", 0.0)),
+        aggregation=params.get("aggregation", "sum"),
+        link=params.get("link", "identity"),
+        decision=params.get("decision", "<="),
+    )
@@ -0,0 +1,241 @@
+"""
+Administrative endpoints for inspecting and operating the model server.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from ..core.admission import AdmissionController, get_admission_controller
+from ..core.rate_limit import RateLimiter, get_rate_limiter
+from ..core.logging import error_logger, get_log_pipeline
+from ..core.profiling import RequestProfiler, get_profiler
+from ..core.tracing import Tracer, get_tracer
+from ..ml.audit import AuditSink, get_audit_sink
+from ..ml.batching import MicroBatcher, get_batcher
+from ..ml.cache import PredictionCache, get_prediction_cache
+from ..ml.drift import DriftMonitor, get_drift_monitor
+from ..ml.executor import InferenceExecutor, get_executor
+from ..ml.feature_store import FeatureStore, get_feature_store
+from ..ml.registry import (
+    InvalidModelVersionError,
+    LoadedModel,
+    ModelLoadError,
+    ModelRegistry,
+    get_model_registry,
+)
+from ..ml.routing import ModelRouter, get_model_router
+from ..schemas.model_activation_request import ModelActivationRequest
+from ..schemas.model_info_response import ModelInfoResponse
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+def _model_info(model: LoadedModel) -> ModelInfoResponse:
+    return ModelInfoResponse(
+        name=model.name,
+        version=model.version,
+        flavor=model.flavor,
+        features=list(model.feature_names),
+        loaded_at=model.loaded_at,
+    )
+
+
+@router.get("/model", response_model=ModelInfoResponse)
+async def get_active_model(
+    registry: ModelRegistry = Depends(get_model_registry),
+) -> ModelInfoResponse:
+    """Describe the currently active model version."""
+    return _model_info(registry.active)
+
+
+@router.put("/model", response_model=ModelInfoResponse)
+async def activate_model(
+    request: ModelActivationRequest,
+    registry: ModelRegistry = Depends(get_model_registry),
+) -> ModelInfoResponse:
+    """Load a model version and hot-swap it in as the active model."""
+    try:
+        model = registry.activate(request.version)
+    except InvalidModelVersionError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except ModelLoadError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return _model_info(model)
+
+
+@router.get("/batcher")
+async def get_batcher_stats(batcher: MicroBatcher = Depends(get_batcher)):
+    """Report micro-batcher configuration, batch sizes and queue waits."""
+    return {
+        "enabled": batcher.enabled,
+        "max_batch_size": batcher.max_batch_size,
+        "max_wait_ms": batcher.max_wait * 1000,
+        **batcher.stats.snapshot(),
+    }
+
+
+@router.get("/cache")
+async def get_cache_stats(cache: PredictionCache = Depends(get_prediction_cache)):
+    """Report prediction cache size and hit/miss/eviction counters."""
+    return cache.snapshot()
+
+
+@router.delete("/cache")
+async def clear_cache(cache: PredictionCache = Depends(get_prediction_cache)):
+    """Drop every cached prediction."""
+    cache.clear()
+    return cache.snapshot()
+
+
+@router.get("/executor")
+async def get_executor_stats(executor: InferenceExecutor = Depends(get_executor)):
+    """Report inference executor mode, queue depth and timeout counters."""
+    return executor.snapshot()
+
+
+@router.get("/admission")
+async def get_admission_stats(
+    controller: AdmissionController | None = Depends(get_admission_controller),
+):
+    """Report in-flight, queue and shed counters per route group."""
+    if controller is None:
+        return {"enabled": False}
+    return {"enabled": True, **controller.snapshot()}
+
+
+@router.get("/rate-limit")
+async def get_rate_limit_stats(
+    limiter: RateLimiter | None = Depends(get_rate_limiter),
+):
+    """Report limits, tracked clients and rejections per route group."""
+    if limiter is None:
+        return {"enabled": False}
+    return {"enabled": True, **limiter.snapshot()}
+
+
+@router.get("/traces")
+async def get_traces(
+    limit: int = Query(default=20, ge=0, le=1000),
+    tracer: Tracer | None = Depends(get_tracer),
+):
+    """Report sampling counters and the most recent traces with their spans."""
+    if tracer is None:
+        return {"enabled": False}
+    return {"enabled": True, **tracer.snapshot(), "traces": tracer.recent(limit)}
+
+
+@router.get("/feature-store")
+async def get_feature_store_stats(
+    store: FeatureStore | None = Depends(get_feature_store),
+):
+    """Report feature store metadata and hot-row cache counters."""
+    if store is None:
+        return {"enabled": False}
+    return {"enabled": True, **store.snapshot()}
+
+
+@router.post("/feature-store/refresh")
+async def refresh_feature_store(
+    store: FeatureStore | None = Depends(get_feature_store),
+):
+    """Rebuild the feature store from its snapshot and swap it in."""
+    if store is None:
+        raise HTTPException(status_code=404, detail="Feature store is disabled")
+    try:
+        # Building reads the whole snapshot, keep it off the event loop
+        leads = await run_in_threadpool(store.refresh)
+    except (OSError, ValueError) as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return {"enabled": True, "leads": leads, **store.snapshot()}
+
+
+@router.get("/routing")
+async def get_routing_stats(
+    model_router: ModelRouter | None = Depends(get_model_router),
+):
+    """Report A/B assignments per version and shadow scoring counters."""
+    if model_router is None:
+        return {"enabled": False}
+    return {"enabled": True, **model_router.snapshot()}
+
+
+@router.get("/audit")
+async def get_audit_stats(audit: AuditSink | None = Depends(get_audit_sink)):
+    """Report the audit sink's backlog, dropped records and flush latency."""
+    if audit is None:
+        return {"enabled": False}
+    return {"enabled": True, **audit.snapshot()}
+
+
+def _served_model(
+    version: str | None, registry: ModelRegistry, monitor: DriftMonitor
+) -> LoadedModel:
+    model = registry.active
+    if version is None or version == model.version:
+        return model
+    served = monitor.served(version)
+    if served is None:
+        raise HTTPException(
+            status_code=404, detail=f"Model version {version!r} has not served traffic"
+        )
+    return served
+
+
+@router.get("/drift")
+async def get_drift_stats(
+    version: str | None = None,
+    registry: ModelRegistry = Depends(get_model_registry),
+    monitor: DriftMonitor | None = Depends(get_drift_monitor),
+):
+    """Report live feature and score statistics with PSI against the reference.
+
+    Defaults to the active model; ``version`` selects another served version.
+    """
+    if monitor is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        **monitor.snapshot(_served_model(version, registry, monitor)),
+    }
+
+
+@router.get("/drift/profile")
+async def get_drift_profile(
+    version: str | None = None,
+    registry: ModelRegistry = Depends(get_model_registry),
+    monitor: DriftMonitor | None = Depends(get_drift_monitor),
+):
+    """Return live histograms in the reference profile format."""
+    if monitor is None:
+        raise HTTPException(status_code=404, detail="Drift statistics are disabled")
+    return monitor.profile(_served_model(version, registry, monitor))
+
+
+@router.get("/logging")
+async def get_logging_stats():
+    """Report the log pipeline's counters and the current error fingerprints."""
+    errors = error_logger.aggregator.snapshot()
+    pipeline = get_log_pipeline()
+    if pipeline is None:
+        return {"mode": "sync", "errors": errors}
+    return {"mode": "async", **pipeline.snapshot(), "errors": errors}
+
+
+@router.get("/profiles")
+async def get_profiles(profiler: RequestProfiler | None = Depends(get_profiler)):
+    """Report the most recent request profiles, newest last."""
+    if profiler is None:
+        return {"enabled": False, "profiles": []}
+    return profiler.snapshot()
+
+
+@router.delete("/profiles")
+async def clear_profiles(profiler: RequestProfiler | None = Depends(get_profiler)):
+    """Drop every stored request profile."""
+    if profiler is None:
+        return {"enabled": False, "profiles": []}
+    profiler.clear()
+    return profiler.snapshot()
@@ -3,7 +3,10 @@ Health check endpoints for monitoring and diagnostics.
 """
 
 from datetime import datetime, timezone
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from ..core.startup import StartupTimings, get_startup_timings
+from ..core.workers import WorkerStatus, get_worker_status
 
 router = APIRouter(
     prefix="/health",
@@ -20,3 +23,30 @@ async def basic_health_check():
         "service": "MLFlow FastAPI Backend",
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
+
+
+@router.get("/ready")
+async def readiness_check(
+    status: WorkerStatus = Depends(get_worker_status),
+    timings: StartupTimings = Depends(get_startup_timings),
+):
+    """Report whether this worker has loaded and warmed up its model.
+
+    Stays 503 until the startup warmup has finished, so orchestrators only
+    route traffic to warm replicas. Includes the startup phase timings.
+    """
+    return JSONResponse(
+        status_code=200 if status.ready else 503,
+        content={**status.snapshot(), "startup": timings.snapshot()},
+    )
+
+
+@router.get("/workers")
+async def workers_check(status: WorkerStatus = Depends(get_worker_status)):
+    """Report the readiness of every worker sharing this server."""
+    workers = status.collect()
+    return {
+        "workers": workers,
+        "ready": sum(1 for worker in workers if worker["ready"]),
+        "total": len(workers),
+    }
@@ -2,10 +2,40 @@
 Lead scoring API router.
 
 This module defines the API endpoints for lead scoring functionality,
-including score calculation and health check endpoints.
+including single, batch and streaming score calculation.
 """
 
-from fastapi import APIRouter
+import time
+from typing import AsyncIterator, List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from ..config.config import Settings, get_settings
+from ..core.codec import ScoringCodec, get_codec, openapi_extra
+from ..core.tracing import get_request_id, span
+from ..core.streaming import (
+    NDJSON_MEDIA_TYPE,
+    NDJSONStreamingResponse,
+    iter_ndjson_lines,
+    parse_ndjson_chunk,
+    render_ndjson_chunk,
+)
+from ..ml.audit import AuditSink, get_audit_sink
+from ..ml.batching import MicroBatcher, get_batcher
+from ..ml.cache import PredictionCache, get_prediction_cache
+from ..ml.drift import DriftMonitor, get_drift_monitor
+from ..ml.executor import (
+    InferenceExecutor,
+    InferenceUnavailableError,
+    get_executor,
+)
+from ..ml.feature_store import (
+    FeatureStore,
+    get_feature_store,
+    missing_features_error,
+)
+from ..ml.features import FeatureSchemaError, FeatureVector
+from ..ml.registry import LoadedModel, ModelRegistry, get_model_registry
+from ..ml.routing import ModelRouter, get_model_router
 from ..schemas.lead_scoring_request import LeadScoringRequest
 from ..schemas.lead_scoring_response import LeadScoringResponse
 
@@ -16,7 +46,289 @@ router = APIRouter(
 )
 
 
-@router.post("/score", response_model=LeadScoringResponse)
-async def score(request: LeadScoringRequest) -> LeadScoringResponse:
-    """Calculate lead scoring based on request data."""
-    return LeadScoringResponse(lead_id=request.lead_id, score=25)
+@router.post(
+    "/score",
+    response_model=LeadScoringResponse,
+    openapi_extra=openapi_extra(LeadScoringRequest.model_json_schema()),
+)
+async def score(
+    http_request: Request,
+    codec: ScoringCodec = Depends(get_codec),
+    registry: ModelRegistry = Depends(get_model_registry),
+    batcher: MicroBatcher = Depends(get_batcher),
+    cache: PredictionCache = Depends(get_prediction_cache),
+    store: FeatureStore | None = Depends(get_feature_store),
+    model_router: ModelRouter | None = Depends(get_model_router),
+    audit: AuditSink | None = Depends(get_audit_sink),
+    drift: DriftMonitor | None = Depends(get_drift_monitor),
+) -> Response:
+    """Calculate lead scoring based on a ``LeadScoringRequest`` body.
+
+    The body is decoded by the scoring codec straight into the lead's
+    features, and the ``LeadScoringResponse`` is encoded in the media type
+    the client accepts. Without ``features`` the lead's features come from
+    the feature store. Repeated leads are answered from the prediction
+    cache, other concurrent calls are micro-batched into a single vectorized
+    predict. With A/B routing the lead may be scored by a variant version,
+    and a copy of the request is queued for the shadow candidate once the
+    score is known.
+    """
+    with span("validation"):
+        lead_id, features = codec.decode_lead(
+            await http_request.body(), http_request.headers.get("content-type")
+        )
+    start = time.perf_counter()
+    with span("feature_assembly"):
+        if features is None:
+            features = store.get(lead_id) if store is not None else None
+            if features is None:
+                raise RequestValidationError([missing_features_error(("body",), store)])
+        # Take one reference so a concurrent hot-swap cannot change the model
+        # mid-request
+        active = registry.active
+        model = active if model_router is None else model_router.choose(lead_id)
+        vector = _vectorize(model, features, ("body",))
+    with span("inference") as inference:
+        # The cache holds a single model's scores, variants are not cached
+        cached = cache.enabled and model is active
+        key = cache.key(model, lead_id, vector) if cached else None
+        value = cache.get(key) if key else None
+        inference.set(model_version=model.version, cache_hit=value is not None)
+        if value is None:
+            value = await batcher.score(model, vector)
+            if key:
+                cache.put(key, value)
+    if model_router is not None:
+        model_router.record(lead_id, features, model, value)
+    if audit is not None:
+        await audit.record(
+            _request_id(http_request),
+            model,
+            (lead_id,),
+            (vector,),
+            (value,),
+            time.perf_counter() - start,
+        )
+    if drift is not None:
+        drift.observe(model, (features,), (vector,), (value,))
+    with span("serialization"):
+        return codec.encode(
+            {"lead_id": lead_id, "score": float(value)},
+            http_request.headers.get("accept"),
+        )
+
+
+@router.post(
+    "/score/batch",
+    response_model=List[LeadScoringResponse],
+    openapi_extra=openapi_extra(
+        {"type": "array", "items": LeadScoringRequest.model_json_schema()}
+    ),
+)
+async def score_batch(
+    http_request: Request,
+    codec: ScoringCodec = Depends(get_codec),
+    registry: ModelRegistry = Depends(get_model_registry),
+    settings: Settings = Depends(get_settings),
+    cache: PredictionCache = Depends(get_prediction_cache),
+    executor: InferenceExecutor = Depends(get_executor),
+    store: FeatureStore | None = Depends(get_feature_store),
+    audit: AuditSink | None = Depends(get_audit_sink),
+    drift: DriftMonitor | None = Depends(get_drift_monitor),
+) -> Response:
+    """Score a list of leads in one vectorized call, preserving input order.
+
+    Leads sent without ``features`` are looked up in the feature store in
+    bulk. Leads found in the prediction cache are not re-scored.
+    """
+    with span("validation"):
+        requests = codec.decode_batch(
+            await http_request.body(), http_request.headers.get("content-type")
+        )
+    start = time.perf_counter()
+    if len(requests) > settings.api.max_batch_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch size {len(requests)} exceeds the limit of "
+            f"{settings.api.max_batch_size}",
+        )
+
+    with span("feature_assembly") as assembly:
+        lookups = [lead_id for lead_id, features in requests if features is None]
+        found = store.get_many(lookups) if store is not None and lookups else {}
+
+        model = registry.active
+        rows = []
+        vectors = []
+        errors = []
+        for position, (lead_id, features) in enumerate(requests):
+            if features is None:
+                features = found.get(lead_id)
+                if features is None:
+                    errors.append(missing_features_error(("body", position), store))
+                    continue
+            try:
+                vectors.append(model.vectorize(features))
+            except FeatureSchemaError as exc:
+                errors.extend(_prefix_errors(exc, ("body", position)))
+            else:
+                rows.append(features)
+        assembly.set(leads=len(requests), store_lookups=len(lookups))
+        if errors:
+            raise RequestValidationError(errors)
+
+    with span("inference") as inference:
+        scores: List[float | None] = [None] * len(requests)
+        keys = []
+        if cache.enabled:
+            for position, ((lead_id, _), vector) in enumerate(zip(requests, vectors)):
+                key = cache.key(model, lead_id, vector)
+                keys.append(key)
+                scores[position] = cache.get(key)
+
+        misses = [position for position, value in enumerate(scores) if value is None]
+        inference.set(model_version=model.version, rows=len(misses))
+        if misses:
+            values = await executor.predict(
+                model, [vectors[position] for position in misses]
+            )
+            for position, value in zip(misses, values.tolist()):
+                scores[position] = value
+                if keys:
+                    cache.put(keys[position], value)
+
+    if audit is not None:
+        await audit.record(
+            _request_id(http_request),
+            model,
+            [lead_id for lead_id, _ in requests],
+            vectors,
+            scores,
+            time.perf_counter() - start,
+        )
+    if drift is not None:
+        drift.observe(model, rows, vectors, scores)
+    with span("serialization"):
+        return codec.encode(
+            [
+                {"lead_id": lead_id, "score": float(value)}
+                for (lead_id, _), value in zip(requests, scores)
+            ],
+            http_request.headers.get("accept"),
+        )
+
+
+def _request_id(request: Request) -> str:
+    return get_request_id(request.scope)
+
+
+def _prefix_errors(exc: FeatureSchemaError, prefix: tuple) -> List[dict]:
+    return [{**error, "loc": (*prefix, *error["loc"])} for error in exc.errors]
+
+
+def _vectorize(model: LoadedModel, features: dict, prefix: tuple) -> FeatureVector:
+    """Vectorize request features, reporting schema violations as a 422."""
+    try:
+        return model.vectorize(features)
+    except FeatureSchemaError as exc:
+        raise RequestValidationError(_prefix_errors(exc, prefix)) from exc
+
+
+async def _score_ndjson_chunk(
+    chunk: list,
+    model: LoadedModel,
+    executor: InferenceExecutor,
+    store: FeatureStore | None,
+    audit: AuditSink | None,
+    drift: DriftMonitor | None,
+    request_id: str,
+) -> bytes:
+    start = time.perf_counter()
+    with span("feature_assembly"):
+        outputs, valid, vectors = parse_ndjson_chunk(chunk, model, store)
+    if not valid:
+        return render_ndjson_chunk(chunk, outputs, valid, [])[0]
+    try:
+        with span("inference") as inference:
+            inference.set(model_version=model.version, rows=len(vectors))
+            scores = await executor.predict(model, vectors)
+    except InferenceUnavailableError as exc:
+        # The response has already started, so report it per line instead of a 503
+        return render_ndjson_chunk(chunk, outputs, valid, error=str(exc))[0]
+    scores = scores.tolist()
+    if audit is not None:
+        await audit.record(
+            request_id,
+            model,
+            [lead.lead_id for _, lead in valid],
+            vectors,
+            scores,
+            time.perf_counter() - start,
+        )
+    if drift is not None:
+        drift.observe(model, [lead.features for _, lead in valid], vectors, scores)
+    return render_ndjson_chunk(chunk, outputs, valid, scores)[0]
+
+
+async def _score_ndjson(
+    request: Request,
+    registry: ModelRegistry,
+    executor: InferenceExecutor,
+    store: FeatureStore | None,
+    audit: AuditSink | None,
+    drift: DriftMonitor | None,
+    chunk_size: int,
+    max_line_bytes: int,
+) -> AsyncIterator[bytes]:
+    """Score NDJSON lines in chunks, yielding one NDJSON blob per chunk."""
+    request_id = _request_id(request)
+    chunk = []
+    async for line_number, line in iter_ndjson_lines(request.stream(), max_line_bytes):
+        chunk.append((line_number, line))
+        if len(chunk) >= chunk_size:
+            yield await _score_ndjson_chunk(
+                chunk, registry.active, executor, store, audit, drift, request_id
+            )
+            chunk = []
+    if chunk:
+        yield await _score_ndjson_chunk(
+            chunk, registry.active, executor, store, audit, drift, request_id
+        )
+
+
+@router.post(
+    "/score/stream",
+    response_class=NDJSONStreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def score_stream(
+    request: Request,
+    registry: ModelRegistry = Depends(get_model_registry),
+    settings: Settings = Depends(get_settings),
+    executor: InferenceExecutor = Depends(get_executor),
+    store: FeatureStore | None = Depends(get_feature_store),
+    audit: AuditSink | None = Depends(get_audit_sink),
+    drift: DriftMonitor | None = Depends(get_drift_monitor),
+) -> NDJSONStreamingResponse:
+    """Score an NDJSON stream of leads, streaming NDJSON results back.
+
+    Each input line is a ``LeadScoringRequest``; each output line is either a
+    ``LeadScoringResponse`` or an error record for the matching input line.
+    """
+    return NDJSONStreamingResponse(
+        _score_ndjson(
+            request,
+            registry,
+            executor,
+            store,
+            audit,
+            drift,
+            settings.api.stream_chunk_size,
+            settings.api.stream_max_line_bytes,
+        )
+    )
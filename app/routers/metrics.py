@@ -0,0 +1,18 @@
+"""
+Prometheus metrics endpoint.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..core.metrics import collect_metrics, render_prometheus
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Expose request, inference and error metrics in Prometheus text format."""
+    return PlainTextResponse(
+        render_prometheus(collect_metrics()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
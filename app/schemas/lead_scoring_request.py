@@ -1,6 +1,6 @@
 """Lead scoring request schema definitions."""
 
-from typing import Dict
+from typing import Dict, Optional
 from pydantic import BaseModel
 
 
@@ -9,8 +9,10 @@ class LeadScoringRequest(BaseModel):
 
     Attributes:
         lead_id: Unique identifier for the lead
-        features: Dictionary of feature names and their values for scoring
+        features: Dictionary of feature names and their values for scoring;
+            may be omitted when the feature store is enabled, features are
+            then looked up by ``lead_id``
     """
 
     lead_id: int
-    features: Dict[str, float]
+    features: Optional[Dict[str, float]] = None
@@ -0,0 +1,13 @@
+"""Model activation request schema definitions."""
+
+from pydantic import BaseModel
+
+
+class ModelActivationRequest(BaseModel):
+    """Request model for switching the active model version.
+
+    Attributes:
+        version: Model version to load and activate
+    """
+
+    version: str
@@ -0,0 +1,22 @@
+"""Model information response schema definitions."""
+
+from typing import List
+from pydantic import BaseModel
+
+
+class ModelInfoResponse(BaseModel):
+    """Response model describing the active model version.
+
+    Attributes:
+        name: Registered model name
+        version: Active model version
+        flavor: Model flavor used to build the predictor
+        features: Ordered feature names expected by the model
+        loaded_at: Unix timestamp when the version was loaded
+    """
+
+    name: str
+    version: str
+    flavor: str
+    features: List[str]
+    loaded_at: float
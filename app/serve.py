@@ -0,0 +1,106 @@
+"""
+Server launcher with an optional multi-worker mode.
+
+With a single worker this simply runs uvicorn. With several workers the
+active model is loaded once in the launcher and its weights are exported to
+shared memory before the workers start; every worker then maps the same
+pages instead of loading its own copy::
+
+    python -m app.serve --workers 4
+
+The launcher also points the workers at shared state and metrics directories
+so readiness (``/health/workers``) and ``/metrics`` cover all workers.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import List
+
+import uvicorn
+
+from .config.config import get_settings
+from .ml.registry import ModelLoadError, ModelRegistry, artifact_digest
+from .ml.shared import export_predictor
+
+SHARED_MEMORY_ROOT = Path("/dev/shm")
+
+
+def export_active_model(shared_dir: Path) -> Path:
+    """Load the configured model version and export it for the workers."""
+    config = get_settings().model
+    model = ModelRegistry(
+        artifact_root=config.artifact_root,
+        name=config.name,
+        version=config.version,
+        missing_features=config.missing_features,
+        unknown_features=config.unknown_features,
+    ).active
+    digest = artifact_digest(model.path)
+    return export_predictor(
+        model.predictor, shared_dir, model.name, model.version, digest
+    )
+
+
+def prepare_workers() -> Path | None:
+    """Set up shared directories for the workers and export the model.
+
+    Directories that are already configured are kept, the others are
+    created in a run directory whose path is returned for cleanup.
+    """
+    settings = get_settings()
+    configured = {
+        "SERVER_SHARED_WEIGHTS_DIR": (settings.server.shared_weights_dir, "weights"),
+        "SERVER_STATE_DIR": (settings.server.state_dir, "workers"),
+        "METRICS_MULTIPROC_DIR": (settings.metrics.multiproc_dir, "metrics"),
+    }
+    run_dir = None
+    if not all(directory for directory, _ in configured.values()):
+        root = SHARED_MEMORY_ROOT if SHARED_MEMORY_ROOT.is_dir() else None
+        run_dir = Path(tempfile.mkdtemp(prefix="lead-scoring-", dir=root))
+
+    # Workers are spawned processes and read their settings from the environment
+    for variable, (directory, default) in configured.items():
+        os.environ[variable] = directory or str(run_dir / default)
+
+    shared_dir = os.environ["SERVER_SHARED_WEIGHTS_DIR"]
+    export_active_model(Path(shared_dir))
+    return run_dir
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Parse arguments and run the API server."""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        prog="python -m app.serve",
+        description="Run the API server, optionally with several workers.",
+    )
+    parser.add_argument("--host", default=settings.api.host)
+    parser.add_argument("--port", type=int, default=settings.api.port)
+    parser.add_argument(
+        "-w", "--workers", type=int, default=settings.server.workers, help="Processes"
+    )
+    args = parser.parse_args(argv)
+    workers = max(1, args.workers)
+
+    run_dir = None
+    if workers > 1:
+        try:
+            run_dir = prepare_workers()
+        except ModelLoadError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+
+    try:
+        uvicorn.run("app.main:app", host=args.host, port=args.port, workers=workers)
+    finally:
+        if run_dir is not None:
+            shutil.rmtree(run_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""
+Load-testing and benchmark suite for the scoring API.
+
+Run ``python -m benchmarks --help`` for usage. Results are written as JSON
+and can be compared against a stored baseline to catch regressions.
+"""
@@ -0,0 +1,250 @@
+"""
+Benchmark runner::
+
+    python -m benchmarks --payloads leads.jsonl -o results.json
+    python -m benchmarks --baseline benchmarks/baseline.json --threshold 10
+
+Every scenario is run in-process (the ASGI app driven through
+``httpx.ASGITransport``) and over a real uvicorn socket, under a fixed
+concurrency and a fixed request rate. Results hold throughput, latency
+percentiles and RSS per ``<transport>/<scenario>/<load>`` run, plus the
+logging middleware overhead derived from ``health`` and
+``health_without_logging``.
+
+The prediction cache is disabled unless ``--with-cache`` is given, so
+replayed payloads measure scoring rather than cache hits.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import httpx
+
+from .compare import check
+from .harness import LoadRunner
+from .scenarios import Scenario, build_scenarios, load_payloads, synthetic_payloads
+
+TRANSPORTS = ("inprocess", "socket")
+LOADS = ("concurrency", "rate")
+
+
+def _import_app(target: str):
+    module, attribute = target.split(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+@contextlib.contextmanager
+def _silenced_stderr() -> Iterator[None]:
+    """Send in-process log output to /dev/null; it is still formatted and written."""
+    sys.stderr.flush()
+    saved = os.dup(2)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 2)
+    try:
+        yield
+    finally:
+        sys.stderr.flush()
+        os.dup2(saved, 2)
+        os.close(saved)
+        os.close(devnull)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.asynccontextmanager
+async def _server(target: str):
+    """Run ``target`` on a local uvicorn socket until the worker is ready."""
+    port = _free_port()
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", "uvicorn", target, "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    if (await client.get("/health/ready")).status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise RuntimeError(f"Server for {target} did not become ready")
+                await asyncio.sleep(0.1)
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+            yield client, process.pid
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@contextlib.asynccontextmanager
+async def _in_process(target: str):
+    """Drive ``target`` in this process, with its lifespan running."""
+    app = _import_app(target)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark"
+        ) as client:
+            yield client, os.getpid()
+
+
+async def _run_scenarios(
+    transport: str, scenarios: List[Scenario], args: argparse.Namespace
+) -> Dict[str, dict]:
+    results = {}
+    for target in dict.fromkeys(scenario.app for scenario in scenarios):
+        connect = _server if transport == "socket" else _in_process
+        async with connect(target) as (client, pid):
+            for scenario in scenarios:
+                if scenario.app != target:
+                    continue
+                runner = LoadRunner(
+                    client, scenario.requests, scenario.expected_status, pid
+                )
+                await runner.warmup(args.warmup)
+                for load in args.load:
+                    if load == "concurrency":
+                        result = await runner.run_concurrency(
+                            args.requests, args.concurrency
+                        )
+                        result["concurrency"] = args.concurrency
+                    else:
+                        result = await runner.run_rate(args.requests, args.rate)
+                        result["target_rps"] = args.rate
+                    key = f"{transport}/{scenario.name}/{load}"
+                    results[key] = result
+                    _report(key, result)
+    return results
+
+
+def _report(key: str, result: dict):
+    latency = result["latency_ms"]
+    print(
+        f"{key:<50} {result['throughput_rps']:>9,.0f} req/s  "
+        f"p50 {latency['p50']:7.2f}ms  p95 {latency['p95']:7.2f}ms  "
+        f"p99 {latency['p99']:7.2f}ms  errors {result['errors']}  "
+        f"rss {result['rss_mb']:.0f}MB",
+        flush=True,
+    )
+
+
+def logging_overhead(results: Dict[str, dict]) -> Dict[str, dict]:
+    """Latency and throughput cost of the logging middleware per run."""
+    overhead = {}
+    for key, with_logging in results.items():
+        transport, scenario, load = key.split("/")
+        if scenario != "health":
+            continue
+        without = results.get(f"{transport}/health_without_logging/{load}")
+        if without is None:
+            continue
+        overhead[f"{transport}/{load}"] = {
+            "p50_ms": with_logging["latency_ms"]["p50"] - without["latency_ms"]["p50"],
+            "p99_ms": with_logging["latency_ms"]["p99"] - without["latency_ms"]["p99"],
+            "throughput_ratio": (
+                with_logging["throughput_rps"] / without["throughput_rps"]
+                if without["throughput_rps"]
+                else 0.0
+            ),
+        }
+    return overhead
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Run the selected scenarios and return the results document."""
+    payloads = load_payloads(args.payloads) if args.payloads else synthetic_payloads()
+    scenarios = [
+        scenario
+        for name, scenario in build_scenarios(payloads).items()
+        if name in args.scenarios
+    ]
+    results = {}
+    for transport in args.transport:
+        if transport == "inprocess":
+            with _silenced_stderr():
+                results.update(asyncio.run(_run_scenarios(transport, scenarios, args)))
+        else:
+            results.update(asyncio.run(_run_scenarios(transport, scenarios, args)))
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "payloads": str(args.payloads) if args.payloads else "synthetic",
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "cache": args.with_cache,
+        },
+        "results": results,
+        "logging_overhead": logging_overhead(results),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Parse arguments, run the benchmarks and check for regressions."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the scoring API in-process and over a socket.",
+    )
+    parser.add_argument(
+        "--payloads", type=Path, help="JSONL file of LeadScoringRequest bodies"
+    )
+    parser.add_argument("-o", "--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        default=["health", "health_without_logging", "score", "validation_error"],
+    )
+    parser.add_argument(
+        "--transport", nargs="+", choices=TRANSPORTS, default=list(TRANSPORTS)
+    )
+    parser.add_argument("--load", nargs="+", choices=LOADS, default=list(LOADS))
+    parser.add_argument("--requests", type=int, default=2000, help="Per run")
+    parser.add_argument("--warmup", type=int, default=200, help="Per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=500.0, help="Requests/s")
+    parser.add_argument("--with-cache", action="store_true")
+    parser.add_argument("--baseline", type=Path, help="Baseline results to compare")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="Allowed regression in percent"
+    )
+    args = parser.parse_args(argv)
+
+    # Set before the app is imported here or in the server subprocesses
+    os.environ["CACHE_ENABLED"] = "true" if args.with_cache else "false"
+    # Per-request client logging would be measured as server latency
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    document = run(args)
+    args.output.write_text(json.dumps(document, indent=2))
+    print(f"results written to {args.output}", file=sys.stderr)
+    if args.baseline:
+        return check(document, args.baseline, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+"""
+Application variants used as benchmark baselines.
+
+``bare_app`` serves the same routes and exception handlers as
+``app.main.app`` and runs the same admission control and rate limiting, but
+without ``LoggingMiddleware``, so comparing the two isolates the logging
+middleware's per-request overhead.
+"""
+
+from fastapi import FastAPI
+
+from app.core.admission import AdmissionMiddleware, get_admission_controller
+from app.core.exceptions import register_exception_handlers
+from app.core.rate_limit import RateLimitMiddleware, get_rate_limiter
+from app.main import app, lifespan
+
+bare_app = FastAPI(title=app.title, lifespan=lifespan)
+register_exception_handlers(bare_app)
+# Same order as app.main: rate limiting runs before admission
+bare_app.add_middleware(AdmissionMiddleware, controller=get_admission_controller())
+bare_app.add_middleware(RateLimitMiddleware, limiter=get_rate_limiter())
+bare_app.include_router(app.router)
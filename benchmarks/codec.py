@@ -0,0 +1,116 @@
+"""
+Per-request cost of the scoring codecs::
+
+    python -m benchmarks.codec --payloads leads.jsonl --batch-size 100
+
+Decodes every payload and encodes its response with the ``schema`` codec
+(what FastAPI does with the Pydantic models) and the ``fast`` codec, as
+single requests and as batch bodies, and reports microseconds per request
+and the speedup. MessagePack is measured too when ``msgpack`` is installed.
+Scoring itself is left out, it does not depend on the codec.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from app.core import codec
+from app.core.codec import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, ScoringCodec
+
+from .scenarios import load_payloads, synthetic_payloads
+
+
+def _time(run: Callable[[], None], requests: int, repeat: int) -> float:
+    """Best time per request in microseconds over ``repeat`` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best / requests * 1e6
+
+
+def _single(scoring: ScoringCodec, bodies: List[bytes], media_type: str):
+    def run():
+        for body in bodies:
+            lead_id, _ = scoring.decode_lead(body, media_type)
+            scoring.encode({"lead_id": lead_id, "score": 42.0}, media_type)
+
+    return run
+
+
+def _batch(scoring: ScoringCodec, bodies: List[bytes], media_type: str):
+    def run():
+        for body in bodies:
+            leads = scoring.decode_batch(body, media_type)
+            scoring.encode(
+                [{"lead_id": lead_id, "score": 42.0} for lead_id, _ in leads],
+                media_type,
+            )
+
+    return run
+
+
+def measure(payloads: List[bytes], batch_size: int, repeat: int) -> Dict[str, dict]:
+    """Microseconds per request of each codec, keyed by shape and media type."""
+    leads = [json.loads(payload) for payload in payloads]
+    batches = [
+        leads[start : start + batch_size] for start in range(0, len(leads), batch_size)
+    ]
+    encoders = {JSON_MEDIA_TYPE: lambda value: json.dumps(value).encode()}
+    if codec.msgpack is not None:
+        encoders[MSGPACK_MEDIA_TYPE] = codec.msgpack.packb
+
+    results = {}
+    for media_type, dumps in encoders.items():
+        shapes = {
+            "single": (_single, [dumps(lead) for lead in leads]),
+            f"batch{batch_size}": (_batch, [dumps(batch) for batch in batches]),
+        }
+        for shape, (runner, bodies) in shapes.items():
+            timings = {
+                mode: _time(
+                    runner(ScoringCodec(mode), bodies, media_type), len(leads), repeat
+                )
+                for mode in ("schema", "fast")
+            }
+            results[f"{shape}/{media_type}"] = {
+                "schema_us": timings["schema"],
+                "fast_us": timings["fast"],
+                "speedup": timings["schema"] / timings["fast"],
+            }
+    return results
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Parse arguments, run the codec benchmark and write its results."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.codec",
+        description="Compare the schema and fast scoring codecs per request.",
+    )
+    parser.add_argument(
+        "--payloads", type=Path, help="JSONL file of LeadScoringRequest bodies"
+    )
+    parser.add_argument("-o", "--output", type=Path, default=Path("codec_results.json"))
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5, help="Best of N runs")
+    args = parser.parse_args(argv)
+
+    payloads = load_payloads(args.payloads) if args.payloads else synthetic_payloads()
+    results = measure(payloads, max(1, args.batch_size), max(1, args.repeat))
+    for key, result in results.items():
+        print(
+            f"{key:<36} schema {result['schema_us']:8.2f}us  "
+            f"fast {result['fast_us']:8.2f}us  x{result['speedup']:.1f}",
+            flush=True,
+        )
+    args.output.write_text(json.dumps({"results": results}, indent=2))
+    print(f"results written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
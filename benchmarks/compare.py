@@ -0,0 +1,84 @@
+"""
+Comparison of benchmark results against a stored baseline::
+
+    python -m benchmarks.compare results.json baseline.json --threshold 10
+
+Exits with status 1 when any run regressed by more than the threshold.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List
+
+# Latencies must not grow, throughput must not shrink
+LATENCY_METRICS = ("p50", "p95", "p99")
+
+
+def compare(
+    current: dict, baseline: dict, threshold: float, min_delta_ms: float = 0.1
+) -> List[str]:
+    """Describe every regression of ``current`` relative to ``baseline``.
+
+    Args:
+        current: Results produced by ``python -m benchmarks``
+        baseline: Stored results in the same format
+        threshold: Allowed relative change, in percent
+        min_delta_ms: Latency changes below this absolute delta are ignored,
+            so sub-millisecond jitter does not fail the comparison
+
+    Returns:
+        One message per regressed metric, empty when nothing regressed
+    """
+    regressions = []
+    limit = threshold / 100
+    for key, result in sorted(current["results"].items()):
+        reference = baseline["results"].get(key)
+        if reference is None:
+            continue
+        for metric in LATENCY_METRICS:
+            now = result["latency_ms"][metric]
+            before = reference["latency_ms"][metric]
+            if now - before > max(before * limit, min_delta_ms):
+                regressions.append(
+                    f"{key}: {metric} latency {before:.3f}ms -> {now:.3f}ms"
+                )
+        now = result["throughput_rps"]
+        before = reference["throughput_rps"]
+        if before - now > before * limit:
+            regressions.append(
+                f"{key}: throughput {before:,.0f} -> {now:,.0f} requests/s"
+            )
+    return regressions
+
+
+def check(current: dict, baseline_path: Path, threshold: float) -> int:
+    """Print regressions against a baseline file and return an exit status."""
+    baseline = json.loads(baseline_path.read_text())
+    regressions = compare(current, baseline, threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    if regressions:
+        return 1
+    print(f"no regression above {threshold}% against {baseline_path}", file=sys.stderr)
+    return 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Parse arguments and compare two result files."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.compare",
+        description="Compare benchmark results against a baseline.",
+    )
+    parser.add_argument("results", type=Path, help="Results JSON")
+    parser.add_argument("baseline", type=Path, help="Baseline results JSON")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="Allowed regression in percent"
+    )
+    args = parser.parse_args(argv)
+    return check(json.loads(args.results.read_text()), args.baseline, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
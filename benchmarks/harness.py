@@ -0,0 +1,150 @@
+"""
+Load generators and latency statistics.
+
+Two load shapes are supported:
+
+- ``concurrency``: a closed loop of N clients, each sending its next request
+  as soon as the previous one completed
+- ``rate``: an open loop sending requests on a fixed schedule regardless of
+  completions; latency is measured from the scheduled send time so a stalled
+  server is not hidden by the generator slowing down (coordinated omission)
+"""
+
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import httpx
+import psutil
+
+
+@dataclass(frozen=True)
+class Request:
+    """One request to replay."""
+
+    method: str
+    path: str
+    body: bytes | None = None
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(
+    latencies: List[float], errors: int, elapsed: float, rss_bytes: int
+) -> dict:
+    """Aggregate raw latencies (seconds) into a JSON-serializable result."""
+    ordered = sorted(latencies)
+    completed = len(ordered)
+    return {
+        "requests": completed + errors,
+        "errors": errors,
+        "seconds": elapsed,
+        "throughput_rps": completed / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "mean": sum(ordered) / completed * 1000 if completed else 0.0,
+            "p50": percentile(ordered, 0.50) * 1000,
+            "p95": percentile(ordered, 0.95) * 1000,
+            "p99": percentile(ordered, 0.99) * 1000,
+            "max": ordered[-1] * 1000 if ordered else 0.0,
+        },
+        "rss_mb": rss_bytes / 2**20,
+    }
+
+
+class LoadRunner:
+    """Replays requests against an HTTP client and records latencies.
+
+    Args:
+        client: Client bound to the app, in-process or over a socket
+        requests: Requests to replay, cycled through in order
+        expected_status: Status code counted as a success
+        pid: Process whose RSS is reported, the server's for socket runs
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        requests: Sequence[Request],
+        expected_status: int,
+        pid: int,
+    ):
+        if not requests:
+            raise ValueError("At least one request is required")
+        self.client = client
+        self.requests = requests
+        self.expected_status = expected_status
+        self.process = psutil.Process(pid)
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    async def _send(self, request: Request, started: float):
+        try:
+            response = await self.client.request(
+                request.method,
+                request.path,
+                content=request.body,
+                headers={"Content-Type": "application/json"},
+            )
+            ok = response.status_code == self.expected_status
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            self.latencies.append(time.perf_counter() - started)
+        else:
+            self.errors += 1
+
+    def _reset(self):
+        self.latencies = []
+        self.errors = 0
+
+    async def warmup(self, count: int):
+        """Send requests whose latencies are discarded."""
+        for request in itertools.islice(itertools.cycle(self.requests), count):
+            await self._send(request, time.perf_counter())
+        self._reset()
+
+    async def run_concurrency(self, total: int, concurrency: int) -> dict:
+        """Send ``total`` requests from ``concurrency`` closed-loop clients."""
+        self._reset()
+        source = itertools.islice(itertools.cycle(self.requests), total)
+
+        async def client_loop():
+            for request in source:
+                await self._send(request, time.perf_counter())
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        return summarize(
+            self.latencies, self.errors, elapsed, self.process.memory_info().rss
+        )
+
+    async def run_rate(self, total: int, rate: float) -> dict:
+        """Send ``total`` requests at a fixed rate of ``rate`` per second."""
+        self._reset()
+        interval = 1.0 / rate
+        tasks = set()
+        start = time.perf_counter()
+        for index, request in enumerate(
+            itertools.islice(itertools.cycle(self.requests), total)
+        ):
+            scheduled = start + index * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(self._send(request, scheduled))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+        return summarize(
+            self.latencies, self.errors, elapsed, self.process.memory_info().rss
+        )
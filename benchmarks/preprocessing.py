@@ -0,0 +1,172 @@
+"""
+Cost of model preprocessing as the feature count grows::
+
+    python -m benchmarks.preprocessing --features 10 100 1000 --rows 1000
+
+Builds a spec running every step (impute, clip, log1p, scale, bucketize)
+over the features of a synthetic model and preprocesses a batch of rows
+with the compiled ``Preprocessor`` and with the reference (a Python call per
+feature and row, what serving code does without a compiled pipeline).
+Reports microseconds per row and nanoseconds per row and feature: the
+compiled cost per row and feature stays flat while the feature count grows.
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from app.ml.preprocessing import compile_preprocessing
+
+FEATURE_COUNTS = [10, 100, 1000]
+
+
+def synthetic_spec(features: List[str], seed: int = 0) -> dict:
+    """Preprocessing spec applying every step to a share of the features."""
+    rng = random.Random(seed)
+
+    def some(share: float) -> List[str]:
+        return [name for name in features if rng.random() < share]
+
+    return {
+        "steps": [
+            {"op": "impute", "features": {name: 1.0 for name in some(0.5)}},
+            {
+                "op": "clip",
+                "features": {
+                    name: [rng.choice([None, 0.0]), rng.choice([None, 50.0])]
+                    for name in some(0.5)
+                },
+            },
+            {"op": "log1p", "features": some(0.3)},
+            {
+                "op": "scale",
+                "features": {
+                    name: {"center": rng.uniform(0, 5), "scale": rng.uniform(1, 5)}
+                    for name in some(0.8)
+                },
+            },
+            {
+                "op": "bucketize",
+                "features": {
+                    name: sorted(rng.uniform(-2, 2) for _ in range(rng.randint(1, 5)))
+                    for name in some(0.2)
+                },
+            },
+        ]
+    }
+
+
+def reference_transform(spec: dict, features: List[str], X: np.ndarray) -> np.ndarray:
+    """Apply a spec one row and feature at a time."""
+    rows = []
+    for row in X.tolist():
+        values = dict(zip(features, row))
+        for step in spec["steps"]:
+            op = step["op"]
+            for name in step["features"]:
+                value = values[name]
+                if op == "impute":
+                    if math.isnan(value):
+                        value = step["features"][name]
+                elif op == "clip":
+                    lower, upper = step["features"][name]
+                    if lower is not None and value < lower:
+                        value = lower
+                    if upper is not None and value > upper:
+                        value = upper
+                elif op == "log1p":
+                    value = math.log1p(value)
+                elif op == "scale":
+                    params = step["features"][name]
+                    value = (value - params.get("center", 0.0)) / params.get(
+                        "scale", 1.0
+                    )
+                elif op == "bucketize":
+                    value = float(
+                        sum(value >= bound for bound in step["features"][name])
+                    )
+                values[name] = value
+        rows.append([values[name] for name in features])
+    return np.array(rows, dtype=float)
+
+
+def random_rows(features: List[str], rows: int, seed: int = 0) -> np.ndarray:
+    """Non-negative feature matrix with a few missing values."""
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0.0, 100.0, size=(rows, len(features)))
+    X[rng.random(X.shape) < 0.05] = np.nan
+    return X
+
+
+def _time(run: Callable[[], object], repeat: int) -> float:
+    """Best time of ``repeat`` runs in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(feature_counts: List[int], rows: int, repeat: int) -> Dict[str, dict]:
+    """Cost per row of both paths, keyed by feature count."""
+    results = {}
+    for count in feature_counts:
+        features = [f"f{index}" for index in range(count)]
+        spec = synthetic_spec(features)
+        preprocessor = compile_preprocessing(spec, features)
+        X = random_rows(features, rows)
+        compiled = _time(lambda: preprocessor.transform(X), repeat)
+        reference = _time(lambda: reference_transform(spec, features, X), repeat)
+        results[str(count)] = {
+            "compiled_us_per_row": compiled / rows * 1e6,
+            "compiled_ns_per_value": compiled / (rows * count) * 1e9,
+            "reference_us_per_row": reference / rows * 1e6,
+            "reference_ns_per_value": reference / (rows * count) * 1e9,
+            "speedup": reference / compiled,
+        }
+    return results
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Parse arguments, run the preprocessing benchmark and write its results."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.preprocessing",
+        description="Compare compiled and per-feature model preprocessing.",
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, default=Path("preprocessing_results.json")
+    )
+    parser.add_argument("--features", type=int, nargs="+", default=FEATURE_COUNTS)
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per batch")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    args = parser.parse_args(argv)
+
+    results = measure(
+        [max(1, count) for count in args.features],
+        max(1, args.rows),
+        max(1, args.repeat),
+    )
+    for count, result in results.items():
+        print(
+            f"{count:>6} features  compiled {result['compiled_us_per_row']:9.2f}us/row "
+            f"({result['compiled_ns_per_value']:6.2f}ns/value)  "
+            f"reference {result['reference_us_per_row']:9.2f}us/row "
+            f"({result['reference_ns_per_value']:6.2f}ns/value)  "
+            f"x{result['speedup']:.1f}",
+            flush=True,
+        )
+    args.output.write_text(json.dumps({"results": results}, indent=2))
+    print(f"results written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Benchmark scenarios and request payloads.
+
+Score payloads are read from a JSONL file in the same format the bulk scorer
+and the NDJSON endpoint accept (one ``LeadScoringRequest`` per line), or
+generated deterministically when no file is given.
+"""
+
+import json
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+from .harness import Request
+
+SCORE_PATH = "/lead-scoring/score"
+HEALTH_PATH = "/health/"
+
+# Import strings of the served applications, see ``benchmarks.apps``
+APP = "app.main:app"
+BARE_APP = "benchmarks.apps:bare_app"
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Requests replayed against one application with one expected status."""
+
+    name: str
+    app: str
+    requests: List[Request]
+    expected_status: int
+
+
+def load_payloads(path: Path) -> List[bytes]:
+    """Read non-empty JSONL lines as request bodies."""
+    with path.open("rb") as handle:
+        return [line.strip() for line in handle if line.strip()]
+
+
+def synthetic_payloads(count: int = 1000, seed: int = 0) -> List[bytes]:
+    """Generate reproducible lead scoring payloads."""
+    rng = random.Random(seed)
+    return [
+        json.dumps(
+            {
+                "lead_id": lead_id,
+                "features": {
+                    "age": rng.randint(18, 80),
+                    "income": round(rng.uniform(10_000, 200_000), 2),
+                    "visits": rng.randint(0, 50),
+                },
+            }
+        ).encode()
+        for lead_id in range(count)
+    ]
+
+
+def invalid_payloads(payloads: List[bytes]) -> List[bytes]:
+    """Turn valid payloads into ones rejected by request validation."""
+    invalid = []
+    for index, payload in enumerate(payloads):
+        body = json.loads(payload)
+        if index % 2:
+            body["lead_id"] = "not-a-number"
+        else:
+            body.pop("features", None)
+        invalid.append(json.dumps(body).encode())
+    return invalid
+
+
+def build_scenarios(payloads: List[bytes]) -> Dict[str, Scenario]:
+    """All benchmark scenarios keyed by name."""
+    health = [Request("GET", HEALTH_PATH)]
+    return {
+        "health": Scenario("health", APP, health, 200),
+        "health_without_logging": Scenario(
+            "health_without_logging", BARE_APP, health, 200
+        ),
+        "score": Scenario(
+            "score",
+            APP,
+            [Request("POST", SCORE_PATH, payload) for payload in payloads],
+            200,
+        ),
+        "validation_error": Scenario(
+            "validation_error",
+            APP,
+            [
+                Request("POST", SCORE_PATH, payload)
+                for payload in invalid_payloads(payloads)
+            ],
+            422,
+        ),
+    }
@@ -0,0 +1,200 @@
+"""
+Compiled tree-ensemble evaluation against a per-row reference::
+
+    python -m benchmarks.trees --trees 100 --depth 6 --batch-sizes 1 100 10000
+
+Builds a random ensemble, scores batches of each size with the compiled
+``TreeEnsemble`` and with the reference evaluator (one Python walk per row
+and tree, what a straightforward port of the exporting library does), and
+reports microseconds per batch, rows per second and the speedup. The
+reference is only timed up to ``--reference-max-rows`` rows per batch, it
+gets slow quickly.
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from app.ml.trees import LEAF, load_tree_ensemble
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def random_ensemble(
+    features: List[str],
+    trees: int,
+    depth: int,
+    seed: int = 0,
+    missing: bool = True,
+) -> dict:
+    """Descriptor parameters of a random ensemble with trees up to ``depth``."""
+    rng = random.Random(seed)
+
+    def grow(tree: dict, level: int) -> int:
+        node = len(tree["left"])
+        for key in tree:
+            tree[key].append(None)
+        if level == depth or (level > 1 and rng.random() < 0.15):
+            tree["feature"][node] = None
+            tree["threshold"][node] = 0.0
+            tree["left"][node] = tree["right"][node] = LEAF
+            tree["value"][node] = rng.uniform(-1.0, 1.0)
+            tree["default_left"][node] = False
+            return node
+        tree["feature"][node] = rng.choice(features)
+        # Thresholds on round values so rows land exactly on some of them
+        tree["threshold"][node] = float(rng.randint(-4, 4))
+        tree["value"][node] = 0.0
+        tree["default_left"][node] = missing and rng.random() < 0.5
+        tree["left"][node] = grow(tree, level + 1)
+        tree["right"][node] = grow(tree, level + 1)
+        return node
+
+    ensemble = []
+    for _ in range(trees):
+        tree = {
+            key: []
+            for key in (
+                "feature",
+                "threshold",
+                "left",
+                "right",
+                "value",
+                "default_left",
+            )
+        }
+        grow(tree, 0)
+        ensemble.append(tree)
+    return {
+        "base_score": rng.uniform(-1.0, 1.0),
+        "link": "logistic",
+        "trees": ensemble,
+    }
+
+
+def reference_predict(params: dict, features: List[str], X: np.ndarray) -> np.ndarray:
+    """Score rows by walking every tree node by node, one row at a time."""
+    columns = {name: index for index, name in enumerate(features)}
+    strict = params.get("decision", "<=") == "<"
+    scores = []
+    for row in X.tolist():
+        outputs = []
+        for tree in params["trees"]:
+            node = 0
+            while tree["left"][node] != LEAF:
+                value = row[columns[tree["feature"][node]]]
+                threshold = tree["threshold"][node]
+                if math.isnan(value):
+                    left = "default_left" in tree and tree["default_left"][node]
+                else:
+                    left = value < threshold if strict else value <= threshold
+                node = tree["left"][node] if left else tree["right"][node]
+            outputs.append(tree["value"][node])
+        if params.get("aggregation", "sum") == "mean":
+            z = sum(outputs) / len(outputs)
+        else:
+            z = sum(outputs)
+        z += params.get("base_score", 0.0)
+        if params.get("link", "identity") == "logistic":
+            z = 100.0 / (1.0 + math.exp(-z))
+        scores.append(z)
+    return np.array(scores)
+
+
+def random_rows(features: List[str], rows: int, seed: int = 0) -> np.ndarray:
+    """Feature matrix of integer-valued rows with a few missing values."""
+    rng = np.random.default_rng(seed)
+    X = rng.integers(-5, 6, size=(rows, len(features))).astype(float)
+    X[rng.random(X.shape) < 0.05] = np.nan
+    return X
+
+
+def _time(run: Callable[[], object], repeat: int) -> float:
+    """Best time of ``repeat`` runs in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+
+def measure(
+    trees: int,
+    depth: int,
+    batch_sizes: List[int],
+    repeat: int,
+    reference_max_rows: int,
+    n_features: int = 20,
+) -> Dict[str, dict]:
+    """Microseconds per batch of both evaluators, keyed by batch size."""
+    features = [f"f{index}" for index in range(n_features)]
+    params = random_ensemble(features, trees, depth)
+    model = load_tree_ensemble(Path("."), features, params)
+    X = random_rows(features, max(batch_sizes))
+
+    results = {}
+    for size in batch_sizes:
+        batch = X[:size]
+        compiled = _time(lambda batch=batch: model.predict(batch), repeat)
+        result = {
+            "compiled_us": compiled,
+            "compiled_rows_per_second": size / compiled * 1e6,
+        }
+        if size <= reference_max_rows:
+            reference = _time(
+                lambda batch=batch: reference_predict(params, features, batch),
+                repeat,
+            )
+            result["reference_us"] = reference
+            result["speedup"] = reference / compiled
+        results[str(size)] = result
+    return results
+
+
+def main(argv: List[str] | None = None) -> int:
+    """Parse arguments, run the tree-ensemble benchmark and write its results."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.trees",
+        description="Compare compiled and per-row tree-ensemble evaluation.",
+    )
+    parser.add_argument("-o", "--output", type=Path, default=Path("trees_results.json"))
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=BATCH_SIZES)
+    parser.add_argument("--repeat", type=int, default=5, help="Best of N runs")
+    parser.add_argument("--reference-max-rows", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    results = measure(
+        max(1, args.trees),
+        max(1, args.depth),
+        [max(1, size) for size in args.batch_sizes],
+        max(1, args.repeat),
+        args.reference_max_rows,
+    )
+    for size, result in results.items():
+        line = (
+            f"batch {size:>6}  compiled {result['compiled_us']:10.1f}us "
+            f"({result['compiled_rows_per_second']:,.0f} rows/s)"
+        )
+        if "reference_us" in result:
+            line += (
+                f"  reference {result['reference_us']:10.1f}us"
+                f"  x{result['speedup']:.1f}"
+            )
+        print(line, flush=True)
+    args.output.write_text(json.dumps({"results": results}, indent=2))
+    print(f"results written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,16 +4,18 @@
 API_HOST="0.0.0.0"
 API_PORT=${API_PORT:-8001}
 APP_DEBUG=${APP_DEBUG:-false}
+SERVER_WORKERS=${SERVER_WORKERS:-1}
 
-# Convert debug to reload flag
+# Debug mode runs a single reloading uvicorn process
 if [ "$APP_DEBUG" = "true" ] || [ "$APP_DEBUG" = "True" ]; then
-    RELOAD_FLAG="--reload"
-else
-    RELOAD_FLAG=""
+    exec uvicorn app.main:app \
+        --host "$API_HOST" \
+        --port "$API_PORT" \
+        --reload
 fi
 
-# Start uvicorn with the app module directly
-exec uvicorn app.main:app \
+# Start the server, exporting shared model weights first when running several workers
+exec python -m app.serve \
     --host "$API_HOST" \
     --port "$API_PORT" \
-    $RELOAD_FLAG
\ No newline at end of file
+    --workers "$SERVER_WORKERS"
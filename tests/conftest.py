@@ -1,5 +1,6 @@
 """Pytest configuration and fixtures."""
 
+import json
 import logging
 from unittest.mock import Mock
 
@@ -60,3 +61,36 @@ def sample_validation_errors():
             "type": "value_error.email",
         },
     ]
+
+
+def write_model(root, version, features, params, flavor="linear", name="lead-scoring"):
+    """Write an MLmodel descriptor into an artifact tree and return its directory."""
+    path = root / name / version
+    path.mkdir(parents=True, exist_ok=True)
+    descriptor = {
+        "name": name,
+        "version": version,
+        "flavor": flavor,
+        "features": features,
+        "params": params,
+    }
+    (path / "MLmodel").write_text(json.dumps(descriptor))
+    return path
+
+
+@pytest.fixture
+def artifact_root(tmp_path):
+    """Artifact tree with two versions of a linear lead-scoring model."""
+    write_model(
+        tmp_path,
+        "1",
+        ["age", "income"],
+        {"intercept": 10.0, "coefficients": {"age": 1.0, "income": 0.001}},
+    )
+    write_model(
+        tmp_path,
+        "2",
+        ["age", "income"],
+        {"intercept": 0.0, "coefficients": {"age": 2.0}},
+    )
+    return tmp_path
@@ -0,0 +1,139 @@
+"""Tests for admission control and load shedding."""
+
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.admission import AdmissionController, AdmissionMiddleware, RouteGroup
+from app.core.metrics import Metrics, render_prometheus
+
+
+def build_app(controller, release: asyncio.Event):
+    """App whose /slow route blocks until ``release`` is set."""
+    limited = FastAPI()
+
+    @limited.get("/slow")
+    async def slow():
+        await release.wait()
+        return {"ok": True}
+
+    @limited.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    limited.add_middleware(AdmissionMiddleware, controller=controller)
+    return limited
+
+
+async def gather_responses(controller, paths, release_after: float):
+    """Send requests concurrently and release the slow route after a delay."""
+    release = asyncio.Event()
+    transport = httpx.ASGITransport(app=build_app(controller, release))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        tasks = [asyncio.create_task(client.get(path)) for path in paths]
+        await asyncio.sleep(release_after)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+
+class TestRouteGroup:
+    """Test the per-group limit, queue and CoDel state."""
+
+    def test_queued_request_gets_released_slot(self):
+        """Test that a waiting request is admitted when a slot frees up."""
+
+        async def run():
+            group = RouteGroup("g", limit=1, max_queue=4, target_delay=1, interval=1)
+            assert await group.acquire() is None
+            waiter = asyncio.create_task(group.acquire())
+            await asyncio.sleep(0)
+            assert group.snapshot()["queued"] == 1
+            group.release()
+            assert await waiter is None
+            assert group.in_flight == 1, "The slot should pass to the waiter"
+            group.release()
+            return group
+
+        group = asyncio.run(run())
+        assert group.in_flight == 0
+        assert group.admitted == 2
+
+    def test_sustained_queue_delay_overloads_group(self):
+        """Test that delays above target for an interval start shedding."""
+        group = RouteGroup("g", limit=1, max_queue=4, target_delay=0.01, interval=0.1)
+
+        group._observe_delay(0.05, now=1.0)
+        assert not group.overloaded, "One slow admission is not overload"
+        group._observe_delay(0.05, now=1.2)
+        assert group.overloaded
+
+        group._observe_delay(0.001, now=1.3)
+        assert not group.overloaded, "A fast admission ends the overload"
+
+    def test_overloaded_group_sheds_immediately(self):
+        """Test that an overloaded group rejects requests it cannot admit."""
+
+        async def run():
+            group = RouteGroup("g", limit=1, max_queue=4, target_delay=1, interval=1)
+            await group.acquire()
+            group.overloaded = True
+            return await group.acquire()
+
+        assert asyncio.run(run()) == "overloaded"
+
+
+class TestAdmissionMiddleware:
+    """Test shedding through the ASGI middleware."""
+
+    def test_sheds_with_retry_after(self):
+        """Test that requests over the queue bound get a 503 with Retry-After."""
+        controller = AdmissionController(
+            {"/slow": 1}, max_queue=1, interval_ms=1000, retry_after_seconds=3
+        )
+
+        responses = asyncio.run(
+            gather_responses(controller, ["/slow"] * 4, release_after=0.05)
+        )
+
+        statuses = sorted(response.status_code for response in responses)
+        assert statuses == [200, 200, 503, 503]
+        shed = next(r for r in responses if r.status_code == 503)
+        assert shed.headers["retry-after"] == "3"
+        assert shed.json()["error"] == "http_error"
+        assert controller.groups["/slow"].shed == {"queue_full": 2}
+
+    def test_queue_timeout(self):
+        """Test that requests waiting longer than the interval are shed."""
+        controller = AdmissionController({"/slow": 1}, interval_ms=20)
+
+        responses = asyncio.run(
+            gather_responses(controller, ["/slow"] * 2, release_after=0.2)
+        )
+
+        assert sorted(r.status_code for r in responses) == [200, 503]
+        assert controller.groups["/slow"].shed == {"queue_timeout": 1}
+
+    def test_health_is_exempt(self):
+        """Test that exempt paths are served while the group is saturated."""
+        controller = AdmissionController({"/": 1}, max_queue=0, exempt=["/health"])
+
+        responses = asyncio.run(
+            gather_responses(
+                controller, ["/slow", "/health", "/health"], release_after=0.05
+            )
+        )
+
+        assert [r.status_code for r in responses] == [200, 200, 200]
+
+    def test_shed_counters_exposed(self):
+        """Test that shed counters are rendered as Prometheus metrics."""
+        metrics = Metrics()
+        metrics.count_shed("/lead-scoring", "overloaded")
+        metrics.count_shed("/lead-scoring", "overloaded")
+
+        text = render_prometheus(metrics)
+
+        assert (
+            'requests_shed_total{group="/lead-scoring",reason="overloaded"} 2' in text
+        )
@@ -1,8 +1,11 @@
 """Tests for API endpoints."""
 
+import json
 import pytest
 from fastapi.testclient import TestClient
+from app.config.config import Settings, get_settings
 from app.main import app
+from app.ml.registry import ModelRegistry, get_model_registry
 
 
 @pytest.fixture
@@ -80,6 +83,24 @@ class TestLeadScoringEndpoints:
 
         assert response.status_code == 422, "Malformed JSON should return 422"
 
+    def test_lead_scoring_rejects_missing_model_features(self, client, artifact_root):
+        """Test that schema violations surface as validation errors."""
+        registry = ModelRegistry(
+            str(artifact_root), "lead-scoring", "1", missing_features="reject"
+        )
+        app.dependency_overrides[get_model_registry] = lambda: registry
+        try:
+            response = client.post(
+                "/lead-scoring/score", json={"lead_id": 1, "features": {"age": 30.0}}
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 422, "Missing model feature should return 422"
+        data = response.json()
+        assert data["error"] == "validation_error"
+        assert data["details"][0]["loc"] == ["body", "features", "income"]
+
     def test_lead_scoring_edge_cases(self, client):
         """Test edge cases for lead scoring."""
         edge_cases = [
@@ -100,6 +121,157 @@ class TestLeadScoringEndpoints:
             ], f"Edge case should handle gracefully: {payload}"
 
 
+class TestBatchScoringEndpoints:
+    """Test batch lead scoring endpoint."""
+
+    def test_batch_scoring_preserves_order(self, client, valid_lead_payload):
+        """Test that batch responses come back in input order."""
+        payload = [{**valid_lead_payload, "lead_id": lead_id} for lead_id in (3, 1, 2)]
+        response = client.post("/lead-scoring/score/batch", json=payload)
+
+        assert response.status_code == 200, "Valid batch should return 200"
+        data = response.json()
+        assert [item["lead_id"] for item in data] == [3, 1, 2], "Order should match"
+        assert all(item["score"] == 25 for item in data), "Each lead should be scored"
+
+    def test_batch_scoring_empty(self, client):
+        """Test that an empty batch returns an empty list."""
+        response = client.post("/lead-scoring/score/batch", json=[])
+
+        assert response.status_code == 200
+        assert response.json() == []
+
+    def test_batch_scoring_validation_error(self, client, valid_lead_payload):
+        """Test that one invalid lead fails validation of the batch."""
+        payload = [valid_lead_payload, {"lead_id": "invalid"}]
+        response = client.post("/lead-scoring/score/batch", json=payload)
+
+        assert response.status_code == 422, "Invalid lead should return 422"
+        assert response.json()["error"] == "validation_error"
+
+    def test_batch_scoring_size_limit(self, client, valid_lead_payload):
+        """Test that oversized batches are rejected with 413."""
+        settings = Settings()
+        settings.api.max_batch_size = 2
+        app.dependency_overrides[get_settings] = lambda: settings
+        try:
+            response = client.post(
+                "/lead-scoring/score/batch", json=[valid_lead_payload] * 3
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 413, "Oversized batch should return 413"
+        assert response.json()["error"] == "http_error"
+
+
+class TestStreamingScoringEndpoints:
+    """Test NDJSON streaming lead scoring endpoint."""
+
+    def test_stream_scoring_with_per_line_errors(self, client):
+        """Test that malformed lines get error records in input order."""
+        body = (
+            b'{"lead_id": 1, "features": {"age": 30.0}}\n'
+            b"not json\n"
+            b'{"lead_id": "invalid", "features": {}}\n'
+            b'{"lead_id": 2, "features": {}}\n'
+        )
+        response = client.post("/lead-scoring/score/stream", content=body)
+
+        assert response.status_code == 200, "Stream should not fail on bad lines"
+        assert response.headers["content-type"] == "application/x-ndjson"
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert records[0] == {"lead_id": 1, "score": 25.0}
+        assert records[1]["line"] == 2 and records[1]["error"] == "validation_error"
+        assert records[2]["line"] == 3 and records[2]["error"] == "validation_error"
+        assert records[3] == {"lead_id": 2, "score": 25.0}
+
+    def test_stream_scoring_spans_chunks(self, client):
+        """Test that streams larger than one chunk keep every record."""
+        body = "".join(
+            json.dumps({"lead_id": lead_id, "features": {}}) + "\n"
+            for lead_id in range(2500)
+        )
+        response = client.post("/lead-scoring/score/stream", content=body)
+
+        lead_ids = [json.loads(line)["lead_id"] for line in response.text.splitlines()]
+        assert lead_ids == list(range(2500)), "All leads should be scored in order"
+
+
+class TestAdminEndpoints:
+    """Test model administration endpoints."""
+
+    def test_get_active_model(self, client):
+        """Test that the active model is described."""
+        response = client.get("/admin/model")
+
+        assert response.status_code == 200, "Active model should be reported"
+        data = response.json()
+        assert data["name"] == "lead-scoring", "Model name should match config"
+        assert data["version"] == "1", "Configured version should be active"
+
+    def test_batcher_stats(self, client, valid_lead_payload):
+        """Test that micro-batcher statistics are reported."""
+        client.post("/lead-scoring/score", json=valid_lead_payload)
+        response = client.get("/admin/batcher")
+
+        assert response.status_code == 200, "Batcher stats should be reported"
+        data = response.json()
+        assert data["items"] >= 1, "Scored requests should be counted"
+        assert "mean_queue_wait_ms" in data, "Queue wait should be reported"
+
+    def test_cache_stats_count_repeated_leads(self, client, valid_lead_payload):
+        """Test that a repeated lead is served from the prediction cache."""
+        client.delete("/admin/cache")
+        before = client.get("/admin/cache").json()
+        client.post("/lead-scoring/score", json=valid_lead_payload)
+        client.post("/lead-scoring/score", json=valid_lead_payload)
+        after = client.get("/admin/cache").json()
+
+        assert after["hits"] - before["hits"] == 1, "Second call should hit"
+        assert after["misses"] - before["misses"] == 1, "First call should miss"
+
+    def test_activate_unknown_version(self, client):
+        """Test that activating a missing version returns 404."""
+        response = client.put("/admin/model", json={"version": "does-not-exist"})
+
+        assert response.status_code == 404, "Unknown version should return 404"
+        assert response.json()["error"] == "http_error"
+
+        # The previously active model must still serve requests
+        response = client.get("/admin/model")
+        assert response.json()["version"] == "1"
+
+    @pytest.mark.parametrize("version", ["../../x", "/etc", "1/../2", "..\\1", ""])
+    def test_activate_rejects_paths_outside_the_model(self, client, version):
+        """Test that versions escaping the model's directory return 400."""
+        response = client.put("/admin/model", json={"version": version})
+
+        assert response.status_code == 400
+        assert client.get("/admin/model").json()["version"] == "1"
+
+
+class TestMetricsEndpoint:
+    """Test the Prometheus metrics endpoint."""
+
+    def test_metrics_exposition(self, client, valid_lead_payload):
+        """Test that requests, inference and validation errors are exported."""
+        client.post("/lead-scoring/score", json=valid_lead_payload)
+        client.post("/lead-scoring/score", json={})
+        response = client.get("/metrics")
+
+        assert response.status_code == 200, "Metrics should be exposed"
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert (
+            'http_requests_total{route="/lead-scoring/score",method="POST",status="422"}'
+            in text
+        )
+        assert 'validation_errors_total{route="/lead-scoring/score"}' in text
+        assert "model_inference_duration_seconds_count" in text
+        assert "http_requests_in_flight 1" in text, "Metrics request is in flight"
+
+
 class TestAPIIntegration:
     """Test API integration and error handling."""
 
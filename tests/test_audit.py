@@ -0,0 +1,216 @@
+"""Tests for the asynchronous prediction audit sink."""
+
+import asyncio
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from app.main import app
+from app.ml.audit import AuditSink, RotatingWriter, get_audit_sink
+from app.ml.cache import feature_hash
+from app.ml.registry import ModelRegistry, get_model_registry
+
+
+@pytest.fixture
+def model(artifact_root):
+    """Version 1 of the temporary lead-scoring model."""
+    return ModelRegistry(str(artifact_root), "lead-scoring", "1").active
+
+
+def submit(sink, *args):
+    """Run ``sink.record`` with ``args`` to completion."""
+    return asyncio.run(sink.record(*args))
+
+
+def read_jsonl(directory):
+    """All records of the JSONL audit files in ``directory``, oldest file first."""
+    return [
+        json.loads(line)
+        for path in sorted(directory.glob("*.jsonl"))
+        for line in path.read_text().splitlines()
+    ]
+
+
+class TestAuditSink:
+    """Test buffering, flushing and rotation of audit records."""
+
+    def test_writes_jsonl_records(self, model, tmp_path):
+        """Test that queued records are written with a feature hash on stop."""
+        sink = AuditSink(str(tmp_path), flush_interval_seconds=10)
+        vector = model.vectorize({"age": 30.0})
+
+        submit(sink, "req-1", model, [7], [vector], [40.0], 0.002)
+        sink.stop()
+
+        (record,) = read_jsonl(tmp_path)
+        assert record["request_id"] == "req-1"
+        assert record["lead_id"] == 7
+        assert record["model_version"] == "1"
+        assert record["features"] == feature_hash(vector).hex()
+        assert record["score"] == 40.0
+        assert record["latency_ms"] == 2.0
+        assert sink.snapshot()["flushes"] == 1, "Records should be written in bulk"
+
+    def test_writes_sqlite_with_full_features(self, model, tmp_path):
+        """Test the SQLite format storing the feature values by name."""
+        sink = AuditSink(str(tmp_path), fmt="sqlite", features="full")
+        vectors = [model.vectorize({"age": age}) for age in (1.0, 2.0)]
+
+        submit(sink, "req-1", model, [1, 2], vectors, [11.0, 12.0], 0.001)
+        sink.stop()
+
+        (path,) = tmp_path.glob("*.db")
+        with sqlite3.connect(path) as connection:
+            rows = connection.execute(
+                "SELECT lead_id, features, score FROM predictions ORDER BY lead_id"
+            ).fetchall()
+        assert [row[0] for row in rows] == [1, 2]
+        assert json.loads(rows[1][1]) == {"age": 2.0, "income": 0.0}
+        assert rows[1][2] == 12.0
+
+    @pytest.mark.parametrize("rotation", [{"rotate_bytes": 1}, {"rotate_seconds": 0.0}])
+    def test_rotates_files(self, model, tmp_path, rotation):
+        """Test that a new file is started by size or by age."""
+        sink = AuditSink(str(tmp_path), batch_size=1, **rotation)
+        vector = model.vectorize({})
+        for lead_id in range(3):
+            submit(sink, "req", model, [lead_id], [vector], [10.0], 0.0)
+        sink.stop()
+
+        assert len(list(tmp_path.glob("*.jsonl"))) == 3
+        assert [record["lead_id"] for record in read_jsonl(tmp_path)] == [0, 1, 2]
+
+    def test_drops_when_buffer_is_full(self, model, tmp_path):
+        """Test that the drop policy discards records the buffer cannot hold."""
+        sink = AuditSink(str(tmp_path), buffer_size=1, overflow="drop", batch_size=1)
+        writing = threading.Event()
+        release = threading.Event()
+        write = sink.writer.write
+
+        def slow_write(rows):
+            writing.set()
+            release.wait(5)
+            write(rows)
+
+        sink.writer.write = slow_write
+        vector = model.vectorize({})
+
+        assert submit(sink, "req", model, [1], [vector], [1.0], 0.0)
+        assert writing.wait(5), "The first record should be taken by the writer"
+        assert submit(sink, "req", model, [2], [vector], [1.0], 0.0)
+        assert not submit(sink, "req", model, [3], [vector], [1.0], 0.0)
+        release.set()
+        sink.stop()
+
+        stats = sink.snapshot()
+        assert stats["dropped"] == 1
+        assert stats["written"] == 2
+        assert stats["backlog"] == 0
+
+    def test_block_waits_off_the_event_loop(self, model, tmp_path):
+        """Test that a full queue with the block policy leaves the loop free."""
+        sink = AuditSink(str(tmp_path), buffer_size=1, batch_size=1)
+        writing = threading.Event()
+        release = threading.Event()
+        write = sink.writer.write
+
+        def slow_write(rows):
+            writing.set()
+            release.wait(5)
+            write(rows)
+
+        sink.writer.write = slow_write
+        vector = model.vectorize({})
+        assert submit(sink, "req", model, [1], [vector], [1.0], 0.0)
+        assert writing.wait(5), "The first record should be taken by the writer"
+        assert submit(sink, "req", model, [2], [vector], [1.0], 0.0)
+
+        async def run():
+            blocked = asyncio.create_task(
+                sink.record("req", model, [3], [vector], [1.0], 0.0)
+            )
+            await asyncio.sleep(0.05)
+            waiting = not blocked.done()
+            release.set()
+            return waiting, await blocked
+
+        assert asyncio.run(run()) == (True, True)
+        sink.stop()
+
+        stats = sink.snapshot()
+        assert stats["dropped"] == 0
+        assert stats["written"] == 3
+
+    def test_writer_formats_implement_open_and_append(self, tmp_path):
+        """Test that the base writer cannot be used without a file format."""
+        with pytest.raises(TypeError):
+            RotatingWriter(str(tmp_path), 1, 1.0)
+
+    def test_write_failures_are_counted(self, model, tmp_path):
+        """Test that a failed flush is counted and the sink keeps running."""
+        sink = AuditSink(str(tmp_path), batch_size=1)
+        write = sink.writer.write
+        calls = []
+
+        def flaky_write(rows):
+            calls.append(rows)
+            if len(calls) == 1:
+                raise OSError("disk full")
+            write(rows)
+
+        sink.writer.write = flaky_write
+        vector = model.vectorize({})
+        submit(sink, "req", model, [1], [vector], [1.0], 0.0)
+        submit(sink, "req", model, [2], [vector], [1.0], 0.0)
+        sink.stop()
+
+        assert sink.snapshot()["failed"] == 1
+        assert [record["lead_id"] for record in read_jsonl(tmp_path)] == [2]
+
+
+class TestAuditedScoring:
+    """Test that the scoring endpoints feed the audit sink."""
+
+    @pytest.fixture
+    def sink(self, artifact_root, tmp_path):
+        """Audit sink and model installed for the API."""
+        sink = AuditSink(str(tmp_path / "audit"))
+        registry = ModelRegistry(str(artifact_root), "lead-scoring", "1")
+        app.dependency_overrides[get_model_registry] = lambda: registry
+        app.dependency_overrides[get_audit_sink] = lambda: sink
+        yield sink
+        app.dependency_overrides.clear()
+
+    def test_single_batch_and_stream_are_audited(self, client, sink, tmp_path):
+        """Test that every served score is recorded with its request id."""
+        client.post("/lead-scoring/score", json={"lead_id": 1, "features": {}})
+        client.post(
+            "/lead-scoring/score/batch",
+            json=[{"lead_id": 2, "features": {}}, {"lead_id": 3, "features": {}}],
+        )
+        client.post(
+            "/lead-scoring/score/stream",
+            content=b'{"lead_id": 4, "features": {}}\nnot json\n',
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        sink.stop()
+
+        records = read_jsonl(tmp_path / "audit")
+        assert sorted(record["lead_id"] for record in records) == [1, 2, 3, 4]
+        assert all(record["score"] == 10.0 for record in records)
+        assert len({record["request_id"] for record in records}) == 3
+        assert "unknown" not in {record["request_id"] for record in records}
+
+    def test_admin_endpoint(self, client, sink):
+        """Test that backlog and flush latency are reported."""
+        client.post("/lead-scoring/score", json={"lead_id": 1, "features": {}})
+        sink.stop()
+
+        stats = client.get("/admin/audit").json()
+
+        assert stats["enabled"] is True
+        assert stats["written"] == 1
+        assert stats["backlog"] == 0
+        assert stats["last_flush_ms"] > 0
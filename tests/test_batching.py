@@ -0,0 +1,85 @@
+"""Tests for the adaptive micro-batcher."""
+
+import asyncio
+import dataclasses
+
+import pytest
+
+from app.ml.batching import MicroBatcher
+from app.ml.registry import ModelRegistry
+
+
+@pytest.fixture
+def model(artifact_root):
+    """Version 1 of the temporary lead-scoring model."""
+    return ModelRegistry(
+        artifact_root=str(artifact_root), name="lead-scoring", version="1"
+    ).active
+
+
+def score_concurrently(batcher, model, rows):
+    """Submit all rows at once and gather their scores."""
+
+    async def run():
+        return await asyncio.gather(
+            *(batcher.score(model, model.vectorize(row)) for row in rows)
+        )
+
+    return asyncio.run(run())
+
+
+class TestMicroBatcher:
+    """Test batching of concurrent score calls."""
+
+    def test_concurrent_calls_share_batches(self, model):
+        """Test that concurrent requests are scored together and in order."""
+        batcher = MicroBatcher(max_batch_size=4, max_wait_ms=50)
+        rows = [{"age": float(age)} for age in range(10)]
+
+        scores = score_concurrently(batcher, model, rows)
+
+        assert scores == pytest.approx([10.0 + age for age in range(10)])
+        stats = batcher.stats.snapshot()
+        assert stats["items"] == 10, "Every request should be counted"
+        assert stats["batches"] == 3, "Requests should be packed up to max size"
+        assert stats["max_batch_size"] == 4
+
+    def test_single_request_is_not_delayed(self, model):
+        """Test that a lone request is flushed without waiting for max_wait."""
+        batcher = MicroBatcher(max_batch_size=64, max_wait_ms=10_000)
+
+        scores = score_concurrently(batcher, model, [{"age": 1.0}])
+
+        assert scores == pytest.approx([11.0])
+        assert batcher.stats.snapshot()["max_queue_wait_ms"] < 1000
+
+    def test_disabled_batcher_scores_inline(self, model):
+        """Test that a disabled batcher bypasses batching entirely."""
+        batcher = MicroBatcher(max_batch_size=4, max_wait_ms=1, enabled=False)
+
+        scores = score_concurrently(batcher, model, [{"age": 1.0}, {"age": 2.0}])
+
+        assert scores == pytest.approx([11.0, 12.0])
+        assert batcher.stats.snapshot()["batches"] == 0
+
+    def test_predict_error_propagates_to_callers(self, model):
+        """Test that a failed batch fails every caller in it."""
+        broken = dataclasses.replace(model, predictor=None)
+        batcher = MicroBatcher(max_batch_size=2, max_wait_ms=1)
+
+        with pytest.raises(AttributeError):
+            score_concurrently(batcher, broken, [{"age": 1.0}, {"age": 2.0}])
+
+    def test_hot_swap_mid_batch_uses_each_callers_model(self, artifact_root, model):
+        """Test that one batch spanning a hot-swap scores with both models."""
+        registry = ModelRegistry(str(artifact_root), "lead-scoring", "1")
+        newer = registry.load("2")
+        batcher = MicroBatcher(max_batch_size=2, max_wait_ms=50)
+
+        async def run():
+            return await asyncio.gather(
+                batcher.score(model, model.vectorize({"age": 1.0})),
+                batcher.score(newer, newer.vectorize({"age": 1.0})),
+            )
+
+        assert asyncio.run(run()) == pytest.approx([11.0, 2.0])
@@ -0,0 +1,138 @@
+"""Tests for the benchmark harness and baseline comparison."""
+
+import asyncio
+import copy
+import os
+
+import httpx
+import pytest
+
+from app.core.logging import LoggingMiddleware
+from app.main import app
+from benchmarks import preprocessing, trees
+from benchmarks.apps import bare_app
+from benchmarks.codec import measure
+from benchmarks.compare import compare
+from benchmarks.harness import LoadRunner, percentile
+from benchmarks.scenarios import build_scenarios, synthetic_payloads
+
+
+def run_scenario(name, load):
+    """Run a short in-process benchmark of one scenario."""
+    scenario = build_scenarios(synthetic_payloads(10))[name]
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark"
+        ) as client:
+            runner = LoadRunner(
+                client, scenario.requests, scenario.expected_status, os.getpid()
+            )
+            if load == "rate":
+                return await runner.run_rate(20, rate=1000)
+            return await runner.run_concurrency(20, concurrency=4)
+
+    return asyncio.run(run())
+
+
+def result(p50, p99, throughput):
+    """Minimal benchmark result with the compared metrics."""
+    return {
+        "latency_ms": {"p50": p50, "p95": p99, "p99": p99},
+        "throughput_rps": throughput,
+    }
+
+
+class TestHarness:
+    """Test load generation and statistics."""
+
+    @pytest.mark.parametrize("load", ["concurrency", "rate"])
+    @pytest.mark.parametrize("name", ["score", "validation_error", "health"])
+    def test_scenarios_succeed(self, name, load):
+        """Test that every request of a scenario returns the expected status."""
+        summary = run_scenario(name, load)
+
+        assert summary["requests"] == 20
+        assert summary["errors"] == 0, f"{name} should return its expected status"
+        assert 0 < summary["latency_ms"]["p50"] <= summary["latency_ms"]["p99"]
+        assert summary["rss_mb"] > 0
+
+    def test_percentile_nearest_rank(self):
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+
+        assert percentile(values, 0.50) == 50
+        assert percentile(values, 0.99) == 99
+        assert percentile([], 0.99) == 0.0
+
+    def test_bare_app_only_lacks_logging(self):
+        """Test that the baseline app runs every middleware but logging."""
+        served = [item.cls for item in app.user_middleware]
+
+        assert [item.cls for item in bare_app.user_middleware] == [
+            cls for cls in served if cls is not LoggingMiddleware
+        ]
+
+
+class TestCompare:
+    """Test regression detection against a baseline."""
+
+    def test_detects_latency_and_throughput_regressions(self):
+        """Test that slower latency and lower throughput are reported."""
+        baseline = {"results": {"inprocess/score/rate": result(2.0, 5.0, 1000)}}
+        current = copy.deepcopy(baseline)
+        current["results"]["inprocess/score/rate"] = result(2.1, 7.0, 800)
+
+        regressions = compare(current, baseline, threshold=10)
+
+        assert len(regressions) == 3, "p95, p99 and throughput should regress"
+        assert all(r.startswith("inprocess/score/rate") for r in regressions)
+
+    def test_ignores_small_absolute_changes(self):
+        """Test that sub-threshold jitter and unknown runs are not reported."""
+        baseline = {"results": {"a": result(0.05, 0.1, 1000)}}
+        current = {"results": {"a": result(0.1, 0.15, 950), "b": result(9, 9, 1)}}
+
+        assert compare(current, baseline, threshold=10) == []
+
+
+class TestCodecBenchmark:
+    """Test the codec micro-benchmark."""
+
+    def test_measures_both_codecs(self):
+        """Test that every shape reports the schema and fast codec timings."""
+        results = measure(synthetic_payloads(20), batch_size=10, repeat=1)
+
+        assert {"single/application/json", "batch10/application/json"} <= set(results)
+        for result in results.values():
+            assert result["schema_us"] > 0
+            assert result["fast_us"] > 0
+
+
+class TestTreesBenchmark:
+    """Test the tree-ensemble micro-benchmark."""
+
+    def test_measures_every_batch_size(self):
+        """Test that the reference is only timed up to its row limit."""
+        results = trees.measure(
+            trees=5, depth=3, batch_sizes=[1, 50], repeat=1, reference_max_rows=10
+        )
+
+        assert set(results) == {"1", "50"}
+        assert results["1"]["speedup"] > 0
+        assert "reference_us" not in results["50"]
+        assert results["50"]["compiled_rows_per_second"] > 0
+
+
+class TestPreprocessingBenchmark:
+    """Test the preprocessing micro-benchmark."""
+
+    def test_measures_every_feature_count(self):
+        """Test that both paths report a cost per row and per value."""
+        results = preprocessing.measure([2, 20], rows=10, repeat=1)
+
+        assert set(results) == {"2", "20"}
+        for result in results.values():
+            assert result["compiled_ns_per_value"] > 0
+            assert result["reference_us_per_row"] > 0
@@ -0,0 +1,111 @@
+"""Tests for the offline bulk scoring CLI."""
+
+import json
+
+from app.bulk_score import main
+from app.config.config import get_settings
+
+
+class TestBulkScore:
+    """Test scoring JSONL files through the process pool."""
+
+    def test_scores_shards_in_input_order(self, artifact_root, tmp_path):
+        """Test that a directory of shards is scored in order across workers."""
+        shards = tmp_path / "shards"
+        shards.mkdir()
+        lead_id = 0
+        for shard in ("part-0.jsonl", "part-1.jsonl"):
+            lines = []
+            for _ in range(25):
+                lines.append(json.dumps({"lead_id": lead_id, "features": {"age": 1.0}}))
+                lead_id += 1
+            (shards / shard).write_text("\n".join(lines) + "\n")
+        output = tmp_path / "scores.jsonl"
+
+        exit_code = main(
+            [
+                str(shards),
+                "-o",
+                str(output),
+                "--workers",
+                "2",
+                "--chunk-size",
+                "7",
+                "--artifact-root",
+                str(artifact_root),
+            ]
+        )
+
+        assert exit_code == 0, "Bulk scoring should succeed"
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [record["lead_id"] for record in records] == list(range(50))
+        assert all(record["score"] == 11.0 for record in records)
+
+    def test_malformed_lines_get_error_records(self, artifact_root, tmp_path):
+        """Test that bad lines are reported without aborting the job."""
+        source = tmp_path / "leads.jsonl"
+        source.write_text('{"lead_id": 1, "features": {}}\nnot json\n')
+        output = tmp_path / "scores.jsonl"
+
+        exit_code = main(
+            [
+                str(source),
+                "-o",
+                str(output),
+                "-w",
+                "1",
+                "--artifact-root",
+                str(artifact_root),
+            ]
+        )
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert exit_code == 0
+        assert records[0] == {"lead_id": 1, "score": 10.0}
+        assert records[1]["line"] == 2 and records[1]["error"] == "validation_error"
+
+    def test_feature_policies_match_the_api(self, artifact_root, tmp_path, monkeypatch):
+        """Test that the configured missing-feature policy is applied."""
+        monkeypatch.setattr(get_settings().model, "missing_features", "reject")
+        source = tmp_path / "leads.jsonl"
+        source.write_text(
+            '{"lead_id": 1, "features": {"age": 1, "income": 0}}\n'
+            '{"lead_id": 2, "features": {"age": 1}}\n'
+        )
+        output = tmp_path / "scores.jsonl"
+
+        exit_code = main(
+            [
+                str(source),
+                "-o",
+                str(output),
+                "-w",
+                "1",
+                "--artifact-root",
+                str(artifact_root),
+            ]
+        )
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert exit_code == 0
+        assert records[0] == {"lead_id": 1, "score": 11.0}
+        assert records[1]["line"] == 2 and "income" in json.dumps(records[1]["details"])
+
+    def test_unknown_model_version_fails_fast(self, artifact_root, tmp_path):
+        """Test that an unknown model version exits with an error code."""
+        source = tmp_path / "leads.jsonl"
+        source.write_text('{"lead_id": 1, "features": {}}\n')
+
+        exit_code = main(
+            [
+                str(source),
+                "-o",
+                str(tmp_path / "out.jsonl"),
+                "--artifact-root",
+                str(artifact_root),
+                "--model-version",
+                "missing",
+            ]
+        )
+
+        assert exit_code == 1, "Unknown model should fail before scoring"
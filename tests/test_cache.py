@@ -0,0 +1,77 @@
+"""Tests for the prediction cache."""
+
+import time
+
+import pytest
+
+from app.ml.cache import PredictionCache
+from app.ml.registry import ModelRegistry
+
+
+@pytest.fixture
+def registry(artifact_root):
+    """Registry pointing at the temporary artifact tree."""
+    return ModelRegistry(str(artifact_root), "lead-scoring", "1")
+
+
+def make_key(cache, model, lead_id, features):
+    """Build a cache key for a lead scored by ``model``."""
+    return cache.key(model, lead_id, model.vectorize(features))
+
+
+class TestPredictionCache:
+    """Test LRU, TTL and invalidation behavior."""
+
+    def test_hit_after_put(self, registry):
+        """Test that identical leads hit and different features miss."""
+        cache = PredictionCache(max_entries=10, ttl_seconds=60)
+        model = registry.active
+        cache.put(make_key(cache, model, 1, {"age": 1.0}), 11.0)
+
+        assert cache.get(make_key(cache, model, 1, {"age": 1.0})) == 11.0
+        assert cache.get(make_key(cache, model, 1, {"age": 2.0})) is None
+        assert cache.get(make_key(cache, model, 2, {"age": 1.0})) is None
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_lru_eviction(self, registry):
+        """Test that the least recently used entry is evicted first."""
+        cache = PredictionCache(max_entries=2, ttl_seconds=60)
+        model = registry.active
+        keys = [make_key(cache, model, lead_id, {}) for lead_id in range(3)]
+        cache.put(keys[0], 0.0)
+        cache.put(keys[1], 1.0)
+        cache.get(keys[0])
+        cache.put(keys[2], 2.0)
+
+        assert cache.get(keys[1]) is None, "LRU entry should be evicted"
+        assert cache.get(keys[0]) == 0.0, "Recently used entry should survive"
+        assert cache.evictions == 1
+
+    def test_ttl_expiry(self, registry):
+        """Test that expired entries are treated as misses."""
+        cache = PredictionCache(max_entries=10, ttl_seconds=0.01)
+        key = make_key(cache, registry.active, 1, {})
+        cache.put(key, 1.0)
+        time.sleep(0.02)
+
+        assert cache.get(key) is None
+        assert cache.expirations == 1
+
+    def test_model_swap_invalidates(self, registry):
+        """Test that a new model version drops cached scores."""
+        cache = PredictionCache(max_entries=10, ttl_seconds=60)
+        cache.put(make_key(cache, registry.active, 1, {}), 10.0)
+        newer = registry.activate("2")
+
+        assert cache.get(make_key(cache, newer, 1, {})) is None
+        assert cache.invalidations == 1
+        assert cache.snapshot()["size"] == 0
+
+    def test_disabled_cache(self, registry):
+        """Test that a disabled cache never stores anything."""
+        cache = PredictionCache(max_entries=10, ttl_seconds=60, enabled=False)
+        key = make_key(cache, registry.active, 1, {})
+        cache.put(key, 1.0)
+
+        assert cache.get(key) is None
+        assert cache.snapshot()["size"] == 0
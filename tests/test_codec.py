@@ -0,0 +1,150 @@
+"""Tests for the scoring request and response codecs."""
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import codec
+from app.core.codec import ScoringCodec, get_codec
+from app.main import app
+from app.ml.cache import PredictionCache, get_prediction_cache
+from app.ml.registry import ModelRegistry, get_model_registry
+
+SINGLE_BODIES = [
+    b'{"lead_id": 1, "features": {"age": 30, "income": 1000.5}}',
+    b'{"lead_id": "7", "features": {"age": "30"}}',
+    b'{"lead_id": true, "features": {"age": true}}',
+    b'{"lead_id": 1.5}',
+    b'{"features": {}}',
+    b'{"lead_id": 1, "features": {"age": "x"}}',
+    b'{"lead_id": 99999999999999999999999, "features": {}}',
+    b"[]",
+    b"null",
+    b"",
+    b"{bad",
+]
+BATCH_BODIES = [
+    b'[{"lead_id": 1, "features": {"age": 30}}, {"lead_id": 2, "features": {}}]',
+    b'[{"lead_id": 1}, {"features": {}}, {"lead_id": "x"}]',
+    b"[null]",
+    b"{}",
+    b"[1",
+]
+
+
+@pytest.fixture
+def scoring(artifact_root):
+    """Install version 1 of the model without a prediction cache."""
+    registry = ModelRegistry(str(artifact_root), "lead-scoring", "1")
+    app.dependency_overrides[get_model_registry] = lambda: registry
+    app.dependency_overrides[get_prediction_cache] = lambda: PredictionCache(0, 0.0)
+    yield
+    app.dependency_overrides.clear()
+
+
+def post(client, mode, path, body, content_type="application/json"):
+    """Post a raw body with the given codec, returning status, type and body."""
+    app.dependency_overrides[get_codec] = lambda: ScoringCodec(mode)
+    response = client.post(
+        path, content=body, headers={"content-type": content_type, "x-request-id": "r"}
+    )
+    return response.status_code, response.headers["content-type"], response.content
+
+
+class TestCodecParity:
+    """Test that the fast codec answers exactly like the schema codec."""
+
+    @pytest.mark.parametrize("body", SINGLE_BODIES)
+    def test_single(self, client, scoring, body):
+        """Test single scoring responses, accepted and rejected."""
+        path = "/lead-scoring/score"
+
+        assert post(client, "fast", path, body) == post(client, "schema", path, body)
+
+    @pytest.mark.parametrize("body", BATCH_BODIES)
+    def test_batch(self, client, scoring, body):
+        """Test batch scoring responses, accepted and rejected."""
+        path = "/lead-scoring/score/batch"
+
+        assert post(client, "fast", path, body) == post(client, "schema", path, body)
+
+    def test_other_content_types_are_unsupported(self, client, scoring):
+        """Test that bodies of unknown media types are refused with a 415."""
+        body = SINGLE_BODIES[0]
+        path = "/lead-scoring/score"
+
+        fast = post(client, "fast", path, body, "text/plain")
+        assert fast == post(client, "schema", path, body, "text/plain")
+        assert fast[0] == 415
+        assert post(client, "fast", path, body, "application/vnd.api+json")[0] == 200
+
+
+class TestScoringCodec:
+    """Test decoding and encoding outside the routes."""
+
+    def test_well_formed_bodies_skip_the_schema(self, monkeypatch):
+        """Test that valid requests are not validated through Pydantic."""
+        monkeypatch.setattr(codec, "_REQUEST", None)
+
+        lead_id, features = ScoringCodec("fast").decode_lead(
+            b'{"lead_id": 3, "features": {"age": 30}}', "application/json"
+        )
+
+        assert lead_id == 3
+        assert features == {"age": 30}
+
+    def test_schema_coerces_lax_values(self):
+        """Test that bodies off the fast path get the schema's coercion."""
+        leads = ScoringCodec("fast").decode_batch(
+            b'[{"lead_id": 1}, {"lead_id": "2", "features": {"age": "3"}}]', None
+        )
+
+        assert leads == [(1, None), (2, {"age": 3.0})]
+
+    def test_encodes_compact_json(self):
+        """Test that responses match JSONResponse's output."""
+        response = ScoringCodec("fast").encode([{"lead_id": 1, "score": 40.0}])
+
+        assert response.body == b'[{"lead_id":1,"score":40.0}]'
+        assert response.media_type == "application/json"
+
+    def test_msgpack_without_the_package(self, monkeypatch):
+        """Test that msgpack is refused, and not offered, when not installed."""
+        monkeypatch.setattr(codec, "msgpack", None)
+        scoring = ScoringCodec("fast")
+
+        with pytest.raises(HTTPException) as exc_info:
+            scoring.decode_lead(b"\x81", "application/msgpack")
+        response = scoring.encode({"lead_id": 1, "score": 1.0}, "application/msgpack")
+
+        assert exc_info.value.status_code == 415
+        assert response.media_type == "application/json"
+
+    def test_msgpack_round_trip(self, client, scoring):
+        """Test a msgpack request answered in msgpack."""
+        msgpack = pytest.importorskip("msgpack")
+        app.dependency_overrides[get_codec] = lambda: ScoringCodec("fast")
+
+        response = client.post(
+            "/lead-scoring/score/batch",
+            content=msgpack.packb([{"lead_id": 1, "features": {"age": 30}}]),
+            headers={
+                "content-type": "application/msgpack",
+                "accept": "application/msgpack",
+            },
+        )
+
+        assert response.headers["content-type"] == "application/msgpack"
+        assert msgpack.unpackb(response.content) == [{"lead_id": 1, "score": 40.0}]
+
+    def test_invalid_mode(self):
+        """Test that unknown codecs are rejected."""
+        with pytest.raises(ValueError):
+            ScoringCodec("pickle")
+
+    def test_schemas_stay_documented(self, client):
+        """Test that the OpenAPI document still describes the request body."""
+        operation = client.get("/openapi.json").json()["paths"]["/lead-scoring/score"]
+
+        body = operation["post"]["requestBody"]["content"]["application/json"]
+        assert body["schema"]["title"] == "LeadScoringRequest"
+        assert body["schema"]["required"] == ["lead_id"]
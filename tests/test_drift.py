@@ -0,0 +1,196 @@
+"""Tests for streaming drift statistics and reference profiles."""
+
+import json
+
+import numpy as np
+import pytest
+
+from app.drift_profile import main
+from app.main import app
+from app.ml.drift import (
+    PROFILE_FILE,
+    DriftMonitor,
+    StreamingStats,
+    get_drift_monitor,
+    psi,
+)
+from app.ml.registry import ModelRegistry, get_model_registry
+
+
+@pytest.fixture
+def registry(artifact_root):
+    """Registry serving version 1 of the temporary artifact tree."""
+    return ModelRegistry(str(artifact_root), "lead-scoring", "1")
+
+
+def observe_ages(monitor, model, ages):
+    """Score one request per age through the monitor."""
+    for age in ages:
+        features = {"age": float(age)}
+        vector = model.vectorize(features)
+        monitor.observe(model, (features,), (vector,), (model.score(vector),))
+
+
+class TestStreamingStats:
+    """Test the mergeable per-column statistics."""
+
+    def test_batches_merge_to_exact_moments(self):
+        """Test that merged batches give the mean and variance of all rows."""
+        rng = np.random.default_rng(0)
+        data = rng.normal(5.0, 2.0, size=(1000, 2))
+        stats = StreamingStats(["a", "b"])
+        for batch in np.array_split(data, 7):
+            stats.update(batch)
+
+        column = stats.column(1)
+        assert column["count"] == 1000
+        assert column["mean"] == pytest.approx(data[:, 1].mean())
+        assert column["std"] == pytest.approx(data[:, 1].std(ddof=1))
+        assert column["min"] == data[:, 1].min()
+        assert column["max"] == data[:, 1].max()
+
+    def test_missing_values_are_excluded(self):
+        """Test that NaN cells count as missing, not as values."""
+        stats = StreamingStats(["a"])
+        stats.update(np.array([[1.0], [np.nan], [3.0], [np.nan]]))
+
+        column = stats.column(0)
+        assert column["missing_rate"] == 0.5
+        assert column["mean"] == 2.0
+
+    def test_quantiles_from_histogram(self):
+        """Test that bin interpolation approximates the true quantiles."""
+        data = np.linspace(0, 100, 10_001)[:, None]
+        stats = StreamingStats(["a"], bins=20)
+        stats.update(data[::7])
+        stats.update(data)
+
+        quantiles = stats.quantiles(0)
+        assert quantiles["p50"] == pytest.approx(50, abs=2)
+        assert quantiles["p95"] == pytest.approx(95, abs=2)
+
+    def test_psi(self):
+        """Test that PSI is zero for equal histograms and large for shifted ones."""
+        reference = np.array([25.0, 25.0, 25.0, 25.0])
+
+        assert psi(reference * 3, reference) == pytest.approx(0.0)
+        assert psi(np.array([70.0, 20.0, 5.0, 5.0]), reference) > 0.2
+
+
+class TestDriftMonitor:
+    """Test per-model drift tracking."""
+
+    def test_updates_are_folded_in_bulk(self, registry):
+        """Test that rows are buffered until the fold size is reached."""
+        monitor = DriftMonitor(fold_size=4)
+        model = registry.active
+        observe_ages(monitor, model, range(3))
+
+        tracker = monitor.models[(model.version, model.loaded_at)]
+        assert tracker.pending_rows == 3
+        assert tracker.features.rows == 0
+        observe_ages(monitor, model, [3])
+        assert tracker.features.rows == 4
+
+    def test_snapshot_reports_features_and_scores(self, registry):
+        """Test feature missing rates and score statistics."""
+        monitor = DriftMonitor()
+        observe_ages(monitor, registry.active, [20, 30, 40])
+
+        stats = monitor.snapshot(registry.active)
+
+        assert stats["rows"] == 3
+        assert stats["features"]["age"]["mean"] == 30.0
+        assert stats["features"]["income"]["missing_rate"] == 1.0
+        assert stats["score"]["mean"] == pytest.approx(40.0)
+        assert stats["score"]["psi"] is None, "Without a reference there is no PSI"
+
+    def test_early_reads_do_not_fix_bin_edges(self, registry):
+        """Test that edges wait for enough values even when read in between."""
+        monitor = DriftMonitor()
+        model = registry.active
+        observe_ages(monitor, model, [5.0])
+        early = monitor.snapshot(model)
+        ages = np.random.default_rng(0).normal(50, 20, 1000)
+        observe_ages(monitor, model, ages)
+
+        stats = monitor.snapshot(model)
+
+        tracker = monitor.models[(model.version, model.loaded_at)]
+        assert early["features"]["age"]["quantiles"]["p50"] == 5.0
+        quantiles = stats["features"]["age"]["quantiles"]
+        assert len(tracker.features.histograms[0]) == 10
+        assert quantiles["p50"] == pytest.approx(np.median(ages), abs=3)
+        # The open upper bin only bounds the tail estimate
+        assert quantiles["p95"] == pytest.approx(np.quantile(ages, 0.95), abs=10)
+
+    def test_psi_against_reference_profile(self, registry, artifact_root):
+        """Test that shifted traffic is flagged against the stored profile."""
+        baseline = DriftMonitor()
+        observe_ages(baseline, registry.active, range(20, 60))
+        profile = baseline.profile(registry.active)
+        (artifact_root / "lead-scoring" / "1" / PROFILE_FILE).write_text(
+            json.dumps(profile)
+        )
+
+        monitor = DriftMonitor()
+        model = registry.activate("1")
+        observe_ages(monitor, model, range(20, 60))
+        steady = monitor.snapshot(model)
+        observe_ages(monitor, model, [90] * 200)
+        shifted = monitor.snapshot(model)
+
+        assert steady["reference"] is True
+        assert steady["features"]["age"]["psi"] == pytest.approx(0.0)
+        assert steady["drifted"] == []
+        assert shifted["drifted"] == ["age", "score"]
+
+
+class TestDriftEndpoints:
+    """Test the drift admin endpoints and the profile CLI."""
+
+    @pytest.fixture
+    def monitor(self, registry):
+        """Fresh drift monitor and model installed for the API."""
+        monitor = DriftMonitor()
+        app.dependency_overrides[get_model_registry] = lambda: registry
+        app.dependency_overrides[get_drift_monitor] = lambda: monitor
+        yield monitor
+        app.dependency_overrides.clear()
+
+    def test_scored_traffic_is_reported(self, client, monitor):
+        """Test that single and batch scoring feed the statistics."""
+        client.post("/lead-scoring/score", json={"lead_id": 1, "features": {"age": 30}})
+        client.post(
+            "/lead-scoring/score/batch",
+            json=[{"lead_id": 2, "features": {"age": 40, "income": 10}}],
+        )
+
+        stats = client.get("/admin/drift").json()
+
+        assert stats["enabled"] is True
+        assert stats["rows"] == 2
+        assert stats["features"]["income"]["missing_rate"] == 0.5
+        assert client.get("/admin/drift", params={"version": "9"}).status_code == 404
+
+    def test_profile_cli(self, artifact_root, tmp_path):
+        """Test that the CLI stores a reference profile with the model."""
+        sample = tmp_path / "sample.jsonl"
+        sample.write_text(
+            "\n".join(
+                json.dumps({"lead_id": age, "features": {"age": age}})
+                for age in range(100)
+            )
+        )
+
+        exit_code = main(
+            [str(sample), "--bins", "4", "--artifact-root", str(artifact_root)]
+        )
+
+        profile = json.loads(
+            (artifact_root / "lead-scoring" / "1" / PROFILE_FILE).read_text()
+        )
+        assert exit_code == 0
+        assert len(profile["features"]["age"]["edges"]) == 3
+        assert sum(profile["features"]["age"]["counts"]) == 100
+        assert sum(profile["score"]["counts"]) == 100
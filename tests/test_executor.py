@@ -0,0 +1,167 @@
+"""Tests for the inference executor."""
+
+import asyncio
+import dataclasses
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.main import app
+from app.ml.executor import (
+    InferenceExecutor,
+    InferenceUnavailableError,
+    get_executor,
+)
+from app.ml.registry import ModelRegistry, get_model_registry
+
+
+class SlowPredictor:
+    """Predictor that blocks until released, to simulate a stuck model."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.release = threading.Event()
+
+    def predict(self, matrix):
+        self.release.wait(self.seconds)
+        return matrix[:, 0]
+
+
+@pytest.fixture
+def registry(artifact_root):
+    """Registry over the temporary lead-scoring model."""
+    return ModelRegistry(
+        artifact_root=str(artifact_root), name="lead-scoring", version="1"
+    )
+
+
+def predict(executor, model, rows):
+    """Run one executor prediction to completion."""
+
+    async def run():
+        return await executor.predict(model, [model.vectorize(row) for row in rows])
+
+    return asyncio.run(run()).tolist()
+
+
+class TestInferenceExecutor:
+    """Test the execution modes, timeouts and queue limit."""
+
+    @pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+    def test_modes_agree(self, registry, mode):
+        """Test that every execution mode returns the model's scores."""
+        executor = InferenceExecutor(mode, workers=1, timeout_seconds=30)
+        try:
+            scores = predict(executor, registry.active, [{"age": 1.0}, {"age": 5.0}])
+        finally:
+            executor.shutdown()
+
+        assert scores == pytest.approx([11.0, 15.0])
+
+    def test_unsupported_mode(self):
+        """Test that unknown modes are rejected at construction."""
+        with pytest.raises(ValueError):
+            InferenceExecutor("gpu")
+
+    def test_timeout(self, registry):
+        """Test that a prediction exceeding the timeout is abandoned."""
+        predictor = SlowPredictor(seconds=5)
+        model = dataclasses.replace(registry.active, predictor=predictor)
+        executor = InferenceExecutor(
+            "thread", workers=1, queue_limit=1, timeout_seconds=0.05
+        )
+        try:
+            with pytest.raises(InferenceUnavailableError):
+                predict(executor, model, [{"age": 1.0}])
+            assert executor.in_flight == 1, "The abandoned predict is still running"
+            with pytest.raises(InferenceUnavailableError, match="queue is full"):
+                predict(executor, model, [{"age": 1.0}])
+        finally:
+            predictor.release.set()
+            executor._get_pool().shutdown(wait=True)
+            executor.shutdown()
+
+        assert executor.snapshot()["timeouts"] == 1
+        assert executor.snapshot()["rejected"] == 1
+        assert executor.in_flight == 0, "Finished calls should leave the queue"
+
+    def test_queue_limit(self, registry):
+        """Test that calls beyond the queue limit are rejected immediately."""
+        predictor = SlowPredictor(seconds=5)
+        model = dataclasses.replace(registry.active, predictor=predictor)
+        executor = InferenceExecutor(
+            "thread", workers=1, queue_limit=1, timeout_seconds=5
+        )
+
+        async def run():
+            vectors = [model.vectorize({"age": 1.0})]
+            first = asyncio.ensure_future(executor.predict(model, vectors))
+            await asyncio.sleep(0)
+            try:
+                with pytest.raises(InferenceUnavailableError):
+                    await executor.predict(model, vectors)
+            finally:
+                predictor.release.set()
+            return await first
+
+        try:
+            scores = asyncio.run(run())
+        finally:
+            executor.shutdown()
+
+        assert scores.tolist() == [1.0], "The admitted call should still complete"
+        assert executor.snapshot()["rejected"] == 1
+
+
+class TestInferenceUnavailableResponse:
+    """Test that inference failures surface as clean 503 responses."""
+
+    @pytest.fixture
+    def slow_app(self, registry):
+        predictor = SlowPredictor(seconds=5)
+        slow = SimpleNamespace(
+            active=dataclasses.replace(registry.active, predictor=predictor)
+        )
+        executor = InferenceExecutor("thread", workers=1, timeout_seconds=0.05)
+        app.dependency_overrides[get_model_registry] = lambda: slow
+        app.dependency_overrides[get_executor] = lambda: executor
+        yield executor
+        app.dependency_overrides.clear()
+        predictor.release.set()
+        executor.shutdown()
+
+    def test_batch_timeout_returns_503(self, client, slow_app):
+        """Test that a timed out batch prediction returns a 503 error body."""
+        response = client.post(
+            "/lead-scoring/score/batch",
+            json=[{"lead_id": 1, "features": {"age": 1.0}}],
+            headers={"x-request-id": "slow-1"},
+        )
+
+        assert response.status_code == 503
+        assert response.json() == {
+            "error": "http_error",
+            "message": "Inference timed out after 0.05s",
+            "request_id": "slow-1",
+        }
+        assert slow_app.snapshot()["timeouts"] == 1
+
+    def test_stream_timeout_reports_per_line(self, client, slow_app):
+        """Test that streamed chunks report inference failures per line."""
+        response = client.post(
+            "/lead-scoring/score/stream",
+            content=b'{"lead_id": 1, "features": {"age": 1.0}}\n',
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        assert '"error": "inference_unavailable"' in response.text
+
+    def test_executor_stats(self, client):
+        """Test that the admin endpoint reports the configured executor."""
+        response = client.get("/admin/executor")
+
+        assert response.status_code == 200
+        assert response.json()["mode"] == "inline"
+        assert response.json()["timeouts"] == 0
@@ -0,0 +1,261 @@
+"""Tests for the lead feature store and scoring by lead_id."""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config.config import get_settings
+from app.main import app
+from app.ml.cache import get_prediction_cache
+from app.ml.feature_store import FeatureStore, build_store, get_feature_store
+from app.ml.registry import ModelRegistry, get_model_registry
+
+
+def write_snapshot(path, leads):
+    """Write a JSONL feature snapshot of ``{lead_id: features}``."""
+    path.write_text(
+        "\n".join(
+            json.dumps({"lead_id": lead_id, "features": features})
+            for lead_id, features in leads.items()
+        )
+    )
+    return path
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Feature store built from a small snapshot."""
+    snapshot = write_snapshot(
+        tmp_path / "snapshot.jsonl",
+        {1: {"age": 30.0, "income": 1000.0}, 2: {"age": 40.0}, 3: {"income": 5.0}},
+    )
+    return FeatureStore(
+        str(tmp_path / "features.db"), cache_size=2, snapshot_path=str(snapshot)
+    )
+
+
+@pytest.fixture
+def scoring_app(store, artifact_root):
+    """Route scoring through the temporary model and feature store."""
+    registry = ModelRegistry(str(artifact_root), "lead-scoring", "1")
+    app.dependency_overrides[get_model_registry] = lambda: registry
+    app.dependency_overrides[get_feature_store] = lambda: store
+    app.dependency_overrides[get_prediction_cache] = (
+        lambda: get_prediction_cache.__wrapped__()
+    )
+    yield
+    app.dependency_overrides.clear()
+
+
+class TestFeatureStore:
+    """Test lookups, the hot-row cache and refreshes."""
+
+    def test_builds_from_snapshot(self, store):
+        """Test that the store is built from its snapshot on first open."""
+        assert store.get(1) == {"age": 30.0, "income": 1000.0}
+        assert store.get(2) == {"age": 40.0}, "Missing features should be omitted"
+        assert store.get(99) is None
+        assert store.snapshot()["not_found"] == 1
+
+    def test_hot_rows_are_cached(self, store):
+        """Test that repeated lookups are served from the bounded LRU."""
+        store.get(1)
+        store.get(1)
+        store.get(2)
+        store.get(3)
+
+        stats = store.snapshot()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 3
+        assert stats["cache_size"] == 2, "The LRU should stay bounded"
+
+    def test_bulk_lookup(self, store):
+        """Test that bulk lookups mix cached rows and one query per chunk."""
+        store.get(1)
+        found = store.get_many([1, 2, 99, 2])
+
+        assert found == {1: {"age": 30.0, "income": 1000.0}, 2: {"age": 40.0}}
+        assert store.snapshot()["not_found"] == 1
+
+    def test_refresh_swaps_data_and_clears_cache(self, store, tmp_path):
+        """Test that a refreshed snapshot replaces the served features."""
+        store.get(1)
+        write_snapshot(tmp_path / "snapshot.jsonl", {1: {"age": 50.0}})
+
+        assert store.refresh() == 1
+        assert store.get(1) == {"age": 50.0}, "Cached rows should not outlive a refresh"
+        assert store.get(2) is None
+
+    def test_refresh_during_a_cache_hit(self, store):
+        """Test that a refresh clearing the cache mid-lookup cannot break it."""
+        refreshes = []
+
+        class RefreshingCache(OrderedDict):
+            """Cache whose reads start a concurrent refresh."""
+
+            def get(self, key, default=None):
+                value = super().get(key, default)
+                # pylint: disable-next=protected-access
+                thread = threading.Thread(target=store._open)
+                thread.start()
+                thread.join(0.2)
+                refreshes.append(thread)
+                return value
+
+        store.get(1)
+        store._cache = RefreshingCache(store._cache)  # pylint: disable=protected-access
+
+        assert store.get(1) == {"age": 30.0, "income": 1000.0}
+        for thread in refreshes:
+            thread.join()
+
+    def test_rebuilds_when_snapshot_is_newer(self, store, tmp_path):
+        """Test that opening a store rebuilds it from a newer snapshot."""
+        snapshot = write_snapshot(tmp_path / "snapshot.jsonl", {7: {"age": 1.0}})
+        stamp = os.stat(store.path).st_mtime + 10
+        os.utime(snapshot, (stamp, stamp))
+
+        reopened = FeatureStore(str(store.path), snapshot_path=str(snapshot))
+
+        assert reopened.get(7) == {"age": 1.0}
+
+    def test_concurrent_builds(self, tmp_path):
+        """Test that overlapping builds of one store do not collide."""
+        snapshot = write_snapshot(
+            tmp_path / "many.jsonl", {n: {"age": n} for n in range(500)}
+        )
+        counts = []
+
+        def build():
+            counts.append(build_store(snapshot, tmp_path / "shared.db"))
+
+        threads = [threading.Thread(target=build) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert counts == [500] * 4
+        assert [path.name for path in tmp_path.glob("*.building")] == []
+
+    def test_other_workers_reopen_a_rebuilt_store(self, store, tmp_path):
+        """Test that one worker rebuilds and the others pick up the new file."""
+        other = FeatureStore(str(store.path), snapshot_path=str(store.snapshot_path))
+        other.get(1)
+        snapshot = write_snapshot(tmp_path / "snapshot.jsonl", {1: {"age": 50.0}})
+        stamp = os.stat(snapshot).st_mtime - 10
+        os.utime(store.path, (stamp, stamp))
+
+        assert store.reload() is True
+        assert other.reload() is True, "The replaced file should be reopened"
+        assert other.reload() is False
+        assert other.get(1) == {"age": 50.0}
+
+    def test_missing_store_is_empty(self, tmp_path):
+        """Test that a store without file or snapshot finds no leads."""
+        store = FeatureStore(str(tmp_path / "absent.db"))
+
+        assert store.get(1) is None
+        assert store.get_many([1, 2]) == {}
+        assert not store.snapshot()["available"]
+
+    def test_build_store_counts_duplicates_once(self, tmp_path):
+        """Test that later snapshot records replace earlier ones."""
+        snapshot = tmp_path / "dupes.jsonl"
+        snapshot.write_text(
+            '{"lead_id": 1, "features": {"age": 1}}\n'
+            '{"lead_id": 1, "features": {"age": 2}}\n'
+        )
+
+        assert build_store(snapshot, tmp_path / "dupes.db") == 1
+        assert FeatureStore(str(tmp_path / "dupes.db")).get(1) == {"age": 2.0}
+
+
+class TestScoreByLeadId:
+    """Test the scoring endpoints with features from the store."""
+
+    def test_single_score(self, client, scoring_app):
+        """Test that a request with only lead_id is scored from the store."""
+        response = client.post("/lead-scoring/score", json={"lead_id": 1})
+
+        assert response.status_code == 200
+        assert response.json()["score"] == pytest.approx(10.0 + 30.0 + 1.0)
+
+    def test_unknown_lead(self, client, scoring_app):
+        """Test that unknown leads without features are a validation error."""
+        response = client.post("/lead-scoring/score", json={"lead_id": 99})
+
+        assert response.status_code == 422
+        assert response.json()["details"][0]["loc"] == ["body", "features"]
+
+    def test_batch_mixes_sent_and_stored_features(self, client, scoring_app, store):
+        """Test that batch scoring looks up only leads without features."""
+        response = client.post(
+            "/lead-scoring/score/batch",
+            json=[{"lead_id": 2}, {"lead_id": 5, "features": {"age": 1.0}}],
+        )
+
+        assert response.status_code == 200
+        assert [item["score"] for item in response.json()] == pytest.approx(
+            [50.0, 11.0]
+        )
+        assert store.snapshot()["misses"] == 1, "Only lead 2 should be looked up"
+
+    def test_batch_reports_unknown_leads(self, client, scoring_app):
+        """Test that every unknown lead is reported with its position."""
+        response = client.post(
+            "/lead-scoring/score/batch", json=[{"lead_id": 1}, {"lead_id": 99}]
+        )
+
+        assert response.status_code == 422
+        assert response.json()["details"][0]["loc"] == ["body", 1, "features"]
+
+    def test_stream_looks_up_features(self, client, scoring_app):
+        """Test that NDJSON lines without features are completed from the store."""
+        response = client.post(
+            "/lead-scoring/score/stream",
+            content=b'{"lead_id": 2}\n{"lead_id": 99}\n',
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        first, second = [json.loads(line) for line in response.text.splitlines()]
+        assert first == {"lead_id": 2, "score": 50.0}
+        assert second["line"] == 2
+        assert second["error"] == "validation_error"
+
+    def test_admin_refresh(self, client, scoring_app, tmp_path):
+        """Test that the admin endpoint rebuilds the store."""
+        write_snapshot(tmp_path / "snapshot.jsonl", {9: {"age": 1.0}})
+
+        response = client.post("/admin/feature-store/refresh")
+
+        assert response.status_code == 200
+        assert response.json()["leads"] == 1
+        assert (
+            client.post("/lead-scoring/score", json={"lead_id": 9}).status_code == 200
+        )
+
+
+class TestStartup:
+    """Test opening the feature store with the application."""
+
+    def test_store_is_built_before_the_first_request(self, tmp_path, monkeypatch):
+        """Test that the lifespan builds the store, not the first scoring call."""
+        config = get_settings().feature_store
+        snapshot = write_snapshot(tmp_path / "snapshot.jsonl", {1: {"age": 1.0}})
+        monkeypatch.setattr(config, "enabled", True)
+        monkeypatch.setattr(config, "path", str(tmp_path / "features.db"))
+        monkeypatch.setattr(config, "snapshot_path", str(snapshot))
+        monkeypatch.setattr(config, "refresh_interval_seconds", 0)
+        get_feature_store.cache_clear()
+        try:
+            with TestClient(app):
+                built = (tmp_path / "features.db").exists()
+        finally:
+            get_feature_store.cache_clear()
+
+        assert built
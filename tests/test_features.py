@@ -0,0 +1,63 @@
+"""Tests for feature schemas and vectors."""
+
+import pytest
+
+from app.ml.features import FeatureSchema, FeatureSchemaError
+
+
+class TestFeatureSchema:
+    """Test conversion of feature mappings into vectors."""
+
+    def test_vectorize_orders_columns(self):
+        """Test that values land in the schema's column order."""
+        schema = FeatureSchema(["a", "b", "c"])
+
+        vector = schema.vectorize({"c": 3.0, "a": 1.0, "b": 2.0})
+
+        assert vector.values.tolist() == [1.0, 2.0, 3.0]
+
+    def test_missing_features_use_defaults(self):
+        """Test that missing features are filled from the defaults."""
+        schema = FeatureSchema(["a", "b"], defaults={"b": 7.0}, default_value=-1.0)
+
+        assert schema.vectorize({}).values.tolist() == [-1.0, 7.0]
+
+    def test_missing_features_rejected(self):
+        """Test that the reject policy reports every missing feature."""
+        schema = FeatureSchema(["a", "b", "c"], missing="reject")
+
+        with pytest.raises(FeatureSchemaError) as exc_info:
+            schema.vectorize({"b": 1.0})
+
+        locations = [error["loc"] for error in exc_info.value.errors]
+        assert locations == [("features", "a"), ("features", "c")]
+
+    def test_unknown_features_ignored_or_rejected(self):
+        """Test both unknown-feature policies."""
+        features = {"a": 1.0, "z": 2.0}
+
+        ignored = FeatureSchema(["a"]).vectorize(features)
+        assert ignored.values.tolist() == [1.0]
+
+        with pytest.raises(FeatureSchemaError) as exc_info:
+            FeatureSchema(["a"], unknown="reject").vectorize(features)
+        assert exc_info.value.errors[0]["type"] == "extra_forbidden"
+
+    def test_matrix_stacks_vectors(self):
+        """Test that vectors stack into a dense matrix, including empty input."""
+        schema = FeatureSchema(["a", "b"])
+        vectors = [schema.vectorize({"a": 1.0}), schema.vectorize({"b": 2.0})]
+
+        assert schema.matrix(vectors).tolist() == [[1.0, 0.0], [0.0, 2.0]]
+        assert schema.matrix([]).shape == (0, 2)
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"missing": "guess"}, {"unknown": "keep"}, {"names": ["a", "a"]}],
+    )
+    def test_invalid_schema(self, kwargs):
+        """Test that invalid policies and duplicate names are rejected."""
+        arguments = {"names": ["a"], **kwargs}
+
+        with pytest.raises(ValueError):
+            FeatureSchema(**arguments)
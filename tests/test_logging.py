@@ -0,0 +1,317 @@
+"""Tests for the structured and asynchronous logging pipeline."""
+
+import asyncio
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+from app.main import app
+from app.core.logging import (
+    AsyncLogPipeline,
+    AsyncQueueHandler,
+    ErrorAggregator,
+    ErrorLogger,
+    StructuredLogger,
+    configure_logging,
+    get_log_pipeline,
+    shutdown_logging,
+)
+
+
+class BlockingStream(io.StringIO):
+    """Stream whose writes wait until released, to simulate a slow collector."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.release.wait(5)
+        return super().write(text)
+
+
+@pytest.fixture
+def http_request():
+    """Minimal request stand-in exposing an ASGI scope."""
+
+    class FakeRequest:  # pylint: disable=too-few-public-methods
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "scheme": "http",
+            "server": ("testserver", 80),
+            "path": "/lead-scoring/score",
+            "query_string": b"",
+            "headers": [(b"host", b"testserver"), (b"user-agent", b"pytest")],
+            "client": ("127.0.0.1", 5000),
+        }
+
+    return FakeRequest()
+
+
+class RecordingHandler(logging.Handler):
+    """Handler keeping the formatted messages it receives."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(json.loads(record.getMessage()))
+
+
+@pytest.fixture
+def recorded():
+    """Error loggers enabled and recorded for the duration of a test."""
+    handler = RecordingHandler()
+    names = ("validation_errors", "http_errors", "internal_errors")
+    logging.disable(logging.NOTSET)
+    for name in names:
+        logging.getLogger(name).addHandler(handler)
+    try:
+        yield handler.messages
+    finally:
+        for name in names:
+            logging.getLogger(name).removeHandler(handler)
+        logging.disable(logging.CRITICAL)
+
+
+class TestAsyncLogPipeline:
+    """Test batching, overflow and shutdown of the async pipeline."""
+
+    def test_structured_events_are_formatted_on_write(self, http_request):
+        """Test that queued event tuples become the usual JSON log lines."""
+        stream = io.StringIO()
+        pipeline = AsyncLogPipeline(stream=stream, queue_size=10)
+        pipeline.submit(
+            (
+                1700000000.0,
+                "request_logger",
+                logging.INFO,
+                lambda created, request_id: json.dumps({"id": request_id}),
+                ("abc",),
+                None,
+            )
+        )
+        pipeline.stop()
+
+        line = stream.getvalue().strip()
+        assert line.endswith('request_logger - INFO - {"id": "abc"}')
+        assert pipeline.snapshot()["written"] == 1
+
+    def test_drop_policy_counts_dropped_records(self):
+        """Test that a full queue drops records instead of blocking."""
+        stream = BlockingStream()
+        pipeline = AsyncLogPipeline(stream=stream, queue_size=2, batch_size=1)
+        record = logging.LogRecord("test", logging.INFO, __file__, 0, "msg", None, None)
+
+        results = [pipeline.submit(record) for _ in range(10)]
+        stream.release.set()
+        pipeline.stop()
+
+        assert not all(results), "Some records should be dropped"
+        assert pipeline.dropped == results.count(False)
+        assert pipeline.written == results.count(True)
+
+    def test_stop_flushes_backlog(self):
+        """Test that stopping writes every queued record."""
+        stream = io.StringIO()
+        pipeline = AsyncLogPipeline(stream=stream, queue_size=1000, overflow="block")
+        for index in range(500):
+            record = logging.LogRecord(
+                "test", logging.INFO, __file__, 0, "msg %d", (index,), None
+            )
+            pipeline.submit(record)
+        pipeline.stop()
+
+        assert len(stream.getvalue().splitlines()) == 500
+        assert not pipeline.submit(record), "Closed pipeline should drop records"
+
+    def test_invalid_overflow_policy(self):
+        """Test that unknown overflow policies are rejected."""
+        with pytest.raises(ValueError):
+            AsyncLogPipeline(overflow="spill")
+
+
+class TestConfigureLogging:
+    """Test selecting the logging mode."""
+
+    def test_async_mode_routes_structured_logs(self, http_request):
+        """Test that async mode installs the pipeline and restores sync on shutdown."""
+        logging.disable(logging.NOTSET)
+        try:
+            configure_logging(mode="async")
+            pipeline = get_log_pipeline()
+            assert pipeline is not None, "Async mode should start a pipeline"
+            assert any(
+                isinstance(handler, AsyncQueueHandler)
+                for handler in logging.getLogger().handlers
+            )
+
+            StructuredLogger("request_logger").log_request(http_request, "req-1", 1.0)
+            shutdown_logging()
+
+            assert get_log_pipeline() is None
+            assert pipeline.written >= 1, "Request event should be written"
+            assert not any(
+                isinstance(handler, AsyncQueueHandler)
+                for handler in logging.getLogger().handlers
+            ), "Shutdown should fall back to synchronous logging"
+        finally:
+            configure_logging()
+            logging.disable(logging.CRITICAL)
+
+    def test_invalid_mode(self):
+        """Test that unknown modes are rejected."""
+        with pytest.raises(ValueError):
+            configure_logging(mode="carrier-pigeon")
+        configure_logging()
+
+
+class TestErrorAggregation:
+    """Test fingerprinting, sampling and summaries of error events."""
+
+    def test_repeats_are_counted_and_summarized(self, http_request, recorded):
+        """Test that only the first occurrences are logged, then summarized."""
+        aggregator = ErrorAggregator(first=2, sample_rates={}, summary_interval=60)
+        errors = ErrorLogger(aggregator)
+        for _ in range(5):
+            errors.log_http_error(http_request, "req", 404, "Not found")
+        errors.log_http_error(http_request, "req", 409, "Conflict")
+
+        assert [m["status_code"] for m in recorded] == [404, 404, 409]
+        aggregator.flush()
+
+        summary = recorded[-1]
+        assert summary["event"] == "error_summary"
+        assert summary["error_event"] == "http_error"
+        assert summary["occurrences"] == 6
+        assert summary["suppressed"] == 3
+        assert summary["fingerprints"][0]["count"] == 5
+        assert summary["fingerprints"][0]["logged"] == 2
+        assert aggregator.snapshot()["loggers"] == {}, "Flush should start a new window"
+
+    def test_no_summary_without_suppressed_events(self, http_request, recorded):
+        """Test that a window in which everything was logged emits nothing."""
+        aggregator = ErrorAggregator(first=5)
+        ErrorLogger(aggregator).log_http_error(http_request, "req", 404, "Not found")
+        aggregator.flush()
+
+        assert len(recorded) == 1
+
+    def test_expired_window_is_flushed_on_next_event(self, http_request, recorded):
+        """Test that the summary is emitted once the interval has passed."""
+        aggregator = ErrorAggregator(first=1, summary_interval=0.0)
+        errors = ErrorLogger(aggregator)
+        errors.log_internal_error(http_request, "req", ValueError("a"))
+        errors.log_internal_error(http_request, "req", ValueError("b"))
+
+        events = [message.get("event") for message in recorded]
+        assert events.count("internal_error") == 2, "Each window logs its first event"
+
+    def test_summaries_use_the_configured_logger_levels(self, http_request, recorded):
+        """Test that 500 summaries pass the ERROR-only internal_errors logger."""
+        configure_logging()
+        levels = []
+        handler = logging.Handler()
+        handler.emit = lambda record: levels.append((record.name, record.levelno))
+        logging.getLogger("internal_errors").addHandler(handler)
+        try:
+            aggregator = ErrorAggregator(first=1)
+            errors = ErrorLogger(aggregator)
+            for _ in range(3):
+                errors.log_internal_error(http_request, "req", ValueError("boom"))
+                errors.log_http_error(http_request, "req", 404, "Not found")
+            errors.log_http_error(http_request, "req", 503, "Unavailable")
+            aggregator.flush()
+        finally:
+            logging.getLogger("internal_errors").removeHandler(handler)
+
+        summaries = [m for m in recorded if m["event"] == "error_summary"]
+        assert {m["error_event"] for m in summaries} == {"internal_error", "http_error"}
+        assert levels == [("internal_errors", logging.ERROR)] * 2
+
+    def test_window_is_summarized_without_further_events(self, http_request, recorded):
+        """Test that a short burst is summarized when its window ends."""
+        aggregator = ErrorAggregator(first=1, summary_interval=0.05)
+        errors = ErrorLogger(aggregator)
+
+        async def burst():
+            for _ in range(3):
+                errors.log_http_error(http_request, "req", 404, "Not found")
+            await asyncio.sleep(0.2)
+
+        asyncio.run(burst())
+
+        summary = recorded[-1]
+        assert summary["event"] == "error_summary"
+        assert summary["suppressed"] == 2
+
+    def test_sample_rates_per_logger(self, http_request, recorded):
+        """Test that repeats are sampled at the rate of their logger."""
+        aggregator = ErrorAggregator(
+            first=0, sample_rates={"internal_errors": 1.0, "http_errors": 0.0}
+        )
+        errors = ErrorLogger(aggregator)
+        for _ in range(3):
+            errors.log_internal_error(http_request, "req", ValueError("boom"))
+            errors.log_http_error(http_request, "req", 400, "Bad request")
+
+        assert [m["event"] for m in recorded] == ["internal_error"] * 3
+
+    def test_batch_positions_share_a_fingerprint(self, http_request, recorded):
+        """Test that the same bad field in different batch items is one error."""
+        aggregator = ErrorAggregator(first=1, sample_rates={})
+        errors = ErrorLogger(aggregator)
+        for index in range(4):
+            errors.log_validation_error(
+                http_request,
+                "req",
+                [{"type": "missing", "loc": ("body", index, "lead_id")}],
+            )
+
+        (entry,) = aggregator.snapshot()["loggers"]["validation_errors"]
+        assert entry["errors"] == (("missing", "body.*.lead_id"),)
+        assert entry["count"] == 4
+        assert len(recorded) == 1
+
+    def test_fingerprints_are_bounded(self, http_request):
+        """Test that fingerprints beyond the limit share an overflow entry."""
+        aggregator = ErrorAggregator(max_fingerprints=2)
+        errors = ErrorLogger(aggregator)
+        logging.disable(logging.NOTSET)
+        try:
+            for status_code in (400, 401, 402, 403):
+                errors.log_http_error(http_request, "req", status_code, "No")
+        finally:
+            logging.disable(logging.CRITICAL)
+
+        entries = aggregator.snapshot()["loggers"]["http_errors"]
+        assert len(entries) == 3
+        assert {"route": "*", "errors": "other", "count": 2, "logged": 2} in entries
+
+    def test_validation_responses_are_unchanged(self, client, recorded):
+        """Test that suppressed logs do not alter the error response."""
+        configure_logging(error_first_occurrences=1, error_sample_rates={})
+        try:
+            responses = [
+                client.post("/lead-scoring/score", json={"features": {}})
+                for _ in range(3)
+            ]
+            stats = client.get("/admin/logging").json()
+        finally:
+            configure_logging()
+
+        bodies = [response.json() for response in responses]
+        for body in bodies:
+            body.pop("request_id")
+        assert bodies[0] == bodies[1] == bodies[2]
+        body = bodies[-1]
+        assert body["error"] == "validation_error"
+        assert body["details"][0]["loc"] == ["body", "lead_id"]
+        assert len([m for m in recorded if m["event"] == "validation_error"]) == 1
+        (entry,) = stats["errors"]["loggers"]["validation_errors"]
+        assert entry["count"] == 3
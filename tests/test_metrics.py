@@ -0,0 +1,84 @@
+"""Tests for in-process metrics and Prometheus rendering."""
+
+import json
+
+from app.core.metrics import (
+    LATENCY_BUCKETS,
+    Histogram,
+    Metrics,
+    MultiprocessExporter,
+    merge_snapshots,
+    render_prometheus,
+)
+
+
+class TestHistogram:
+    """Test fixed-bucket histograms."""
+
+    def test_observations_land_in_upper_bound_bucket(self):
+        """Test that values are counted in the first bucket whose bound is >= value."""
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+
+        assert histogram.counts == [2, 1, 1], "Counts should be per bucket"
+        assert histogram.count == 4
+        assert histogram.sum == 5.65
+
+
+class TestMetrics:
+    """Test recording, merging and rendering."""
+
+    def test_render_cumulative_buckets(self):
+        """Test that rendered buckets are cumulative with +Inf equal to count."""
+        metrics = Metrics()
+        metrics.observe_request("/lead-scoring/score", "POST", 200, 0.003)
+        metrics.observe_request("/lead-scoring/score", "POST", 200, 20.0)
+        metrics.count_validation_error("/lead-scoring/score")
+
+        text = render_prometheus(metrics)
+
+        labels = 'route="/lead-scoring/score",method="POST",status="200"'
+        assert f"http_requests_total{{{labels}}} 2" in text
+        assert f'http_request_duration_seconds_bucket{{{labels},le="0.005"}} 1' in text
+        assert f'http_request_duration_seconds_bucket{{{labels},le="10.0"}} 1' in text
+        assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+        assert 'validation_errors_total{route="/lead-scoring/score"} 1' in text
+
+    def test_merge_worker_snapshots(self):
+        """Test that snapshots from several workers add up."""
+        first, second = Metrics(), Metrics()
+        first.observe_request("/health/", "GET", 200, 0.001)
+        second.observe_request("/health/", "GET", 200, 0.001)
+        second.observe_inference(0.002, 10)
+        second.in_flight = 3
+
+        merged = merge_snapshots(
+            json.loads(json.dumps(metrics.snapshot())) for metrics in (first, second)
+        )
+
+        assert merged.requests["/health/"]["GET"][200].count == 2
+        assert merged.inference_rows == 10
+        assert merged.in_flight == 3
+
+    def test_multiprocess_exporter_drops_dead_worker_gauges(self, tmp_path):
+        """Test that exited workers keep counters but not in-flight gauges."""
+        dead = Metrics()
+        dead.observe_request("/health/", "GET", 200, 0.001)
+        dead.in_flight = 5
+        snapshot = {**dead.snapshot(), "pid": 2**22 + 1}
+        (tmp_path / "metrics-dead.json").write_text(json.dumps(snapshot))
+
+        live = Metrics()
+        live.observe_request("/health/", "GET", 200, 0.001)
+        exporter = MultiprocessExporter(live, str(tmp_path), interval=60)
+        merged = exporter.collect()
+        exporter.stop()
+
+        assert merged.requests["/health/"]["GET"][200].count == 2
+        assert merged.in_flight == 0
+        assert exporter.path.exists(), "Own snapshot should be written on stop"
+        assert (
+            len(merged.requests["/health/"]["GET"][200].counts)
+            == len(LATENCY_BUCKETS) + 1
+        )
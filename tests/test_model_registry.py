@@ -0,0 +1,134 @@
+"""Tests for the in-process model registry."""
+
+import json
+
+import pytest
+
+from app.ml.features import FeatureSchemaError
+from app.ml.registry import ModelLoadError, ModelRegistry
+from .conftest import write_model
+
+
+def score(model, features):
+    """Vectorize and score one feature mapping."""
+    return model.score(model.vectorize(features))
+
+
+@pytest.fixture
+def registry(artifact_root):
+    """Registry pointing at the temporary artifact tree."""
+    return ModelRegistry(
+        artifact_root=str(artifact_root), name="lead-scoring", version="1"
+    )
+
+
+class TestModelRegistry:
+    """Test model loading and hot-swapping."""
+
+    def test_loads_configured_version_once(self, registry):
+        """Test that the active model is loaded lazily and then reused."""
+        first = registry.active
+        second = registry.active
+
+        assert first is second, "Active model should be loaded only once"
+        assert first.version == "1", "Configured version should be active"
+        assert first.feature_names == ("age", "income"), "Feature order should match"
+
+    def test_score_uses_model_parameters(self, registry):
+        """Test that scoring applies the linear model."""
+        value = score(registry.active, {"age": 30.0, "income": 50000.0})
+
+        assert value == pytest.approx(90.0), "Score should be intercept + w.x"
+
+    def test_missing_features_default_to_zero(self, registry):
+        """Test that absent features contribute nothing to the score."""
+        assert score(registry.active, {}) == pytest.approx(10.0)
+
+    def test_feature_matrix_uses_model_column_order(self, registry):
+        """Test that feature dicts are packed in the model's column order."""
+        model = registry.active
+        vectors = [
+            model.vectorize(row)
+            for row in ({"income": 2.0, "age": 1.0}, {"age": 3.0, "unknown": 9.0})
+        ]
+        matrix = model.schema.matrix(vectors)
+
+        assert matrix.tolist() == [[1.0, 2.0], [3.0, 0.0]]
+
+    def test_score_batch_matches_single_scores(self, registry):
+        """Test that vectorized scoring matches row-by-row scoring."""
+        rows = [{"age": float(age), "income": 1000.0 * age} for age in range(5)]
+        model = registry.active
+
+        vectors = [model.vectorize(row) for row in rows]
+
+        assert model.score_batch(vectors).tolist() == pytest.approx(
+            [score(model, row) for row in rows]
+        )
+
+    def test_activate_swaps_model_atomically(self, registry):
+        """Test that activation replaces the active model without touching old refs."""
+        previous = registry.active
+        activated = registry.activate("2")
+
+        assert registry.active is activated, "New version should be active"
+        assert activated.version == "2", "Activated version should match"
+        assert score(previous, {"age": 1.0}) == pytest.approx(
+            11.0
+        ), "In-flight holders of the old model should keep using it"
+        assert score(activated, {"age": 1.0}) == pytest.approx(2.0)
+
+    def test_failed_activation_keeps_current_model(self, registry):
+        """Test that a failed load leaves the active model in place."""
+        current = registry.active
+
+        with pytest.raises(ModelLoadError):
+            registry.activate("404")
+
+        assert registry.active is current, "Active model should be unchanged"
+
+    @pytest.mark.parametrize(
+        "flavor,params",
+        [
+            ("unknown", {}),
+            ("linear", {"link": "softmax"}),
+        ],
+    )
+    def test_invalid_descriptor_raises(self, artifact_root, registry, flavor, params):
+        """Test that broken descriptors surface as ModelLoadError."""
+        write_model(artifact_root, "bad", ["age"], params, flavor=flavor)
+
+        with pytest.raises(ModelLoadError):
+            registry.load("bad")
+
+    def test_logistic_link_bounds_score(self, artifact_root, registry):
+        """Test that the logistic link maps scores into 0-100."""
+        write_model(
+            artifact_root,
+            "3",
+            ["age"],
+            {"intercept": 0.0, "coefficients": {"age": 1.0}, "link": "logistic"},
+        )
+        model = registry.load("3")
+
+        assert score(model, {"age": 0.0}) == pytest.approx(50.0)
+        assert 0.0 <= score(model, {"age": 1000.0}) <= 100.0
+
+    def test_descriptor_feature_policy(self, artifact_root, registry):
+        """Test that defaults and policies declared by the model are applied."""
+        write_model(
+            artifact_root,
+            "4",
+            ["age", "income"],
+            {"coefficients": {"age": 1.0, "income": 1.0}},
+        )
+        descriptor_path = artifact_root / "lead-scoring" / "4" / "MLmodel"
+        descriptor = json.loads(descriptor_path.read_text())
+        descriptor["feature_defaults"] = {"income": 5.0}
+        descriptor["feature_policy"] = {"unknown": "reject"}
+        descriptor_path.write_text(json.dumps(descriptor))
+        model = registry.load("4")
+
+        assert score(model, {"age": 1.0}) == pytest.approx(6.0)
+        with pytest.raises(FeatureSchemaError):
+            model.vectorize({"age": 1.0, "height": 2.0})
@@ -0,0 +1,168 @@
+"""Tests for model-bundled preprocessing."""
+
+import json
+
+import numpy as np
+import pytest
+
+from app.main import app
+from app.ml.cache import PredictionCache, get_prediction_cache
+from app.ml.preprocessing import (
+    PREPROCESSING_FILE,
+    PreprocessedPredictor,
+    compile_preprocessing,
+)
+from app.ml.registry import (
+    ModelLoadError,
+    ModelRegistry,
+    artifact_digest,
+    get_model_registry,
+)
+from benchmarks.preprocessing import random_rows, reference_transform, synthetic_spec
+
+FEATURES = ["age", "income"]
+
+# Scores 10 + age + 0.001 * income on the preprocessed values
+SPEC = {
+    "steps": [
+        {"op": "impute", "features": {"income": 999.0}},
+        {"op": "clip", "features": {"age": [18, 90]}},
+        {"op": "log1p", "features": ["income"]},
+        {"op": "scale", "features": {"age": {"center": 20.0, "scale": 2.0}}},
+    ]
+}
+
+
+def write_spec(artifact_root, version, spec):
+    """Write a preprocessing spec into a model version's directory."""
+    path = artifact_root / "lead-scoring" / version / PREPROCESSING_FILE
+    path.write_text(json.dumps(spec))
+
+
+class TestPreprocessor:
+    """Test compiled preprocessing steps."""
+
+    def test_steps_apply_in_order(self):
+        """Test hand-computed values of every step."""
+        spec = {
+            "steps": [
+                *SPEC["steps"],
+                {"op": "bucketize", "features": {"income": [1.0, 5.0, 7.0]}},
+            ]
+        }
+        X = np.array([[10.0, np.nan], [95.0, 0.0]])
+
+        result = compile_preprocessing(spec, FEATURES).transform(X)
+
+        assert result.tolist() == [[-1.0, 2.0], [35.0, 0.0]]
+        assert np.isnan(X[0, 1]), "The input matrix is left untouched"
+
+    @pytest.mark.parametrize("count", [1, 7, 60])
+    def test_matches_reference(self, count):
+        """Test parity with the per-feature reference on random specs."""
+        features = [f"f{index}" for index in range(count)]
+        spec = synthetic_spec(features, seed=count)
+        X = random_rows(features, 50, seed=count)
+
+        np.testing.assert_allclose(
+            compile_preprocessing(spec, features).transform(X),
+            reference_transform(spec, features, X),
+            rtol=1e-12,
+        )
+
+    @pytest.mark.parametrize(
+        "step",
+        [
+            {"op": "standardize", "features": {"age": {}}},
+            {"op": "log1p", "features": ["height"]},
+            {"op": "scale", "features": {"age": {"scale": 0}}},
+            {"op": "bucketize", "features": {"age": [3, 1]}},
+            {"op": "scale", "features": {"age": 12.0}},
+            {"op": "clip", "features": {"age": [18]}},
+            {"op": "log1p", "features": "age"},
+            "log1p",
+        ],
+        ids=[
+            "unknown-op",
+            "unknown-feature",
+            "zero-scale",
+            "unsorted-buckets",
+            "scale-not-object",
+            "clip-one-bound",
+            "features-not-array",
+            "step-not-object",
+        ],
+    )
+    def test_invalid_specs_fail_the_load(self, artifact_root, step):
+        """Test that a bad spec is reported as a model load error."""
+        write_spec(artifact_root, "1", {"steps": [step]})
+
+        with pytest.raises(ModelLoadError):
+            ModelRegistry(str(artifact_root), "lead-scoring", "1").load("1")
+
+
+class TestBundledPreprocessing:
+    """Test preprocessing loaded with a model version."""
+
+    def test_registry_wraps_the_predictor(self, artifact_root):
+        """Test that scores are computed on preprocessed features."""
+        write_spec(artifact_root, "1", SPEC)
+        model = ModelRegistry(str(artifact_root), "lead-scoring", "1").active
+
+        score = model.score(model.vectorize({"age": 16.0}))
+
+        assert isinstance(model.predictor, PreprocessedPredictor)
+        assert score == pytest.approx(10 + (-1.0) + 0.001 * np.log1p(999.0))
+
+    def test_versions_without_a_spec_are_unchanged(self, artifact_root):
+        """Test that the flavor's predictor is used as is without a spec."""
+        model = ModelRegistry(str(artifact_root), "lead-scoring", "1").active
+
+        assert not isinstance(model.predictor, PreprocessedPredictor)
+
+    def test_online_and_batch_routes_agree(self, client, artifact_root):
+        """Test that single and batch scoring share the preprocessing."""
+        write_spec(artifact_root, "1", SPEC)
+        registry = ModelRegistry(str(artifact_root), "lead-scoring", "1")
+        app.dependency_overrides[get_model_registry] = lambda: registry
+        app.dependency_overrides[get_prediction_cache] = lambda: PredictionCache(0, 0.0)
+        features = {"age": 100, "income": 50}
+        try:
+            single = client.post(
+                "/lead-scoring/score", json={"lead_id": 1, "features": features}
+            )
+            batch = client.post(
+                "/lead-scoring/score/batch",
+                json=[{"lead_id": 1, "features": features}],
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        expected = 10 + 35.0 + 0.001 * np.log1p(50)
+        assert single.json()["score"] == pytest.approx(expected)
+        assert batch.json()[0]["score"] == single.json()["score"]
+
+    def test_omitted_features_are_imputed(self, client, artifact_root):
+        """Test that a feature left out of a request gets the imputed value."""
+        write_spec(artifact_root, "1", {"steps": [SPEC["steps"][0]]})
+        registry = ModelRegistry(str(artifact_root), "lead-scoring", "1")
+        app.dependency_overrides[get_model_registry] = lambda: registry
+        app.dependency_overrides[get_prediction_cache] = lambda: PredictionCache(0, 0.0)
+        try:
+            response = client.post(
+                "/lead-scoring/score", json={"lead_id": 1, "features": {"age": 30}}
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.json()["score"] == pytest.approx(10 + 30 + 0.001 * 999.0)
+
+    def test_spec_changes_the_shared_digest(self, artifact_root):
+        """Test that shared exports are rebuilt when the spec changes."""
+        path = artifact_root / "lead-scoring" / "1"
+        before = artifact_digest(path)
+
+        write_spec(artifact_root, "1", SPEC)
+
+        assert artifact_digest(path) != before
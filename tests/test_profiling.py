@@ -0,0 +1,105 @@
+"""Tests for on-demand request profiling."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.logging import LoggingMiddleware
+from app.core.profiling import RequestProfiler, get_profiler
+from app.main import app
+
+
+def build_client(profiler):
+    """Client for a small app whose middleware uses ``profiler``."""
+    profiled = FastAPI()
+
+    @profiled.get("/work")
+    async def work():
+        return {"total": sum(str(number).count("1") for number in range(20_000))}
+
+    profiled.add_middleware(LoggingMiddleware, profiler=profiler)
+    return TestClient(profiled)
+
+
+class TestRequestProfiler:
+    """Test request selection and the profile ring buffer."""
+
+    def test_unselected_requests_are_not_profiled(self):
+        """Test that requests without the header are passed through."""
+        profiler = RequestProfiler()
+        response = build_client(profiler).get("/work")
+
+        assert response.status_code == 200
+        assert profiler.profiled == 0
+        assert not profiler.profiles
+
+    def test_cpu_profile_from_header(self):
+        """Test that the header profiles the request's hot functions."""
+        profiler = RequestProfiler(top_n=5)
+        response = build_client(profiler).get("/work", headers={"x-profile": "cpu"})
+
+        assert response.status_code == 200
+        (profile,) = profiler.profiles
+        assert profile["kind"] == "cpu"
+        assert profile["status"] == 200
+        assert profile["route"] == "/work"
+        assert len(profile["functions"]) == 5, "Only the top-N should be kept"
+        assert "allocations" not in profile
+        self_times = [function["self_ms"] for function in profile["functions"]]
+        assert self_times == sorted(self_times, reverse=True)
+
+    def test_memory_profile_from_header(self):
+        """Test that memory profiles report allocation sites and the peak."""
+        profiler = RequestProfiler()
+        build_client(profiler).get("/work", headers={"x-profile": "memory"})
+
+        (profile,) = profiler.profiles
+        assert "functions" not in profile
+        assert profile["peak_memory_kb"] > 0
+        assert profile["allocations"], "Allocation sites should be recorded"
+
+    @pytest.mark.parametrize("rate, expected", [(1.0, 3), (0.0, 0)])
+    def test_sampling_rate(self, rate, expected):
+        """Test that sampled requests are profiled without the header."""
+        profiler = RequestProfiler(sample_rate=rate, sample_kind="both")
+        client = build_client(profiler)
+        for _ in range(3):
+            client.get("/work")
+
+        assert profiler.profiled == expected
+
+    def test_ring_buffer_is_bounded(self):
+        """Test that only the most recent profiles are kept."""
+        profiler = RequestProfiler(sample_rate=1.0, buffer_size=2)
+        client = build_client(profiler)
+        for _ in range(4):
+            client.get("/work")
+
+        assert profiler.profiled == 4
+        assert len(profiler.profiles) == 2
+
+
+class TestProfilesEndpoint:
+    """Test the admin endpoint exposing stored profiles."""
+
+    def test_disabled_by_default(self, client):
+        """Test that profiling is off unless enabled in config."""
+        response = client.get("/admin/profiles")
+
+        assert response.status_code == 200
+        assert response.json() == {"enabled": False, "profiles": []}
+
+    def test_lists_and_clears_profiles(self, client):
+        """Test that stored profiles are listed and can be cleared."""
+        profiler = RequestProfiler(sample_rate=1.0)
+        build_client(profiler).get("/work")
+        app.dependency_overrides[get_profiler] = lambda: profiler
+        try:
+            listed = client.get("/admin/profiles").json()
+            cleared = client.delete("/admin/profiles").json()
+        finally:
+            app.dependency_overrides.clear()
+
+        assert listed["profiled"] == 1
+        assert listed["profiles"][0]["path"] == "/work"
+        assert cleared["profiles"] == []
@@ -0,0 +1,169 @@
+"""Tests for per-client rate limiting."""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.exceptions import register_exception_handlers
+from app.core.metrics import Metrics, render_prometheus
+from app.core.rate_limit import RateLimiter, RateLimitMiddleware, TokenBuckets
+
+
+def build_app(limiter):
+    """App with a limited route and an unlimited health check."""
+    limited = FastAPI()
+    register_exception_handlers(limited)
+
+    @limited.get("/score")
+    async def score():
+        return {"ok": True}
+
+    @limited.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    limited.add_middleware(RateLimitMiddleware, limiter=limiter)
+    return limited
+
+
+def send_requests(limiter, requests):
+    """Send ``(path, headers, client ip)`` requests one after the other."""
+
+    async def run():
+        responses = []
+        for path, headers, ip in requests:
+            transport = httpx.ASGITransport(app=build_app(limiter), client=(ip, 1234))
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                responses.append(await client.get(path, headers=headers))
+        return responses
+
+    return asyncio.run(run())
+
+
+class TestTokenBuckets:
+    """Test refilling and evicting the buckets of a route group."""
+
+    def test_burst_then_sustained_rate(self):
+        """Test that a client gets its burst, then one request per refill."""
+        buckets = TokenBuckets("g", rate=2.0, burst=3, max_clients=10)
+
+        assert [buckets.take("a", 0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert buckets.take("a", 0.0) == 0.5
+        assert buckets.take("a", 0.25) == 0.25, "Partial refills accumulate"
+        assert buckets.take("a", 0.5) == 0.0
+        assert buckets.take("b", 0.5) == 0.0, "Clients have separate buckets"
+        assert (buckets.allowed, buckets.limited) == (5, 2)
+
+    def test_idle_buckets_are_evicted_lazily(self):
+        """Test that full buckets are dropped when new clients arrive."""
+        buckets = TokenBuckets("g", rate=1.0, burst=2, max_clients=10)
+        buckets.take("a", 0.0)
+        buckets.take("b", 1.0)
+
+        buckets.take("c", 2.5)
+
+        assert list(buckets.buckets) == ["b", "c"]
+        assert buckets.evicted == 1
+
+    def test_clients_are_bounded(self):
+        """Test that the least recently used bucket makes room for a new one."""
+        buckets = TokenBuckets("g", rate=1.0, burst=5, max_clients=2)
+        buckets.take("a", 0.0)
+        buckets.take("b", 0.0)
+        buckets.take("a", 0.1)
+
+        buckets.take("c", 0.2)
+
+        assert list(buckets.buckets) == ["a", "c"]
+
+
+class TestRateLimitMiddleware:
+    """Test rejections through the ASGI middleware."""
+
+    def test_rejects_with_rate_limit_headers(self):
+        """Test that requests over the burst get a 429 in the error format."""
+        limiter = RateLimiter({"/score": {"rate": 0.5, "burst": 2}})
+
+        responses = send_requests(
+            limiter, [("/score", {"x-request-id": "r1"}, "10.0.0.1")] * 3
+        )
+
+        assert [r.status_code for r in responses] == [200, 200, 429]
+        rejected = responses[-1]
+        assert rejected.json() == {
+            "error": "http_error",
+            "message": "Rate limit exceeded, retry later",
+            "request_id": "r1",
+        }
+        assert rejected.headers["retry-after"] == "2"
+        assert rejected.headers["x-ratelimit-limit"] == "2"
+        assert rejected.headers["x-ratelimit-remaining"] == "0"
+        assert limiter.snapshot()["groups"]["/score"]["limited"] == 1
+
+    def test_clients_by_ip(self):
+        """Test that every IP address has its own bucket."""
+        limiter = RateLimiter({"/score": {"rate": 0.1, "burst": 1}})
+
+        responses = send_requests(
+            limiter,
+            [("/score", {}, "10.0.0.1"), ("/score", {}, "10.0.0.2")],
+        )
+
+        assert [r.status_code for r in responses] == [200, 200]
+
+    def test_clients_by_api_key(self):
+        """Test that API keys are limited separately, falling back to the IP."""
+        limiter = RateLimiter(
+            {"/score": {"rate": 0.1, "burst": 1}},
+            key="api_key",
+            api_keys=["one", "two"],
+        )
+        requests = [
+            ("/score", {"x-api-key": "one"}, "10.0.0.1"),
+            ("/score", {"x-api-key": "two"}, "10.0.0.1"),
+            ("/score", {"x-api-key": "one"}, "10.0.0.2"),
+            ("/score", {}, "10.0.0.1"),
+        ]
+
+        responses = send_requests(limiter, requests)
+
+        assert [r.status_code for r in responses] == [200, 200, 429, 200]
+
+    def test_unknown_api_keys_share_the_ip_limit(self):
+        """Test that rotating unknown keys does not reset a client's bucket."""
+        limiter = RateLimiter(
+            {"/score": {"rate": 0.1, "burst": 1}}, key="api_key", api_keys=["one"]
+        )
+        requests = [
+            ("/score", {"x-api-key": "made-up-1"}, "10.0.0.1"),
+            ("/score", {"x-api-key": "made-up-2"}, "10.0.0.1"),
+            ("/score", {}, "10.0.0.1"),
+            ("/score", {"x-api-key": "made-up-3"}, "10.0.0.2"),
+        ]
+
+        responses = send_requests(limiter, requests)
+
+        assert [r.status_code for r in responses] == [200, 429, 429, 200]
+        with pytest.raises(ValueError, match="known API keys"):
+            RateLimiter({}, key="api_key")
+
+    def test_other_paths_are_not_limited(self):
+        """Test that paths outside the configured prefixes pass through."""
+        limiter = RateLimiter({"/score": {"rate": 0.1, "burst": 1}})
+
+        responses = send_requests(limiter, [("/health", {}, "10.0.0.1")] * 3)
+
+        assert [r.status_code for r in responses] == [200, 200, 200]
+
+    def test_rate_limited_counters_exposed(self):
+        """Test that rejections are rendered as Prometheus metrics."""
+        metrics = Metrics()
+        metrics.count_rate_limited("/lead-scoring")
+
+        text = render_prometheus(metrics)
+
+        assert 'requests_rate_limited_total{group="/lead-scoring"} 1' in text
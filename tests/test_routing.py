@@ -0,0 +1,210 @@
+"""Tests for A/B and shadow model routing."""
+
+import json
+import random
+import threading
+
+import numpy as np
+import pytest
+
+from app.main import app
+from app.ml.cache import get_prediction_cache
+from app.ml.registry import ModelRegistry, get_model_registry
+from app.ml.routing import ModelRouter, ShadowScorer, get_model_router, lead_bucket
+
+
+class BlockingPredictor:
+    """Predictor that waits for ``release`` before scoring."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def predict(self, matrix):
+        self.started.set()
+        self.release.wait(5)
+        return np.zeros(len(matrix))
+
+
+class FailingPredictor:
+    """Predictor that always raises."""
+
+    def predict(self, matrix):
+        raise RuntimeError("candidate is broken")
+
+
+@pytest.fixture
+def registry(artifact_root):
+    """Registry serving version 1 of the temporary artifact tree."""
+    return ModelRegistry(str(artifact_root), "lead-scoring", "1")
+
+
+@pytest.fixture
+def routed_app(registry):
+    """Install a router for the API and remove it afterwards."""
+
+    def install(model_router):
+        app.dependency_overrides[get_model_registry] = lambda: registry
+        app.dependency_overrides[get_model_router] = lambda: model_router
+        app.dependency_overrides[get_prediction_cache] = (
+            lambda: get_prediction_cache.__wrapped__()
+        )
+
+    yield install
+    app.dependency_overrides.clear()
+
+
+class TestModelRouter:
+    """Test traffic splits between model versions."""
+
+    def test_hash_split_is_stable(self, registry):
+        """Test that a lead is always assigned to the same version."""
+        model_router = ModelRouter(registry, {"2": 0.5}, split="hash")
+
+        for lead_id in range(50):
+            versions = {model_router.choose(lead_id).version for _ in range(3)}
+            assert len(versions) == 1, f"Lead {lead_id} switched versions"
+
+    def test_split_follows_shares(self, registry):
+        """Test that variants receive roughly their share of traffic."""
+        model_router = ModelRouter(registry, {"2": 0.2}, split="hash")
+        for lead_id in range(5000):
+            model_router.choose(lead_id)
+
+        share = model_router.assignments["2"] / 5000
+        assert share == pytest.approx(0.2, abs=0.03)
+        assert model_router.assignments["1"] == 5000 - model_router.assignments["2"]
+
+    def test_percent_split_ignores_lead(self, registry):
+        """Test that the percent split assigns per request."""
+        random.seed(7)
+        model_router = ModelRouter(registry, {"2": 0.5}, split="percent")
+
+        versions = {model_router.choose(1).version for _ in range(50)}
+
+        assert versions == {"1", "2"}
+
+    def test_salt_reshuffles_leads(self):
+        """Test that a new salt moves leads to other buckets."""
+        assert lead_bucket(1) == lead_bucket(1)
+        assert lead_bucket(1) != lead_bucket(1, salt="experiment-2")
+        assert all(0 <= lead_bucket(lead_id) < 1 for lead_id in range(100))
+
+    @pytest.mark.parametrize(
+        "variants, split",
+        [({"2": 0.7, "1": 0.4}, "hash"), ({"2": -0.1}, "hash"), ({}, "sticky")],
+    )
+    def test_rejects_invalid_configuration(self, registry, variants, split):
+        """Test that impossible splits are refused at startup."""
+        with pytest.raises(ValueError):
+            ModelRouter(registry, variants, split=split)
+
+
+class TestShadowScorer:
+    """Test background scoring of the shadow candidate."""
+
+    def test_records_score_pairs(self, registry, tmp_path):
+        """Test that primary and shadow scores are appended as JSONL pairs."""
+        record = tmp_path / "shadow.jsonl"
+        scorer = ShadowScorer(registry.load("2"), record_path=str(record))
+
+        scorer.submit(7, {"age": 30.0}, registry.active, 40.0)
+        scorer.stop()
+
+        (pair,) = [json.loads(line) for line in record.read_text().splitlines()]
+        assert pair["lead_id"] == 7
+        assert pair["primary_version"] == "1"
+        assert pair["primary_score"] == 40.0
+        assert pair["shadow_version"] == "2"
+        assert pair["shadow_score"] == pytest.approx(60.0)
+        assert scorer.snapshot()["mean_abs_diff"] == pytest.approx(20.0)
+
+    def test_drops_when_queue_is_full(self, registry):
+        """Test that copies over the queue bound are dropped, not awaited."""
+        predictor = BlockingPredictor()
+        candidate = registry.load("2")
+        object.__setattr__(candidate, "predictor", predictor)
+        scorer = ShadowScorer(candidate, queue_size=1, batch_size=1)
+
+        assert scorer.submit(1, {}, registry.active, 0.0)
+        assert predictor.started.wait(5), "The first copy should be picked up"
+        assert scorer.submit(2, {}, registry.active, 0.0)
+        assert not scorer.submit(3, {}, registry.active, 0.0)
+        predictor.release.set()
+        scorer.stop()
+
+        stats = scorer.snapshot()
+        assert stats["dropped"] == 1
+        assert stats["scored"] == 2
+
+    def test_copies_over_the_rate_are_throttled(self, registry):
+        """Test that the shadow rate cap drops copies before they are queued."""
+        scorer = ShadowScorer(registry.load("2"), max_rate=2)
+
+        accepted = [
+            scorer.submit(lead_id, {}, registry.active, 0.0) for lead_id in range(5)
+        ]
+        scorer.stop()
+
+        stats = scorer.snapshot()
+        assert accepted == [True, True, False, False, False]
+        assert stats["throttled"] == 3
+        assert stats["scored"] == 2
+
+    def test_failures_are_counted(self, registry):
+        """Test that a failing candidate is counted and keeps running."""
+        candidate = registry.load("2")
+        object.__setattr__(candidate, "predictor", FailingPredictor())
+        scorer = ShadowScorer(candidate)
+
+        scorer.submit(1, {}, registry.active, 0.0)
+        scorer.submit(2, {"unknown": 1.0, "age": "x"}, registry.active, 0.0)
+        scorer.stop()
+
+        assert scorer.snapshot()["errors"] == 2
+
+
+class TestRoutedScoring:
+    """Test the score endpoint with routing enabled."""
+
+    def test_variant_scores_request(self, client, registry, routed_app):
+        """Test that leads assigned to a variant are scored by it."""
+        routed_app(ModelRouter(registry, {"2": 1.0}))
+
+        response = client.post(
+            "/lead-scoring/score", json={"lead_id": 1, "features": {"age": 30}}
+        )
+
+        assert response.json()["score"] == pytest.approx(60.0)
+
+    def test_shadow_does_not_change_response(self, client, registry, routed_app):
+        """Test that the primary response is returned even if the shadow fails."""
+        candidate = registry.load("2")
+        object.__setattr__(candidate, "predictor", FailingPredictor())
+        model_router = ModelRouter(registry, shadow=ShadowScorer(candidate))
+        routed_app(model_router)
+
+        response = client.post(
+            "/lead-scoring/score", json={"lead_id": 1, "features": {"age": 30}}
+        )
+        model_router.close()
+
+        assert response.status_code == 200
+        assert response.json()["score"] == pytest.approx(40.0)
+        assert model_router.shadow.snapshot()["errors"] == 1
+
+    def test_admin_endpoint(self, client, registry, routed_app):
+        """Test that assignments and shadow counters are reported."""
+        disabled = client.get("/admin/routing").json()
+        model_router = ModelRouter(
+            registry, {"2": 0.5}, shadow=ShadowScorer(registry.load("2"))
+        )
+        routed_app(model_router)
+        client.post("/lead-scoring/score", json={"lead_id": 1, "features": {}})
+        model_router.close()
+
+        stats = client.get("/admin/routing").json()
+
+        assert disabled == {"enabled": False}
+        assert sum(stats["assignments"].values()) == 1
+        assert stats["shadow"]["scored"] == 1
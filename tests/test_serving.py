@@ -0,0 +1,93 @@
+"""Tests for shared model weights and per-worker readiness."""
+
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.workers import WorkerStatus, get_worker_status
+from app.main import app
+from app.ml.registry import DESCRIPTOR_FILE, ModelRegistry
+from app.ml.shared import descriptor_digest, export_predictor, load_predictor
+
+
+@pytest.fixture
+def exported(artifact_root, tmp_path):
+    """Export version 1 of the temporary model and return the shared root."""
+    shared_dir = tmp_path / "shared"
+    model = ModelRegistry(str(artifact_root), "lead-scoring", "1").active
+    digest = descriptor_digest((model.path / DESCRIPTOR_FILE).read_bytes())
+    export_predictor(model.predictor, shared_dir, model.name, model.version, digest)
+    return shared_dir
+
+
+class TestSharedWeights:
+    """Test exporting predictors and mapping them back."""
+
+    def test_registry_maps_exported_weights(self, artifact_root, exported):
+        """Test that a registry with a shared directory maps the export."""
+        registry = ModelRegistry(
+            str(artifact_root), "lead-scoring", "1", shared_dir=str(exported)
+        )
+        model = registry.active
+        coefficients = model.predictor.coefficients
+
+        assert model.shared_weights, "The export should be used"
+        assert not coefficients.flags.owndata, "Weights should not be copied"
+        assert not coefficients.flags.writeable, "Mapped weights are read-only"
+        np.testing.assert_allclose(coefficients, [1.0, 0.001])
+        assert model.score(model.vectorize({"age": 30.0})) == pytest.approx(40.0)
+
+    def test_stale_export_is_ignored(self, artifact_root, exported):
+        """Test that an export of a changed descriptor is not used."""
+        descriptor_path = artifact_root / "lead-scoring" / "1" / DESCRIPTOR_FILE
+        descriptor = json.loads(descriptor_path.read_text())
+        descriptor["params"]["intercept"] = 0.0
+        descriptor_path.write_text(json.dumps(descriptor))
+
+        model = ModelRegistry(
+            str(artifact_root), "lead-scoring", "1", shared_dir=str(exported)
+        ).active
+
+        assert not model.shared_weights, "A stale export should fall back to disk"
+        assert model.score(model.vectorize({"age": 30.0})) == pytest.approx(30.0)
+
+    def test_missing_export(self, exported):
+        """Test that versions without an export are reported as missing."""
+        assert load_predictor(exported, "lead-scoring", "2", "digest") is None
+
+
+class TestWorkerStatus:
+    """Test per-worker readiness reporting."""
+
+    def test_collects_workers_from_state_directory(self, tmp_path):
+        """Test that statuses of other live and exited workers are merged."""
+        status = WorkerStatus(str(tmp_path))
+        status.mark_ready("lead-scoring", "1", shared_weights=True)
+        (tmp_path / "worker-1.json").write_text(
+            json.dumps({"pid": 1, "ready": True, "model": None})
+        )
+        (tmp_path / "worker-999999999.json").write_text(
+            json.dumps({"pid": 999999999, "ready": True, "model": None})
+        )
+
+        workers = {worker["pid"]: worker for worker in status.collect()}
+
+        assert workers[status.pid]["ready"]
+        assert workers[1]["ready"], "Live workers keep their status"
+        assert not workers[999999999]["ready"], "Exited workers are not ready"
+
+    def test_readiness_follows_lifespan(self):
+        """Test that the worker is ready only while the app is running."""
+        get_worker_status.cache_clear()
+        assert TestClient(app).get("/health/ready").status_code == 503
+
+        with TestClient(app) as client:
+            response = client.get("/health/ready")
+            workers = client.get("/health/workers").json()
+
+        assert response.status_code == 200
+        assert response.json()["model"]["version"] == "1"
+        assert workers["ready"] == workers["total"] == 1
+        assert not get_worker_status().ready, "Shutdown should clear readiness"
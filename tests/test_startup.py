@@ -0,0 +1,153 @@
+"""Tests for the startup lifecycle, warmup and lazy model flavors."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.config.config import get_settings
+from app.core.startup import StartupTimings, warm_up
+from app.core.workers import get_worker_status
+from app.main import app
+from app.ml.executor import InferenceExecutor
+from app.ml.flavors import FLAVORS, get_flavor, load_linear
+from app.ml.registry import ModelLoadError, ModelRegistry
+
+
+@pytest.fixture
+def model(artifact_root):
+    """Version 1 of the temporary lead-scoring model."""
+    return ModelRegistry(str(artifact_root), "lead-scoring", "1").active
+
+
+class TestWarmup:
+    """Test timing phases and running warmup inferences."""
+
+    def test_phases_are_timed(self):
+        """Test that phase durations are reported in milliseconds."""
+        timings = StartupTimings()
+        timings.record("imports", 0.25)
+        with timings.phase("warmup"):
+            time.sleep(0.01)
+        timings.finish()
+
+        snapshot = timings.snapshot()
+        assert snapshot["complete"] is True
+        assert snapshot["phases_ms"]["imports"] == 250.0
+        assert snapshot["phases_ms"]["warmup"] >= 10
+        assert snapshot["total_ms"] == pytest.approx(
+            sum(snapshot["phases_ms"].values())
+        )
+
+    @pytest.mark.parametrize("mode", ["inline", "thread"])
+    def test_runs_inferences_per_batch_size(self, model, mode):
+        """Test that every batch size gets the configured inferences."""
+        executor = InferenceExecutor(mode=mode, workers=2)
+        try:
+            result = asyncio.run(warm_up(model, executor, 3, [1, 16]))
+        finally:
+            executor.shutdown()
+
+        assert result == {"inferences": 6, "failed": 0, "batch_sizes": [1, 16]}
+
+    def test_failed_inferences_are_counted(self, model):
+        """Test that rejected warmup calls do not abort the startup."""
+        executor = InferenceExecutor(mode="thread", queue_limit=0)
+
+        result = asyncio.run(warm_up(model, executor, 2, [1]))
+
+        assert result["failed"] == 2
+        assert result["inferences"] == 0
+
+
+class TestLazyFlavors:
+    """Test flavors registered by import string."""
+
+    def test_imported_on_first_use(self, monkeypatch):
+        """Test that an import string is resolved and cached."""
+        monkeypatch.setitem(FLAVORS, "lazy", "app.ml.flavors:load_linear")
+
+        assert get_flavor("lazy") is load_linear
+        assert FLAVORS["lazy"] is load_linear, "The import should happen once"
+
+    def test_missing_dependency_fails_the_load(self, artifact_root, monkeypatch):
+        """Test that an unimportable flavor is reported as a load error."""
+        monkeypatch.setitem(FLAVORS, "linear", "not_installed_library:load")
+
+        with pytest.raises(ModelLoadError, match="Cannot import model flavor"):
+            ModelRegistry(str(artifact_root), "lead-scoring", "1").load("1")
+
+
+class TestStartupLifecycle:
+    """Test readiness around the application lifespan."""
+
+    def test_ready_reports_startup_phases(self):
+        """Test that readiness includes every phase and the warmup counts."""
+        get_worker_status.cache_clear()
+        config = get_settings().startup
+
+        with TestClient(app) as client:
+            body = client.get("/health/ready").json()
+
+        startup = body["startup"]
+        assert body["ready"] is True
+        assert set(startup["phases_ms"]) == {
+            "imports",
+            "config",
+            "model_load",
+            "warmup",
+        }
+        assert startup["warmup"]["inferences"] == config.warmup_requests * len(
+            config.warmup_batch_sizes
+        )
+
+    def test_background_warmup_gates_readiness(self, monkeypatch):
+        """Test that the app serves but is not ready until the warmup ends."""
+        get_worker_status.cache_clear()
+        release = threading.Event()
+
+        async def slow_warm_up(*_args):
+            await asyncio.to_thread(release.wait, 5)
+            return {"inferences": 0, "failed": 0, "batch_sizes": []}
+
+        monkeypatch.setattr(get_settings().startup, "background_warmup", True)
+        monkeypatch.setattr(main, "warm_up", slow_warm_up)
+
+        with TestClient(app) as client:
+            warming = client.get("/health/ready")
+            alive = client.get("/health")
+            release.set()
+            deadline = time.monotonic() + 5
+            while client.get("/health/ready").status_code != 200:
+                assert time.monotonic() < deadline, "Warmup should finish"
+                time.sleep(0.01)
+
+        assert warming.status_code == 503
+        assert warming.json()["startup"]["complete"] is False
+        assert alive.status_code == 200, "Liveness should not wait for the warmup"
+
+    def test_failed_background_warmup_is_reported(self, monkeypatch):
+        """Test that a crashed background warmup shows up on readiness."""
+        get_worker_status.cache_clear()
+
+        async def broken_warm_up(*_args):
+            raise RuntimeError("pool exploded")
+
+        monkeypatch.setattr(get_settings().startup, "background_warmup", True)
+        monkeypatch.setattr(main, "warm_up", broken_warm_up)
+
+        with TestClient(app) as client:
+            deadline = time.monotonic() + 5
+            while client.get("/health/ready").json()["error"] is None:
+                assert time.monotonic() < deadline, "The failure should be reported"
+                time.sleep(0.01)
+            response = client.get("/health/ready")
+
+        body = response.json()
+        assert response.status_code == 503
+        assert body["error"] == "RuntimeError: pool exploded"
+        assert body["startup"]["error"] == body["error"]
+        assert body["startup"]["complete"] is False
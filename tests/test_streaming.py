@@ -0,0 +1,41 @@
+"""Tests for NDJSON streaming helpers."""
+
+import asyncio
+
+from app.core.streaming import LineTooLongError, iter_ndjson_lines
+
+
+def collect_lines(chunks, max_line_bytes=64):
+    """Run the line iterator over the given body chunks."""
+
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def run():
+        return [item async for item in iter_ndjson_lines(stream(), max_line_bytes)]
+
+    return asyncio.run(run())
+
+
+class TestNDJSONLines:
+    """Test incremental NDJSON line splitting."""
+
+    def test_lines_split_across_chunks(self):
+        """Test that lines spanning chunk boundaries are reassembled."""
+        lines = collect_lines([b'{"a":', b' 1}\n{"b"', b": 2}\n", b'{"c": 3}'])
+
+        assert lines == [(1, b'{"a": 1}'), (2, b'{"b": 2}'), (3, b'{"c": 3}')]
+
+    def test_blank_lines_are_counted_but_skipped(self):
+        """Test that blank lines keep line numbers aligned with the input."""
+        lines = collect_lines([b"{}\n\n  \n{}\n"])
+
+        assert [number for number, _ in lines] == [1, 4]
+
+    def test_long_line_reported_without_buffering(self):
+        """Test that oversized lines become errors and do not stop the stream."""
+        lines = collect_lines([b"x" * 50, b"x" * 50, b"x" * 50 + b"\n{}\n"])
+
+        assert isinstance(lines[0][1], LineTooLongError), "Long line should error"
+        assert lines[1] == (2, b"{}"), "Following lines should still be parsed"
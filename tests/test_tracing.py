@@ -0,0 +1,247 @@
+"""Tests for request ids and request tracing."""
+
+import json
+import tracemalloc
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.exceptions import register_exception_handlers
+from app.core.logging import LoggingMiddleware
+from app.core.tracing import (
+    NOOP_SPAN,
+    SpanExporter,
+    Tracer,
+    otlp_payload,
+    parse_traceparent,
+    span,
+)
+from app.ml.cache import PredictionCache, get_prediction_cache
+from app.ml.registry import ModelRegistry, get_model_registry
+from app.routers.lead_scoring import router as lead_scoring_router
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+SAMPLED = f"00-{TRACE_ID}-{PARENT_ID}-01"
+NOT_SAMPLED = f"00-{TRACE_ID}-{PARENT_ID}-00"
+
+LEAD = {"lead_id": 1, "features": {"age": 30, "income": 1000}}
+
+
+def build_client(tracer, artifact_root):
+    """Client for an app scoring with the v1 model and tracing with ``tracer``."""
+    traced = FastAPI()
+    register_exception_handlers(traced)
+    traced.include_router(lead_scoring_router)
+    registry = ModelRegistry(str(artifact_root), "lead-scoring", "1")
+    traced.dependency_overrides[get_model_registry] = lambda: registry
+    traced.dependency_overrides[get_prediction_cache] = lambda: PredictionCache(0, 0.0)
+    traced.add_middleware(LoggingMiddleware, tracer=tracer)
+    return TestClient(traced)
+
+
+class TestRequestIds:
+    """Test request ids given to every request."""
+
+    def test_inbound_request_id_is_honored(self, client):
+        """Test that the caller's id is echoed and reported in error bodies."""
+        response = client.post(
+            "/lead-scoring/score",
+            json={"lead_id": 1, "features": {"age": "old"}},
+            headers={"x-request-id": "caller-id-1"},
+        )
+
+        assert response.headers["x-request-id"] == "caller-id-1"
+        assert response.json()["request_id"] == "caller-id-1"
+
+    def test_generated_request_id(self, client):
+        """Test that requests without an id get a 32-hex-digit one."""
+        request_id = client.get("/health").headers["x-request-id"]
+
+        assert len(request_id) == 32
+        int(request_id, 16)
+
+    def test_oversized_request_id_is_replaced(self, client):
+        """Test that unreasonably long inbound ids are not echoed."""
+        response = client.get("/health", headers={"x-request-id": "x" * 500})
+
+        assert len(response.headers["x-request-id"]) == 32
+
+
+class TestTraceparent:
+    """Test parsing inbound W3C trace context."""
+
+    def test_valid_header(self):
+        """Test that trace id, parent span id and sampled flag are extracted."""
+        assert parse_traceparent(SAMPLED.encode()) == (TRACE_ID, PARENT_ID, True)
+        assert parse_traceparent(NOT_SAMPLED.encode())[2] is False
+
+    def test_invalid_headers(self):
+        """Test that malformed or all-zero ids are ignored."""
+        for value in [
+            "garbage",
+            f"00-{TRACE_ID}-{PARENT_ID}",
+            f"00-{'0' * 32}-{PARENT_ID}-01",
+            f"00-{TRACE_ID}-{'0' * 16}-01",
+            f"ff-{TRACE_ID}-{PARENT_ID}-01",
+            f"00-{TRACE_ID}-{PARENT_ID}-01-extra",
+        ]:
+            assert parse_traceparent(value.encode()) is None, value
+
+
+class TestTracer:
+    """Test sampling, spans and the trace buffer."""
+
+    def test_sampled_parent_records_every_phase(self, artifact_root):
+        """Test the spans of a request continuing a sampled inbound trace."""
+        tracer = Tracer()
+        response = build_client(tracer, artifact_root).post(
+            "/lead-scoring/score", json=LEAD, headers={"traceparent": SAMPLED}
+        )
+
+        assert response.status_code == 200
+        [trace] = tracer.recent(10)
+        spans = {item["name"]: item for item in trace["spans"]}
+        root = spans["middleware"]
+        assert set(spans) == {
+            "middleware",
+            "validation",
+            "feature_assembly",
+            "inference",
+            "serialization",
+        }
+        assert trace["trace_id"] == TRACE_ID
+        assert root["parent_id"] == PARENT_ID
+        assert all(
+            item["parent_id"] == root["span_id"]
+            for name, item in spans.items()
+            if name != "middleware"
+        )
+        assert root["attributes"]["route"] == "/lead-scoring/score"
+        assert spans["inference"]["attributes"]["model_version"] == "1"
+        assert response.headers["traceparent"] == f"00-{TRACE_ID}-{root['span_id']}-01"
+
+    def test_batch_and_stream_phases(self, artifact_root):
+        """Test that batch and NDJSON scoring record their phases."""
+        tracer = Tracer(sample_rate=1.0)
+        client = build_client(tracer, artifact_root)
+
+        client.post("/lead-scoring/score/batch", json=[LEAD])
+        client.post(
+            "/lead-scoring/score/stream",
+            content=json.dumps(LEAD) + "\n",
+            headers={"content-type": "application/x-ndjson"},
+        )
+
+        batch, stream = tracer.recent(2)
+        assert {item["name"] for item in batch["spans"]} >= {
+            "validation",
+            "feature_assembly",
+            "inference",
+            "serialization",
+        }
+        assert {item["name"] for item in stream["spans"]} >= {
+            "feature_assembly",
+            "inference",
+        }
+        assert batch["trace_id"] == batch["request_id"], "New traces use the id"
+
+    def test_unsampled_requests_record_nothing(self, artifact_root):
+        """Test that unsampled parents and the sample rate are honored."""
+        tracer = Tracer(sample_rate=0.0)
+        client = build_client(tracer, artifact_root)
+
+        client.post("/lead-scoring/score", json=LEAD)
+        response = client.post(
+            "/lead-scoring/score", json=LEAD, headers={"traceparent": NOT_SAMPLED}
+        )
+
+        assert "traceparent" not in response.headers
+        assert tracer.sampled == 0
+        assert not tracer.traces
+        assert span("inference") is NOOP_SPAN
+
+    def test_failed_phase_is_marked(self, artifact_root):
+        """Test that a span left by an error records the error type."""
+        tracer = Tracer(sample_rate=1.0)
+        response = build_client(tracer, artifact_root).post(
+            "/lead-scoring/score", content=b"{", headers={"traceparent": SAMPLED}
+        )
+
+        [trace] = tracer.recent(1)
+        spans = {item["name"]: item for item in trace["spans"]}
+        assert response.status_code == 422
+        assert "error" in spans["validation"]["attributes"]
+        assert spans["middleware"]["attributes"]["status_code"] == 422
+
+    def test_buffer_is_bounded(self, artifact_root):
+        """Test that only the most recent traces are kept."""
+        tracer = Tracer(sample_rate=1.0, buffer_size=2)
+        client = build_client(tracer, artifact_root)
+        for _ in range(3):
+            client.get("/lead-scoring/score/nothing")
+
+        assert tracer.sampled == 3
+        assert len(tracer.recent(10)) == 2
+
+    def test_tracing_off_adds_no_allocations(self, artifact_root):
+        """Test that an idle tracer costs requests no extra memory."""
+
+        def peak(tracer):
+            client = build_client(tracer, artifact_root)
+            client.post("/lead-scoring/score", json=LEAD)
+            peaks = []
+            for _ in range(5):
+                tracemalloc.start()
+                client.post("/lead-scoring/score", json=LEAD)
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            return min(peaks)
+
+        assert peak(Tracer(sample_rate=0.0)) <= peak(None) * 1.05
+
+
+class TestSpanExporter:
+    """Test exporting finished traces."""
+
+    def test_file_exporter_writes_jsonl(self, artifact_root, tmp_path):
+        """Test that every span is appended as one JSON line."""
+        path = tmp_path / "traces" / "spans.jsonl"
+        exporter = SpanExporter("file", path=str(path), flush_interval_seconds=0.01)
+        tracer = Tracer(sample_rate=1.0, exporter=exporter)
+
+        build_client(tracer, artifact_root).post("/lead-scoring/score", json=LEAD)
+        tracer.stop()
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert {line["name"] for line in lines} >= {"middleware", "inference"}
+        assert exporter.snapshot()["exported"] == 1
+
+    def test_otlp_payload(self):
+        """Test the OTLP JSON shape of exported spans."""
+        spans = [
+            {
+                "trace_id": TRACE_ID,
+                "span_id": PARENT_ID,
+                "parent_id": None,
+                "request_id": "r1",
+                "name": "middleware",
+                "start_ns": 1,
+                "end_ns": 2,
+                "duration_ms": 0.0,
+                "attributes": {"status_code": 200, "error": "ValueError"},
+            }
+        ]
+
+        payload = otlp_payload(spans, "scoring")
+
+        [resource] = payload["resourceSpans"]
+        [scope] = resource["scopeSpans"]
+        [exported] = scope["spans"]
+        assert resource["resource"]["attributes"][0]["value"] == {
+            "stringValue": "scoring"
+        }
+        assert exported["traceId"] == TRACE_ID
+        assert exported["startTimeUnixNano"] == "1"
+        assert exported["status"]["code"] == 2
+        assert "parentSpanId" not in exported
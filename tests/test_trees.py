@@ -0,0 +1,163 @@
+"""Tests for the compiled tree-ensemble model flavor."""
+
+import numpy as np
+import pytest
+
+from app.main import app
+from app.ml.cache import PredictionCache, get_prediction_cache
+from app.ml.registry import ModelLoadError, ModelRegistry, get_model_registry
+from app.ml.shared import export_predictor, load_predictor
+from app.ml.trees import TreeEnsemble, load_tree_ensemble
+from benchmarks.trees import random_ensemble, random_rows, reference_predict
+
+from .conftest import write_model
+
+FEATURES = ["age", "income"]
+
+# age <= 30 ? (income <= 1000 ? 10 : 20) : 40, missing ages go left
+STUMPS = {
+    "base_score": 1.0,
+    "trees": [
+        {
+            "feature": ["age", "income", None, None, None],
+            "threshold": [30.0, 1000.0, 0.0, 0.0, 0.0],
+            "left": [1, 2, -1, -1, -1],
+            "right": [4, 3, -1, -1, -1],
+            "value": [0.0, 0.0, 10.0, 20.0, 40.0],
+            "default_left": [True, False, False, False, False],
+        },
+        {
+            "feature": [None],
+            "threshold": [0.0],
+            "left": [-1],
+            "right": [-1],
+            "value": [0.5],
+        },
+    ],
+}
+
+
+@pytest.fixture
+def tree_root(tmp_path):
+    """Artifact tree holding a tree-ensemble version of the model."""
+    write_model(tmp_path, "1", FEATURES, STUMPS, flavor="tree_ensemble")
+    return tmp_path
+
+
+class TestTreeEnsemble:
+    """Test compiling and evaluating tree ensembles."""
+
+    def test_walks_each_tree(self):
+        """Test hand-computed scores, including thresholds and missing values."""
+        model = load_tree_ensemble(None, FEATURES, STUMPS)
+        X = np.array([[30.0, 1000.0], [30.0, 1000.5], [31.0, 0.0], [np.nan, np.nan]])
+
+        assert model.predict(X).tolist() == [11.5, 21.5, 41.5, 21.5]
+        assert model.depth == 2
+
+    def test_strict_decision(self):
+        """Test that ``<`` sends rows equal to the threshold right."""
+        model = load_tree_ensemble(None, FEATURES, {**STUMPS, "decision": "<"})
+
+        assert model.predict(np.array([[30.0, 1000.0]])).tolist() == [41.5]
+
+    @pytest.mark.parametrize("decision", ["<=", "<"])
+    @pytest.mark.parametrize("aggregation", ["sum", "mean"])
+    def test_matches_reference_model(self, decision, aggregation):
+        """Test parity with the per-row reference evaluator on random ensembles."""
+        features = [f"f{index}" for index in range(8)]
+        params = random_ensemble(features, trees=40, depth=7, seed=11)
+        params.update(decision=decision, aggregation=aggregation)
+        model = load_tree_ensemble(None, features, params)
+        X = random_rows(features, 300, seed=5)
+
+        np.testing.assert_allclose(
+            model.predict(X), reference_predict(params, features, X), rtol=1e-12
+        )
+
+    def test_rows_are_evaluated_in_blocks(self, monkeypatch):
+        """Test that large matrices give the same scores block by block."""
+        features = [f"f{index}" for index in range(4)]
+        params = random_ensemble(features, trees=10, depth=5, seed=2)
+        model = load_tree_ensemble(None, features, params)
+        X = random_rows(features, 100, seed=3)
+        expected = model.predict(X)
+
+        monkeypatch.setattr("app.ml.trees.BLOCK_PAIRS", 30)
+
+        np.testing.assert_array_equal(model.predict(X), expected)
+
+    def test_shared_export_round_trip(self, tmp_path):
+        """Test that compiled arrays survive the shared-memory export."""
+        model = load_tree_ensemble(None, FEATURES, STUMPS)
+        X = np.array([[25.0, 2000.0], [40.0, 0.0]])
+
+        export_predictor(model, tmp_path, "lead-scoring", "1", "digest")
+        shared = load_predictor(tmp_path, "lead-scoring", "1", "digest")
+
+        assert isinstance(shared, TreeEnsemble)
+        np.testing.assert_array_equal(shared.predict(X), model.predict(X))
+
+
+class TestTreeEnsembleFlavor:
+    """Test tree ensembles served through the registry and the routes."""
+
+    def test_score_route(self, client, tree_root):
+        """Test that the scoring routes use the compiled ensemble."""
+        registry = ModelRegistry(str(tree_root), "lead-scoring", "1")
+        app.dependency_overrides[get_model_registry] = lambda: registry
+        app.dependency_overrides[get_prediction_cache] = lambda: PredictionCache(0, 0.0)
+        try:
+            single = client.post(
+                "/lead-scoring/score",
+                json={"lead_id": 1, "features": {"age": 25, "income": 500}},
+            )
+            batch = client.post(
+                "/lead-scoring/score/batch",
+                json=[
+                    {"lead_id": 2, "features": {"age": 25, "income": 5000}},
+                    {"lead_id": 3, "features": {"age": 50}},
+                ],
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert registry.active.flavor == "tree_ensemble"
+        assert single.json() == {"lead_id": 1, "score": 11.5}
+        assert [item["score"] for item in batch.json()] == [21.5, 41.5]
+
+    @pytest.mark.parametrize(
+        "tree",
+        [
+            {"feature": ["age"], "threshold": [1.0], "left": [1], "right": [-1]},
+            {
+                "feature": ["height", None, None],
+                "threshold": [1.0, 0.0, 0.0],
+                "left": [1, -1, -1],
+                "right": [2, -1, -1],
+                "value": [0.0, 1.0, 2.0],
+            },
+            {
+                "feature": ["age", None],
+                "threshold": [1.0, 0.0],
+                "left": [1, -1],
+                "right": [1, -1],
+                "value": [0.0, 1.0],
+            },
+            {
+                "feature": ["age", None],
+                "threshold": [1.0, 0.0],
+                "left": [1, -1],
+                "right": [5, -1],
+                "value": [0.0, 1.0],
+            },
+        ],
+        ids=["missing-values", "unknown-feature", "shared-node", "out-of-range"],
+    )
+    def test_invalid_trees_are_rejected(self, tmp_path, tree):
+        """Test that malformed ensembles fail the load instead of scoring."""
+        write_model(tmp_path, "1", FEATURES, {"trees": [tree]}, "tree_ensemble")
+        registry = ModelRegistry(str(tmp_path), "lead-scoring", "1")
+
+        with pytest.raises(ModelLoadError, match="Tree 0"):
+            registry.load("1")